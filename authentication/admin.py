@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import User, RevokedToken
 
 
 @admin.register(User)
@@ -27,3 +27,13 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at', 'last_login']
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    """Admin configuration for RevokedToken model."""
+    
+    list_display = ['jti', 'expires_at', 'created_at']
+    search_fields = ['jti']
+    ordering = ['-created_at']
+    readonly_fields = ['created_at']
@@ -0,0 +1,118 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from . import cache as user_cache
+from . import revocation
+from .tokens import PRINCIPAL_CLAIMS, TOKEN_VERSION_CLAIM
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds `request.user` from the token's claims.
+
+    Instead of loading the user row, the id, email and name claims are turned
+    into a User instance with every other field deferred, so views can filter
+    by `request.user` without an extra query. Revocation is checked against
+    the token's id and the user's active flag and token version, and is_staff
+    is taken from the same state rather than the token, so a demotion applies
+    to tokens already issued. That state is held in memory by this process.
+    Tokens issued before these claims existed fall back to the regular
+    database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if revocation.is_revoked(validated_token):
+            raise self.revoked()
+        user_id = self.get_user_id(validated_token)
+        if not self.is_stateless(validated_token):
+            return super().get_user(validated_token)
+        return self.build_user(validated_token, user_cache.get_state(user_id))
+
+    def revoked(self):
+        """Return the error raised for a revoked token."""
+        return exceptions.AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    def is_stateless(self, validated_token):
+        """Return True if the token carries every claim needed to build the user."""
+        return all(claim in validated_token for claim in (*PRINCIPAL_CLAIMS, TOKEN_VERSION_CLAIM))
+
+    def build_user(self, validated_token, state):
+        """Check the cached user state and return the user described by the token."""
+        if state is None:
+            raise exceptions.AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        is_active, is_staff, token_version = state
+        if not is_active:
+            raise exceptions.AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if validated_token[TOKEN_VERSION_CLAIM] != token_version:
+            raise self.revoked()
+
+        values = {
+            api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM],
+            **{claim: validated_token[claim] for claim in PRINCIPAL_CLAIMS},
+            'is_active': True,
+            'is_staff': is_staff,
+            TOKEN_VERSION_CLAIM: token_version,
+        }
+        # from_db expects values in field order; fields missing from the token
+        # are deferred and load on first access.
+        field_names = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return self.user_model.from_db(
+            DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names]
+        )
+
+
+class AsyncJWTAuthentication(StatelessJWTAuthentication):
+    """StatelessJWTAuthentication with a coroutine variant for async views."""
+
+    async def aauthenticate(self, request):
+        """Return (user, validated token), or None if the request carries no token."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Async version of `get_user`, with the same checks and errors."""
+        if await revocation.ais_revoked(validated_token):
+            raise self.revoked()
+        user_id = self.get_user_id(validated_token)
+        if self.is_stateless(validated_token):
+            return self.build_user(validated_token, await user_cache.aget_state(user_id))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise exceptions.AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
@@ -0,0 +1,76 @@
+"""
+In-process TTL cache of the user state that token authentication checks.
+
+Each entry maps a user id to (is_active, is_staff, token_version), or None for a user
+that no longer exists. Entries are dropped when the user is saved or deleted
+in this process and expire after AUTH_USER_CACHE_TIMEOUT seconds elsewhere,
+which bounds how long a revoked token keeps working on other workers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+
+def _lookup(user_id):
+    """Return (found, state) for a cached, unexpired entry."""
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None:
+            return False, None
+        expires, state = entry
+        if expires < time.monotonic():
+            del _entries[user_id]
+            return False, None
+        _entries.move_to_end(user_id)
+        return True, state
+
+
+def _store(user_id, state):
+    with _lock:
+        _entries[user_id] = (time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT, state)
+        _entries.move_to_end(user_id)
+        while len(_entries) > settings.AUTH_USER_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def _state_query(user_id):
+    return get_user_model().objects.filter(pk=user_id).values_list(
+        'is_active', 'is_staff', 'token_version'
+    )
+
+
+def get_state(user_id):
+    """Return (is_active, is_staff, token_version) for `user_id`, or None if there is no such user."""
+    found, state = _lookup(user_id)
+    if not found:
+        state = _state_query(user_id).first()
+        _store(user_id, state)
+    return state
+
+
+async def aget_state(user_id):
+    """Async version of `get_state`."""
+    found, state = _lookup(user_id)
+    if not found:
+        state = await _state_query(user_id).afirst()
+        _store(user_id, state)
+    return state
+
+
+def invalidate(user_id):
+    """Forget the cached state of `user_id`."""
+    with _lock:
+        _entries.pop(user_id, None)
+
+
+def clear():
+    """Forget every cached entry."""
+    with _lock:
+        _entries.clear()
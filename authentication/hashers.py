@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """scrypt with its cost parameters read from the SCRYPT_* settings."""
+    
+    # scrypt needs about 128 * n * r * p bytes and OpenSSL refuses more than
+    # 32 MiB by default. This is only a cap, so hashes made with a higher
+    # work factor than the current one still verify.
+    maxmem = 2 ** 30
+    
+    @property
+    def work_factor(self):
+        return settings.SCRYPT_WORK_FACTOR
+    
+    @property
+    def block_size(self):
+        return settings.SCRYPT_BLOCK_SIZE
+    
+    @property
+    def parallelism(self):
+        return settings.SCRYPT_PARALLELISM
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with its cost parameters read from the ARGON2_* settings."""
+    
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+    
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+    
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
@@ -0,0 +1,77 @@
+"""
+Password hashing off the request thread.
+
+Hashing a password is slow on purpose. The async login and registration views
+run it in a dedicated pool of PASSWORD_HASHING_WORKERS threads, so the event
+loop and the single thread Django runs sync code in under ASGI keep serving
+other requests meanwhile. hashlib and argon2 release the GIL while hashing,
+so the pool can keep every core busy.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide password hashing thread pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                thread_name_prefix='password-hashing',
+            )
+        return _executor
+
+
+async def run_in_pool(func, *args):
+    """Run `func(*args)` in the hashing pool and return its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args))
+
+
+def verify_password(password, encoded):
+    """Return (valid, new hash or None) for `password` against the stored hash."""
+    upgraded = []
+    valid = check_password(
+        password, encoded, setter=lambda raw_password: upgraded.append(make_password(raw_password))
+    )
+    return valid, (upgraded[0] if upgraded else None)
+
+
+async def amake_password(password):
+    """Hash `password` in the hashing pool."""
+    return await run_in_pool(make_password, password)
+
+
+async def aauthenticate(email, password):
+    """
+    Async counterpart of `authenticate()` for email and password credentials.
+
+    The user is loaded with the async ORM and the password checked in the
+    hashing pool. Hashes made with an outdated hasher or cost are upgraded.
+    """
+    User = get_user_model()
+    user = await User._default_manager.filter(**{User.USERNAME_FIELD: email}).afirst()
+    if user is None:
+        # Hash anyway, so the response time does not reveal unknown emails.
+        await amake_password(password)
+        return None
+
+    valid, new_hash = await run_in_pool(verify_password, password, user.password)
+    if not valid or not user.is_active:
+        return None
+
+    if new_hash is not None:
+        await User._default_manager.filter(pk=user.pk).aupdate(password=new_hash)
+        user.password = new_hash
+    return user
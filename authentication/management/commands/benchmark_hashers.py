@@ -0,0 +1,121 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import check_password, make_password
+from django.test.utils import override_settings
+
+PASSWORD = 'Correct-Horse-Battery-9'
+
+# Hasher settings compared by default: (name, hasher, extra settings).
+CANDIDATES = [
+    ('pbkdf2', 'django.contrib.auth.hashers.PBKDF2PasswordHasher', {}),
+    ('scrypt-n13', 'authentication.hashers.ScryptPasswordHasher', {'SCRYPT_WORK_FACTOR': 2 ** 13}),
+    ('scrypt-n14', 'authentication.hashers.ScryptPasswordHasher', {'SCRYPT_WORK_FACTOR': 2 ** 14}),
+    ('scrypt-n15', 'authentication.hashers.ScryptPasswordHasher', {'SCRYPT_WORK_FACTOR': 2 ** 15}),
+    ('argon2-t1-m64', 'authentication.hashers.Argon2PasswordHasher', {
+        'ARGON2_TIME_COST': 1, 'ARGON2_MEMORY_COST': 65536, 'ARGON2_PARALLELISM': 1,
+    }),
+    ('argon2-t2-m100', 'authentication.hashers.Argon2PasswordHasher', {
+        'ARGON2_TIME_COST': 2, 'ARGON2_MEMORY_COST': 102400, 'ARGON2_PARALLELISM': 8,
+    }),
+]
+
+
+def rate(func, seconds, threads):
+    """Call `func` from `threads` threads for about `seconds`; return calls per second."""
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        calls = 0
+        while time.monotonic() < deadline:
+            func()
+            calls += 1
+        return calls
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        calls = sum(pool.map(lambda _: worker(), range(threads)))
+    return calls / (time.monotonic() - started)
+
+
+class Command(BaseCommand):
+    help = 'Measure logins and registrations per second per core for each password hasher setting'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            metavar='NAME',
+            help=f'Benchmark only these settings ({", ".join(name for name, _, _ in CANDIDATES)}, current)',
+        )
+        parser.add_argument(
+            '--seconds',
+            type=float,
+            default=3.0,
+            help='Time spent measuring each rate (default: 3)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Threads for the aggregate rate, as in the hashing pool (default: CPU count)',
+        )
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['seconds'] <= 0 or options['threads'] <= 0:
+            raise CommandError('--seconds and --threads must be positive.')
+
+        candidates = [('current', settings.PASSWORD_HASHERS[0], {}), *CANDIDATES]
+        if options['only']:
+            unknown = set(options['only']) - {name for name, _, _ in candidates}
+            if unknown:
+                raise CommandError(f'Unknown hasher settings: {", ".join(sorted(unknown))}')
+            candidates = [candidate for candidate in candidates if candidate[0] in options['only']]
+
+        parallel = f'logins/s x{options["threads"]}'
+        self.stdout.write(
+            f'{"setting":<16} {"ms/login":>9} {"logins/s/core":>14} '
+            f'{"registrations/s/core":>21} {parallel:>16}'
+        )
+        results = []
+        for name, hasher, extra in candidates:
+            with override_settings(PASSWORD_HASHERS=[hasher], **extra):
+                result = self.measure(name, hasher, extra, options['seconds'], options['threads'])
+            if result is None:
+                continue
+            results.append(result)
+            self.stdout.write(
+                f'{name:<16} {1000 / result["logins_per_second_per_core"]:>9.1f} '
+                f'{result["logins_per_second_per_core"]:>14.1f} '
+                f'{result["registrations_per_second_per_core"]:>21.1f} '
+                f'{result["logins_per_second"]:>16.1f}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'threads': options['threads'], 'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nResults written to {options["output"]}'))
+
+    def measure(self, name, hasher, extra, seconds, threads):
+        """Return the rates for one hasher setting, or None if it is unavailable."""
+        try:
+            encoded = make_password(PASSWORD)
+        except ValueError as exc:
+            # Argon2 without argon2-cffi installed, for instance.
+            self.stdout.write(self.style.WARNING(f'{name:<16} skipped: {exc}'))
+            return None
+
+        login = lambda: check_password(PASSWORD, encoded)  # noqa: E731
+        return {
+            'name': name,
+            'hasher': hasher,
+            'settings': extra,
+            'logins_per_second_per_core': rate(login, seconds, 1),
+            'registrations_per_second_per_core': rate(lambda: make_password(PASSWORD), seconds, 1),
+            'logins_per_second': rate(login, seconds, threads),
+        }
@@ -0,0 +1,169 @@
+import io
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from healthcare_backend import renderers
+from healthcare_backend.renderers import ORJSONParser, ORJSONRenderer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer
+
+User = get_user_model()
+
+PAGE_SIZE = settings.REST_FRAMEWORK['PAGE_SIZE']
+
+
+def build_records(rows):
+    """Return `rows` unsaved patients, doctors and mappings shaped like real data."""
+    now = timezone.now()
+    user = User(id=1, email='user0@loadtest.example', name='Aarav Sharma')
+    doctors = [
+        Doctor(
+            id=i + 1,
+            name=f'Dr. Meera Iyer {i}',
+            specialization='cardiology',
+            phone='+91 98765 43210',
+            email=f'meera.iyer{i}@clinic.example',
+            experience_years=5 + i % 30,
+            qualification='MBBS, MD (Cardiology)',
+            address=f'{i} Residency Road, Bengaluru 560025',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ]
+    patients = [
+        Patient(
+            id=i + 1,
+            user=user,
+            name=f'Zoë Fernandes {i}',
+            age=20 + i % 60,
+            gender='FMO'[i % 3],
+            phone='9123456780',
+            address=f'Flat {i}, Green Park, New Delhi 110016',
+            medical_history='Hypertension since 2015; allergic to penicillin. Follow-up every 6 months.',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ]
+    mappings = [
+        PatientDoctorMapping(
+            id=i + 1,
+            patient=patients[i],
+            doctor=doctors[i],
+            assigned_date=now.date(),
+            notes='Referred for an ECG and a lipid profile.',
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(seconds=i),
+        )
+        for i in range(rows)
+    ]
+    return patients, doctors, mappings
+
+
+def page(results):
+    """Wrap serialized rows the way the keyset paginator does."""
+    return {
+        'next': 'http://testserver/api/patients/?cursor=cD0yMDI2',
+        'previous': None,
+        'results': results,
+    }
+
+
+def build_payloads(rows):
+    """Return (name, data) pairs rendered from the API serializers."""
+    patients, doctors, mappings = build_records(rows)
+    return [
+        ('patient-detail', PatientSerializer(patients[0]).data),
+        ('patient-list', page(PatientSerializer(patients[:PAGE_SIZE], many=True).data)),
+        ('patient-list-all', PatientSerializer(patients, many=True).data),
+        ('doctor-list', page(DoctorSerializer(doctors[:PAGE_SIZE], many=True).data)),
+        ('mapping-list', page(PatientDoctorMappingListSerializer(mappings[:PAGE_SIZE], many=True).data)),
+        ('mapping-detail-list', PatientDoctorMappingSerializer(mappings[:PAGE_SIZE], many=True).data),
+    ]
+
+
+def per_call(func, repeat):
+    """Return the best of five average timings of `repeat` calls to `func`, in microseconds."""
+    best = float('inf')
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best * 1e6
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and orjson JSON renderers and parsers on API-shaped payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1000,
+            help='Rows in the unpaginated patient list payload (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Calls per timing; the best of five timings is reported (default: 20)',
+        )
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['rows'] < PAGE_SIZE or options['repeat'] <= 0:
+            raise CommandError(f'--rows must be at least {PAGE_SIZE} and --repeat positive.')
+        if renderers.orjson is None:
+            raise CommandError('orjson is not installed; run `pip install orjson`.')
+
+        self.stdout.write(
+            f'{"payload":<20} {"bytes":>9} {"render stdlib":>14} {"render orjson":>14} {"x":>5} '
+            f'{"parse stdlib":>13} {"parse orjson":>13} {"x":>5}'
+        )
+        results = []
+        for name, data in build_payloads(options['rows']):
+            result = self.measure(name, data, options['repeat'])
+            results.append(result)
+            self.stdout.write(
+                f'{name:<20} {result["bytes"]:>9} '
+                f'{result["render_stdlib_us"]:>12.0f}us {result["render_orjson_us"]:>12.0f}us '
+                f'{result["render_stdlib_us"] / result["render_orjson_us"]:>5.1f} '
+                f'{result["parse_stdlib_us"]:>11.0f}us {result["parse_orjson_us"]:>11.0f}us '
+                f'{result["parse_stdlib_us"] / result["parse_orjson_us"]:>5.1f}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'rows': options['rows'], 'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nResults written to {options["output"]}'))
+
+    def measure(self, name, data, repeat):
+        """Time rendering and parsing `data` with both implementations."""
+        expected = JSONRenderer().render(data)
+        if ORJSONRenderer().render(data) != expected:
+            raise CommandError(f'{name}: orjson output differs from the stdlib renderer.')
+
+        def parse(parser):
+            return lambda: parser.parse(io.BytesIO(expected))
+
+        return {
+            'name': name,
+            'bytes': len(expected),
+            'render_stdlib_us': per_call(lambda: JSONRenderer().render(data), repeat),
+            'render_orjson_us': per_call(lambda: ORJSONRenderer().render(data), repeat),
+            'parse_stdlib_us': per_call(parse(JSONParser()), repeat),
+            'parse_orjson_us': per_call(parse(ORJSONParser()), repeat),
+        }
@@ -0,0 +1,99 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from healthcare_backend.serializers import get_values_serializer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer
+
+# (name, serializer, model) compared; each read as its list endpoint reads it.
+CANDIDATES = [
+    ('patient', PatientSerializer, Patient),
+    ('doctor', DoctorSerializer, Doctor),
+    ('mapping-list', PatientDoctorMappingListSerializer, PatientDoctorMapping),
+    ('mapping-detail', PatientDoctorMappingSerializer, PatientDoctorMapping),
+]
+
+
+def rows_per_second(func, rows, repeat):
+    """Return the best rows/s of `repeat` calls to `func`, which reads `rows` rows."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return rows / best
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/s of the model serializers and their values() read serializers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=5000,
+            help='Rows read per call (default: 5000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Calls per measurement; the best is reported (default: 5)',
+        )
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['rows'] <= 0 or options['repeat'] <= 0:
+            raise CommandError('--rows and --repeat must be positive.')
+
+        self.stdout.write(
+            f'{"serializer":<16} {"rows":>7} {"model rows/s":>13} {"values rows/s":>14} {"x":>5}'
+        )
+        results = []
+        for name, serializer_class, model in CANDIDATES:
+            queryset = model.objects.order_by('-created_at', '-id')[:options['rows']]
+            rows = queryset.count()
+            if not rows:
+                raise CommandError(
+                    f'No {model._meta.verbose_name_plural} found. Run `python manage.py generate_data` first.'
+                )
+
+            result = self.measure(name, serializer_class, queryset, rows, options['repeat'])
+            results.append(result)
+            self.stdout.write(
+                f'{name:<16} {rows:>7} {result["model_rows_per_second"]:>13.0f} '
+                f'{result["values_rows_per_second"]:>14.0f} '
+                f'{result["values_rows_per_second"] / result["model_rows_per_second"]:>5.1f}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nResults written to {options["output"]}'))
+
+    def measure(self, name, serializer_class, queryset, rows, repeat):
+        """Time fetching and serializing `queryset` both ways, after checking they agree."""
+        values_serializer = get_values_serializer(serializer_class)
+
+        def read_models():
+            return serializer_class(serializer_class.setup_eager_loading(queryset), many=True).data
+
+        def read_values():
+            return values_serializer.serialize(values_serializer.get_queryset(queryset))
+
+        if read_values() != read_models():
+            raise CommandError(
+                f'{name}: the values() serializer output differs from {serializer_class.__name__}.'
+            )
+
+        return {
+            'name': name,
+            'rows': rows,
+            'model_rows_per_second': rows_per_second(read_models, rows, repeat),
+            'values_rows_per_second': rows_per_second(read_values, rows, repeat),
+        }
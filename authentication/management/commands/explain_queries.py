@@ -0,0 +1,144 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection
+from healthcare_backend.pagination import KeysetPagination
+from healthcare_backend.search import search
+from healthcare_backend.serializers import get_values_serializer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer, DoctorWorkloadSerializer, DoctorRosterSerializer
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer
+
+User = get_user_model()
+
+# Plan lines that mean a table is read in full rather than through an index.
+SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # Full-text lookups show up as a SCAN of the FTS5 virtual table.
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING| VIRTUAL TABLE)(?:\s|$)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the query behind each API endpoint and report sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            help='User whose patients and mappings are queried (default: first user with patients)',
+        )
+        parser.add_argument(
+            '--force-index',
+            action='store_true',
+            help='PostgreSQL only: disable seq scans so small seeded tables show whether an index is usable',
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the full plan for every query',
+        )
+        parser.add_argument(
+            '--fail-on-seq-scan',
+            action='store_true',
+            help='Exit with an error if any query falls back to a sequential scan',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQ_SCAN_PATTERNS:
+            raise CommandError(f'EXPLAIN analysis is not supported for the {vendor} backend.')
+
+        user = self.get_user(options['email'])
+        patient = Patient.objects.filter(user=user).first()
+        mapping = PatientDoctorMapping.objects.filter(patient__user=user).first()
+        doctor = Doctor.objects.first()
+        if patient is None or mapping is None or doctor is None:
+            raise CommandError('No seeded data found. Run `python manage.py seed_data` first.')
+
+        if options['force_index'] and vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        self.stdout.write(f'Explaining endpoint queries on {vendor} for {user.email}...')
+
+        seq_scans = 0
+        for name, queryset in self.get_queries(user, patient, doctor, mapping):
+            plan = queryset.explain()
+            tables = SEQ_SCAN_PATTERNS[vendor].findall(plan)
+            if tables:
+                seq_scans += 1
+                self.stdout.write(self.style.WARNING(
+                    f'{name}: sequential scan on {", ".join(sorted(set(tables)))}'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: index scan'))
+            if options['verbose_plans'] or tables:
+                self.stdout.write(plan)
+
+        if seq_scans:
+            message = f'{seq_scans} endpoint queries fall back to a sequential scan.'
+            if options['fail_on_seq_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('All endpoint queries use an index.'))
+
+    def get_user(self, email):
+        """Return the user to run the per-user queries as."""
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f'No user with email {email}.')
+        user = User.objects.filter(patients__isnull=False).first()
+        if user is None:
+            raise CommandError('No user with patients found. Run `python manage.py seed_data` first.')
+        return user
+
+    def get_queries(self, user, patient, doctor, mapping):
+        """Yield (url name, queryset) pairs mirroring the queries the views run."""
+        page = KeysetPagination.page_size + 1
+        ordering = ('-created_at', '-id')
+
+        yield 'patient-list-create', get_values_serializer(PatientSerializer).get_queryset(
+            Patient.objects.filter(user=user)
+        ).order_by(*ordering)[:page]
+        yield 'patient-detail', PatientSerializer.setup_eager_loading(
+            Patient.objects.filter(pk=patient.pk, user=user)
+        )
+        yield 'doctor-list-create', get_values_serializer(DoctorSerializer).get_queryset(
+            Doctor.objects.all()
+        ).order_by(*ordering)[:page]
+        yield 'doctor-list-create (by specialization)', get_values_serializer(DoctorSerializer).get_queryset(
+            Doctor.objects.filter(specialization=doctor.specialization)
+        ).order_by(*ordering)[:page]
+        yield 'patient-list-create (search by name)', get_values_serializer(PatientSerializer).get_queryset(
+            search(Patient.objects.filter(user=user), patient.name.split()[0])
+        )[:KeysetPagination.page_size]
+        yield 'patient-list-create (search by phone)', get_values_serializer(PatientSerializer).get_queryset(
+            search(Patient.objects.filter(user=user), patient.phone[:5])
+        )[:KeysetPagination.page_size]
+        yield 'doctor-list-create (search)', get_values_serializer(DoctorSerializer).get_queryset(
+            search(Doctor.objects.all(), doctor.name.split()[-1])
+        )[:KeysetPagination.page_size]
+        yield 'doctor-detail', Doctor.objects.filter(pk=doctor.pk)
+        yield 'doctor-workload', get_values_serializer(DoctorWorkloadSerializer).get_queryset(
+            DoctorWorkloadSerializer.annotate_workload(Doctor.objects.all())
+        ).order_by(*ordering)[:page]
+        yield 'doctor-patients', get_values_serializer(DoctorRosterSerializer).get_queryset(
+            PatientDoctorMapping.objects.filter(doctor=mapping.doctor_id, patient__user=user)
+        ).order_by(*ordering)[:page]
+        yield 'doctor email uniqueness', Doctor.objects.filter(email=doctor.email).values('pk')[:1]
+        yield 'mapping-list-create', get_values_serializer(PatientDoctorMappingListSerializer).get_queryset(
+            PatientDoctorMapping.objects.filter(patient__user=user)
+        ).order_by(*ordering)[:page]
+        yield 'mapping-by-patient', get_values_serializer(PatientDoctorMappingListSerializer).get_queryset(
+            PatientDoctorMapping.objects.filter(patient=patient)
+        )
+        yield 'mapping-detail', PatientDoctorMappingSerializer.setup_eager_loading(
+            PatientDoctorMapping.objects.filter(pk=mapping.pk, patient__user=user)
+        )
@@ -0,0 +1,287 @@
+import random
+import time
+from bisect import bisect
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from patients.models import Patient
+from doctors.models import Doctor
+from doctors import cache as doctor_cache
+from mappings.models import PatientDoctorMapping
+from healthcare_backend.bulk_load import load_rows
+
+User = get_user_model()
+
+# Every generated user and doctor has an email in this domain, so a previous
+# run can be found and removed with --clear.
+EMAIL_DOMAIN = 'loadtest.example'
+
+FIRST_NAMES = [
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Ishaan',
+    'Kavita', 'Lakshmi', 'Meera', 'Neha', 'Pooja', 'Priya', 'Rahul', 'Rajesh',
+    'Ramesh', 'Rohan', 'Sanjay', 'Sneha', 'Sunita', 'Suresh', 'Vijay', 'Vikram',
+]
+LAST_NAMES = [
+    'Agarwal', 'Bose', 'Desai', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Kumar',
+    'Mehta', 'Nair', 'Patel', 'Patil', 'Rao', 'Reddy', 'Sharma', 'Singh', 'Verma',
+]
+CITIES = [
+    'New Delhi - 110016', 'Mumbai - 400001', 'Bangalore - 560034', 'Hyderabad - 500033',
+    'Chennai - 600001', 'Pune - 411001', 'Kolkata - 700001', 'Noida - 201301',
+]
+CONDITIONS = [
+    'Hypertension', 'Diabetes Type 2', 'Asthma', 'Arthritis', 'Migraine',
+    'Thyroid disorder', 'Skin allergies', 'Sports injury',
+]
+# Rough share of doctors per specialization.
+SPECIALIZATION_WEIGHTS = {
+    'GENERAL': 30, 'PEDIATRICS': 12, 'GYNECOLOGY': 10, 'ORTHOPEDICS': 10,
+    'CARDIOLOGY': 9, 'DERMATOLOGY': 8, 'NEUROLOGY': 6, 'PSYCHIATRY': 5, 'OTHER': 10,
+}
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative weights where item i is picked with probability ~ 1 / (i + 1) ** exponent."""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic, skewed data set for load testing'
+
+    # Columns written for each model. COPY fills nothing else, so they must
+    # cover every NOT NULL column without a database default.
+    user_fields = [
+        'email', 'name', 'password', 'is_active', 'is_staff', 'is_superuser', 'token_version',
+        'created_at', 'updated_at',
+    ]
+    doctor_fields = [
+        'name', 'specialization', 'phone', 'email', 'experience_years',
+        'qualification', 'address', 'created_at', 'updated_at',
+    ]
+    patient_fields = [
+        'user_id', 'name', 'age', 'gender', 'phone', 'address', 'medical_history',
+        'created_at', 'updated_at',
+    ]
+    mapping_fields = ['patient_id', 'doctor_id', 'notes', 'assigned_date', 'created_at', 'updated_at']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users (default: 1000)')
+        parser.add_argument('--doctors', type=int, default=500, help='Number of doctors (default: 500)')
+        parser.add_argument('--patients', type=int, default=50000, help='Number of patients (default: 50000)')
+        parser.add_argument('--mappings', type=int, default=200000, help='Number of mappings (default: 200000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent for patients per user and mappings per doctor; 0 is uniform (default: 1.0)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Spread created_at over this many past days (default: 365)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per insert batch and transaction (default: 10000)',
+        )
+        parser.add_argument('--password', default='Test@123', help='Password shared by every generated user')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the data of a previous run first',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'doctors', 'patients', 'mappings', 'batch_size'):
+            if options[name] < 0 or (name in ('users', 'batch_size') and options[name] == 0):
+                raise CommandError(f'--{name.replace("_", "-")} must be positive.')
+        if options['patients'] and not options['users']:
+            raise CommandError('Patients need at least one user.')
+        if options['mappings'] > options['patients'] * options['doctors']:
+            raise CommandError('More mappings requested than distinct patient/doctor pairs.')
+
+        if options['clear']:
+            self.clear()
+        elif User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists():
+            raise CommandError('Generated data already exists. Rerun with --clear to replace it.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end = timezone.now()
+        self.start = self.end - timedelta(days=options['days'])
+
+        started = time.monotonic()
+        user_ids = self.generate_users(options['users'], options['password'])
+        doctor_ids = self.generate_doctors(options['doctors'])
+        first_patient_id = self.generate_patients(options['patients'], user_ids, options['skew'])
+        self.generate_mappings(options['mappings'], first_patient_id, doctor_ids, options['skew'])
+        doctor_cache.bump_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n=== Generated data in {time.monotonic() - started:.1f}s ==='
+        ))
+        self.stdout.write(self.style.WARNING(
+            f'Every user logs in with user<n>@{EMAIL_DOMAIN} / {options["password"]}'
+        ))
+
+    def clear(self):
+        """Remove the users, patients, doctors and mappings of a previous run."""
+        self.stdout.write('Clearing previously generated data...')
+        PatientDoctorMapping.objects.filter(
+            doctor__email__endswith=f'@{EMAIL_DOMAIN}'
+        ).delete()
+        Patient.objects.filter(user__email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        Doctor.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+
+    def timestamp(self, index, total):
+        """Return a created_at that grows with `index`, with a little jitter."""
+        span = (self.end - self.start).total_seconds()
+        offset = span * (index + self.rng.random()) / max(total, 1)
+        return self.start + timedelta(seconds=offset)
+
+    def name(self):
+        return f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}'
+
+    def phone(self):
+        return f'9{self.rng.randrange(10 ** 9):09d}'
+
+    def address(self):
+        return f'{self.rng.randrange(1, 999)}, {self.rng.choice(CITIES)}'
+
+    def load(self, label, model, fields, rows, total):
+        """Insert `rows` in batches, one transaction per batch, reporting progress."""
+        started = time.monotonic()
+        batch, done = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                done += self.flush(model, fields, batch)
+                batch = []
+                rate = done / (time.monotonic() - started)
+                self.stdout.write(f'{label}: {done}/{total} ({rate:.0f} rows/s)')
+        done += self.flush(model, fields, batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {done} {label} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
+
+    def flush(self, model, fields, batch):
+        with transaction.atomic():
+            load_rows(model, fields, batch)
+        return len(batch)
+
+    def generate_users(self, count, password):
+        """Create users sharing one pre-computed password hash; return their ids."""
+        # Hash once: running PBKDF2 per user would take hours at this scale.
+        password_hash = make_password(password)
+        fields = self.user_fields
+
+        def rows():
+            for i in range(count):
+                created_at = self.timestamp(i, count)
+                yield (
+                    f'user{i}@{EMAIL_DOMAIN}', self.name(), password_hash,
+                    True, False, False, 0, created_at, created_at,
+                )
+
+        self.load('users', User, fields, rows(), count)
+        return list(
+            User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').order_by('id').values_list('id', flat=True)
+        )
+
+    def generate_doctors(self, count):
+        """Create doctors; return their ids, most popular first."""
+        specializations = list(SPECIALIZATION_WEIGHTS)
+        cum_weights = list(accumulate(SPECIALIZATION_WEIGHTS.values()))
+        fields = self.doctor_fields
+
+        def rows():
+            for i in range(count):
+                specialization = self.rng.choices(specializations, cum_weights=cum_weights)[0]
+                created_at = self.timestamp(i, count)
+                yield (
+                    f'Dr. {self.name()}', specialization, self.phone(), f'doctor{i}@{EMAIL_DOMAIN}',
+                    self.rng.randrange(0, 41), f'MBBS, MD ({specialization.title()})',
+                    f'City Hospital, {self.rng.choice(CITIES)}', created_at, created_at,
+                )
+
+        self.load('doctors', Doctor, fields, rows(), count)
+        return list(
+            Doctor.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').order_by('id').values_list('id', flat=True)
+        )
+
+    def generate_patients(self, count, user_ids, skew):
+        """Create patients skewed towards a few power users; return the first new id."""
+        first_id = (Patient.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        cum_weights = zipf_cum_weights(len(user_ids), skew)
+        fields = self.patient_fields
+
+        def rows():
+            total_weight = cum_weights[-1]
+            for i in range(count):
+                user_id = user_ids[bisect(cum_weights, self.rng.random() * total_weight)]
+                history = None
+                if self.rng.random() < 0.7:
+                    history = '. '.join(self.rng.sample(CONDITIONS, self.rng.randrange(1, 4))) + '.'
+                created_at = self.timestamp(i, count)
+                yield (
+                    user_id, self.name(), self.rng.randrange(0, 100), self.rng.choice('MMFFO'),
+                    self.phone(), self.address(), history, created_at, created_at,
+                )
+
+        self.load('patients', Patient, fields, rows(), count)
+        return first_id
+
+    def generate_mappings(self, count, first_patient_id, doctor_ids, skew):
+        """Spread `count` mappings over the new patients, favouring popular doctors."""
+        if not count:
+            return
+        patient_count = Patient.objects.filter(id__gte=first_patient_id).count()
+        per_patient, extra = divmod(count, patient_count)
+        cum_weights = zipf_cum_weights(len(doctor_ids), skew)
+        total_weight = cum_weights[-1]
+        fields = self.mapping_fields
+
+        def patient_ids():
+            # Page through the new patients by id rather than holding them all.
+            last_id = first_patient_id - 1
+            while True:
+                page = list(
+                    Patient.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:self.batch_size]
+                )
+                if not page:
+                    return
+                yield from page
+                last_id = page[-1]
+
+        def pick_doctors(wanted):
+            if wanted * 2 > len(doctor_ids):
+                return self.rng.sample(doctor_ids, wanted)
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.add(doctor_ids[bisect(cum_weights, self.rng.random() * total_weight)])
+            return sorted(chosen)
+
+        def rows():
+            index = 0
+            for position, patient_id in enumerate(patient_ids()):
+                wanted = per_patient + (1 if position < extra else 0)
+                for doctor_id in pick_doctors(wanted):
+                    created_at = self.timestamp(index, count)
+                    index += 1
+                    yield (
+                        patient_id, doctor_id, self.rng.choice(CONDITIONS) + ' follow-up.',
+                        timezone.localdate(created_at), created_at, created_at,
+                    )
+
+        self.load('mappings', PatientDoctorMapping, fields, rows(), count)
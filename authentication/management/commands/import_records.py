@@ -0,0 +1,299 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from authentication.models import ImportCheckpoint
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from doctors import cache as doctor_cache
+from healthcare_backend.bulk_load import load_rows
+from mappings.models import PatientDoctorMapping
+from mappings.serializers import PatientDoctorMappingBulkSerializer
+
+User = get_user_model()
+
+
+class Loader:
+    """Validates chunks of input rows for one model and turns them into table rows."""
+
+    model = None
+    serializer_class = None
+    # Model attnames written for every row, besides the timestamps.
+    fields = []
+
+    def __init__(self):
+        # One serializer validates every row, so its fields are built only once.
+        self.serializer = self.serializer_class(context={'bulk': True})
+
+    def prepare(self):
+        """Build the in-memory lookup tables used while validating."""
+
+    def validate_row(self, row):
+        """Return (validated data, None) or (None, errors) for one input row."""
+        try:
+            return self.serializer.run_validation(row), None
+        except ValidationError as exc:
+            return None, exc.detail
+
+    def validate_chunk(self, rows):
+        """
+        Validate (line, row) pairs. Return the model field values of the valid
+        rows and a list of (line, errors) for the rejected ones.
+        """
+        valid, errors = [], []
+        for line, row in rows:
+            if not isinstance(row, dict):
+                errors.append((line, {'non_field_errors': ['Expected an object.']}))
+                continue
+            data, row_errors = self.validate_row(row)
+            if row_errors:
+                errors.append((line, row_errors))
+            else:
+                valid.append((line, data))
+        return self.check_chunk(valid, errors)
+
+    def check_chunk(self, valid, errors):
+        """Run set-based checks over the chunk's valid rows."""
+        return [self.to_record(data) for _, data in valid], errors
+
+    def to_record(self, data):
+        """Return the values to write for one validated row, in `fields` order."""
+        return [data.get(field) for field in self.fields]
+
+    def after_load(self):
+        """Hook for work the bulk loaders skip, such as model signals."""
+
+
+class DoctorLoader(Loader):
+    model = Doctor
+    serializer_class = DoctorSerializer
+    fields = [
+        'name', 'specialization', 'phone', 'email',
+        'experience_years', 'qualification', 'address',
+    ]
+
+    def prepare(self):
+        self.emails = set(Doctor.objects.values_list('email', flat=True))
+
+    def check_chunk(self, valid, errors):
+        records = []
+        for line, data in valid:
+            if data['email'] in self.emails:
+                errors.append((line, {'email': ['A doctor with this email already exists.']}))
+                continue
+            self.emails.add(data['email'])
+            records.append(self.to_record(data))
+        return records, errors
+
+    def after_load(self):
+        doctor_cache.bump_version()
+
+
+class PatientLoader(Loader):
+    """Patients carry a `user_email` column that is resolved to the owning user."""
+
+    model = Patient
+    serializer_class = PatientSerializer
+    fields = ['user_id', 'name', 'age', 'gender', 'phone', 'address', 'medical_history']
+
+    def prepare(self):
+        self.users = dict(User.objects.values_list('email', 'id'))
+
+    def validate_row(self, row):
+        user_id = self.users.get(User.objects.normalize_email(row.get('user_email') or ''))
+        if user_id is None:
+            return None, {'user_email': ['No user with this email.']}
+        data, errors = super().validate_row(row)
+        if data is not None:
+            data = {**data, 'user_id': user_id}
+        return data, errors
+
+
+class MappingLoader(Loader):
+    """Mappings carry a `patient` id and either a `doctor` id or a `doctor_email`."""
+
+    model = PatientDoctorMapping
+    serializer_class = PatientDoctorMappingBulkSerializer
+    fields = ['patient_id', 'doctor_id', 'notes']
+
+    def prepare(self):
+        self.doctors = dict(Doctor.objects.values_list('email', 'id'))
+        self.doctor_ids = set(self.doctors.values())
+
+    def validate_row(self, row):
+        if not row.get('doctor') and row.get('doctor_email'):
+            row = {**row, 'doctor': self.doctors.get(row['doctor_email'], '')}
+        return super().validate_row(row)
+
+    def check_chunk(self, valid, errors):
+        patient_ids = {data['patient'] for _, data in valid}
+        doctor_ids = {data['doctor'] for _, data in valid}
+        patients = set(Patient.objects.filter(id__in=patient_ids).values_list('id', flat=True))
+        existing = set(PatientDoctorMapping.objects.filter(
+            patient_id__in=patient_ids, doctor_id__in=doctor_ids
+        ).values_list('patient_id', 'doctor_id'))
+
+        records = []
+        for line, data in valid:
+            pair = (data['patient'], data['doctor'])
+            if data['patient'] not in patients:
+                errors.append((line, {'patient': ['No patient with this id.']}))
+            elif data['doctor'] not in self.doctor_ids:
+                errors.append((line, {'doctor': ['No doctor with this id or email.']}))
+            elif pair in existing:
+                errors.append((line, {'non_field_errors': ['This doctor is already assigned to this patient.']}))
+            else:
+                existing.add(pair)
+                records.append([data['patient'], data['doctor'], data.get('notes')])
+        return records, errors
+
+
+LOADERS = {
+    'doctors': DoctorLoader,
+    'patients': PatientLoader,
+    'mappings': MappingLoader,
+}
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as handle:
+        yield from csv.DictReader(handle)
+
+
+def read_ndjson(path):
+    with open(path, encoding='utf-8') as handle:
+        for text in handle:
+            if text.strip():
+                yield json.loads(text)
+
+
+READERS = {'csv': read_csv, 'ndjson': read_ndjson}
+
+
+class Command(BaseCommand):
+    help = 'Stream doctors, patients or mappings from a CSV or NDJSON file into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(LOADERS), help='Kind of record in the file')
+        parser.add_argument('path', help='CSV (with a header row) or NDJSON file')
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Input format (default: guessed from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows validated and loaded per transaction (default: 5000)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip the rows already loaded by a previous, interrupted run',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use batched INSERTs instead of COPY on PostgreSQL',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist.')
+        input_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError('--chunk-size must be positive.')
+
+        loader = LOADERS[options['model']]()
+        loader.prepare()
+        use_copy = connection.vendor == 'postgresql' and not options['no_copy']
+
+        source = os.path.abspath(path)
+        errors_path = f'{path}.errors.ndjson'
+        skip = self.read_checkpoint(source, options['model']) if options['resume'] else 0
+
+        rows = enumerate(READERS[input_format](path), start=1)
+        if skip:
+            self.stdout.write(f'Resuming after row {skip}...')
+            rows = islice(rows, skip, None)
+
+        self.stdout.write(
+            f'Importing {options["model"]} from {path} using {"COPY" if use_copy else "INSERT"}...'
+        )
+        processed, loaded, rejected = skip, 0, 0
+        started = time.monotonic()
+
+        with open(errors_path, 'a' if skip else 'w', encoding='utf-8') as errors_file:
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+
+                records, errors = loader.validate_chunk(chunk)
+                stamps = self.timestamp_values(loader.model, timezone.now())
+                stamp_values = list(stamps.values())
+                processed = chunk[-1][0]
+                # The checkpoint commits with the chunk, so --resume never loads a chunk twice.
+                with transaction.atomic():
+                    load_rows(
+                        loader.model,
+                        loader.fields + list(stamps),
+                        (record + stamp_values for record in records),
+                        use_copy=use_copy
+                    )
+                    self.write_checkpoint(source, options['model'], processed)
+                loaded += len(records)
+                rejected += len(errors)
+
+                for line, row_errors in errors:
+                    errors_file.write(json.dumps({'row': line, 'errors': row_errors}) + '\n')
+                errors_file.flush()
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{processed} rows read, {loaded} loaded, {rejected} rejected '
+                    f'({loaded / elapsed if elapsed else 0:.0f} rows/s)'
+                )
+
+        loader.after_load()
+        ImportCheckpoint.objects.filter(source=source).delete()
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n=== Imported {loaded} {options["model"]} in {elapsed:.1f}s '
+            f'({loaded / elapsed if elapsed else 0:.0f} rows/s) ==='
+        ))
+        if rejected:
+            self.stdout.write(self.style.WARNING(f'{rejected} rows rejected, see {errors_path}'))
+
+    def read_checkpoint(self, source, model):
+        """Return the number of input rows a previous run already committed."""
+        checkpoint = ImportCheckpoint.objects.filter(source=source).first()
+        if checkpoint is None:
+            return 0
+        if checkpoint.model != model:
+            raise CommandError(f'{source} was being imported as {checkpoint.model}, not {model}.')
+        return checkpoint.rows
+
+    def write_checkpoint(self, source, model, rows):
+        """Record that the first `rows` input rows are committed."""
+        ImportCheckpoint.objects.update_or_create(source=source, defaults={'model': model, 'rows': rows})
+
+    def timestamp_values(self, model, now):
+        """Return the timestamp values written with every row of a chunk."""
+        values = {'created_at': now, 'updated_at': now}
+        if model is PatientDoctorMapping:
+            values['assigned_date'] = timezone.localdate(now)
+        return values
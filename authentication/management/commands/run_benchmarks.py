@@ -0,0 +1,399 @@
+import io
+import itertools
+import json
+import logging
+import platform
+import resource
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from importlib.metadata import PackageNotFoundError, version
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.urls import URLResolver, get_resolver, reverse
+from patients.models import Patient
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from authentication.tokens import UserRefreshToken
+
+User = get_user_model()
+
+# Fixed data set sizes, so reports from different runs are comparable.
+SIZES = {
+    'small': {'users': 20, 'doctors': 200, 'patients': 2000, 'mappings': 6000},
+    'medium': {'users': 200, 'doctors': 2000, 'patients': 50000, 'mappings': 200000},
+    'large': {'users': 10000, 'doctors': 5000, 'patients': 2000000, 'mappings': 10000000},
+}
+
+# Requests profiled before the run, so the profile routes serve a fixed set.
+PROFILED_REQUESTS = 20
+PROFILING_TOKEN = 'benchmark'
+
+# Routes that are not benchmarked, and why.
+SKIPPED_ROUTES = {
+    'mapping-bulk': 'every request would need patient/doctor pairs not yet assigned',
+    'logout': 'revokes the access token it is sent with, which every other scenario shares',
+    'metrics': 'token-gated operational endpoint scraped by Prometheus, not part of the API',
+}
+
+PACKAGES = ['Django', 'djangorestframework', 'djangorestframework-simplejwt', 'psycopg']
+
+
+def package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def route_names(resolver=None):
+    """Yield the name of every API route, skipping the admin site."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name != 'admin':
+                yield from route_names(pattern)
+        elif pattern.name:
+            yield pattern.name
+
+
+def read_peak_rss():
+    """Return this process's peak resident set size in MB."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024)
+
+
+def reset_peak_rss():
+    """Reset the peak RSS counter where the kernel allows it (Linux 4.0+)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+class QueryCounter:
+    """execute_wrapper counting the queries run on the current thread's connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API route against a seeded test database and compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=sorted(SIZES), default='small', help='Data set size (default: small)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default: 8)')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint (default: 10)')
+        parser.add_argument('--only', nargs='+', metavar='ROUTE', help='Benchmark only these route names')
+        parser.add_argument('--output', default='benchmark_report.json', help='Where to write the JSON report')
+        parser.add_argument('--baseline', help='Report to compare against')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Relative p95 latency or throughput change counted as a regression (default: 0.2)',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error if any endpoint regressed against the baseline',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the seeded test database between runs',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2 or options['concurrency'] < 1:
+            raise CommandError('--requests must be at least 2 and --concurrency at least 1.')
+        baseline = self.load_baseline(options['baseline']) if options['baseline'] else None
+
+        # Failed requests are counted in the report; don't print a traceback for each.
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            # Profiles go to a scratch directory, not the one the development server uses.
+            with tempfile.TemporaryDirectory() as profiling_dir, override_settings(
+                PROFILING_DIR=profiling_dir, PROFILING_TOKEN=PROFILING_TOKEN, PROFILING_SAMPLE_RATE=0.0,
+            ):
+                self.seed(options['size'])
+                self.prepare_fixtures()
+                report = self.run(options)
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'\nReport written to {options["output"]}'))
+
+        if baseline is not None:
+            regressions = self.compare(report, baseline, options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} endpoints regressed: {", ".join(regressions)}')
+
+    def load_baseline(self, path):
+        try:
+            with open(path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read baseline {path}: {exc}')
+
+    def seed(self, size):
+        """Fill the test database with the fixed-size data set, unless already there."""
+        if User.objects.filter(email='user0@loadtest.example').exists():
+            self.stdout.write('Reusing seeded test database.')
+            return
+        self.stdout.write(f'Seeding {size} data set...')
+        call_command('generate_data', seed=42, stdout=io.StringIO(), **SIZES[size])
+
+    def prepare_fixtures(self):
+        """Pick the benchmark user (the heaviest power user) and the ids the routes need."""
+        self.user = User.objects.get(email='user0@loadtest.example')
+        # Staff access is needed for the staff-only routes and changes nothing else.
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.user.is_staff = True
+        self.token = str(UserRefreshToken.for_user(self.user).access_token)
+        self.patient = Patient.objects.filter(user=self.user).order_by('-id').first()
+        self.doctor = Doctor.objects.order_by('id').first()
+        self.mapping = PatientDoctorMapping.objects.filter(patient__user=self.user).order_by('-id').first()
+        if self.patient is None or self.mapping is None:
+            raise CommandError('The seeded data set has no patients or mappings for user0.')
+        self.sequence = itertools.count()
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {self.token}', HTTP_X_PROFILE=PROFILING_TOKEN)
+        for _ in range(PROFILED_REQUESTS):
+            response = client.get(reverse('patient-list-create'))
+        self.profile_id = response['X-Profile-Id']
+
+    def patient_payload(self):
+        return {
+            'name': 'Benchmark Patient', 'age': 40, 'gender': 'F',
+            'phone': '9123456780', 'address': '1, MG Road, Pune - 411001',
+        }
+
+    def doctor_payload(self):
+        n = next(self.sequence)
+        return {
+            'name': 'Dr. Benchmark', 'specialization': 'GENERAL', 'phone': '9876543210',
+            'email': f'benchmark{n}@bench.example', 'experience_years': 10,
+            'qualification': 'MBBS', 'address': 'City Hospital, Pune',
+        }
+
+    def refresh_payload(self):
+        # A refresh token can only be rotated once, so every request brings a new one.
+        return {'refresh': str(UserRefreshToken.for_user(self.user))}
+
+    def get_scenarios(self):
+        """Return {route name: [(label, method, path, body factory)]}."""
+        return {
+            'api-root': [('api-root', 'get', reverse('api-root'), None)],
+            'register': [('register', 'post', reverse('register'), lambda: {
+                'name': 'Benchmark User',
+                'email': f'register{next(self.sequence)}@bench.example',
+                'password': 'Bench@12345', 'password_confirm': 'Bench@12345',
+            })],
+            'login': [('login', 'post', reverse('login'), lambda: {
+                'email': self.user.email, 'password': 'Test@123',
+            })],
+            'token-refresh': [('token-refresh', 'post', reverse('token-refresh'), self.refresh_payload)],
+            'patient-list-create': [
+                ('patient-list', 'get', reverse('patient-list-create'), None),
+                ('patient-create', 'post', reverse('patient-list-create'), self.patient_payload),
+            ],
+            'patient-detail': [
+                ('patient-detail', 'get', reverse('patient-detail', args=[self.patient.pk]), None),
+            ],
+            'patient-bulk': [
+                ('patient-bulk-create', 'post', reverse('patient-bulk'),
+                 lambda: [self.patient_payload() for _ in range(50)]),
+            ],
+            'patient-export': [('patient-export', 'get', reverse('patient-export'), None)],
+            'doctor-list-create': [
+                ('doctor-list', 'get', reverse('doctor-list-create'), None),
+                ('doctor-create', 'post', reverse('doctor-list-create'), self.doctor_payload),
+            ],
+            'doctor-detail': [
+                ('doctor-detail', 'get', reverse('doctor-detail', args=[self.doctor.pk]), None),
+            ],
+            'doctor-bulk': [
+                ('doctor-bulk-create', 'post', reverse('doctor-bulk'),
+                 lambda: [self.doctor_payload() for _ in range(50)]),
+            ],
+            'doctor-patients': [
+                ('doctor-patients', 'get', reverse('doctor-patients', args=[self.mapping.doctor_id]), None),
+            ],
+            'doctor-workload': [('doctor-workload', 'get', reverse('doctor-workload'), None)],
+            'doctor-cache-stats': [('doctor-cache-stats', 'get', reverse('doctor-cache-stats'), None)],
+            'mapping-list-create': [('mapping-list', 'get', reverse('mapping-list-create'), None)],
+            'mapping-export': [('mapping-export', 'get', reverse('mapping-export'), None)],
+            'mapping-by-patient': [
+                ('mapping-by-patient', 'get', reverse('mapping-by-patient', args=[self.patient.pk]), None),
+            ],
+            'mapping-detail': [
+                ('mapping-detail', 'get', reverse('mapping-detail', args=[self.mapping.pk]), None),
+            ],
+            'stats': [('stats', 'get', reverse('stats'), None)],
+            'db-stats': [('db-stats', 'get', reverse('db-stats'), None)],
+            'profile-list': [('profile-list', 'get', reverse('profile-list'), None)],
+            'profile-detail': [
+                ('profile-detail', 'get', reverse('profile-detail', args=[self.profile_id]), None),
+            ],
+        }
+
+    def run(self, options):
+        scenarios = self.get_scenarios()
+        routes = list(route_names())
+        for route in routes:
+            if route not in scenarios and route not in SKIPPED_ROUTES:
+                self.stdout.write(self.style.WARNING(f'No benchmark scenario for route {route}'))
+        for route, reason in SKIPPED_ROUTES.items():
+            self.stdout.write(f'Skipping {route}: {reason}')
+
+        selected = [route for route in routes if route in scenarios]
+        if options['only']:
+            selected = [route for route in selected if route in options['only']]
+
+        endpoints = {}
+        for route in selected:
+            for label, method, path, body in scenarios[route]:
+                endpoints[label] = self.benchmark(method, path, body, options)
+                self.print_result(label, endpoints[label])
+
+        return {
+            'meta': {
+                'created_at': datetime.now(dt_timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'packages': {name: package_version(name) for name in PACKAGES},
+                'database': connection.vendor,
+                'size': options['size'],
+                'data_set': SIZES[options['size']],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+            },
+            'endpoints': endpoints,
+        }
+
+    def request(self, client, method, path, body):
+        """Send one request; return (latency in seconds, query count, status code)."""
+        # The body is built before timing starts; minting tokens is not part of the request.
+        data = None if body is None else body()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            if data is None:
+                response = getattr(client, method)(path)
+            else:
+                response = getattr(client, method)(path, data, content_type='application/json')
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        return elapsed, counter.count, response.status_code
+
+    def benchmark(self, method, path, body, options):
+        """Drive one endpoint with concurrent clients and summarise the results."""
+        def worker(count):
+            client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            try:
+                for _ in range(options['warmup'] // options['concurrency'] + 1):
+                    self.request(client, method, path, body)
+                return [self.request(client, method, path, body) for _ in range(count)]
+            finally:
+                connections.close_all()
+
+        shares = [
+            options['requests'] // options['concurrency'] + (1 if i < options['requests'] % options['concurrency'] else 0)
+            for i in range(options['concurrency'])
+        ]
+        reset_peak_rss()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = [sample for samples in pool.map(worker, shares) for sample in samples]
+        wall = time.perf_counter() - started
+
+        latencies = [elapsed * 1000 for elapsed, _, _ in results]
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        queries = [count for _, count, _ in results]
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, _, code in results if code >= 400),
+            'p50_ms': round(cuts[49], 3),
+            'p95_ms': round(cuts[94], 3),
+            'p99_ms': round(cuts[98], 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'throughput_rps': round(len(results) / wall, 1),
+            'queries_per_request': round(statistics.fmean(queries), 2),
+            'max_queries': max(queries),
+            'peak_rss_mb': round(read_peak_rss(), 1),
+        }
+
+    def print_result(self, label, result):
+        line = (
+            f'{label:<22} p50 {result["p50_ms"]:>8.2f}ms  p95 {result["p95_ms"]:>8.2f}ms  '
+            f'p99 {result["p99_ms"]:>8.2f}ms  {result["throughput_rps"]:>8.1f} req/s  '
+            f'{result["queries_per_request"]:>5.1f} queries  {result["peak_rss_mb"]:>7.1f} MB'
+        )
+        if result['errors']:
+            self.stdout.write(self.style.ERROR(f'{line}  {result["errors"]} errors'))
+        else:
+            self.stdout.write(line)
+
+    def compare(self, report, baseline, threshold):
+        """Print each endpoint's change against the baseline; return the regressed ones."""
+        self.stdout.write('\nComparison with baseline:')
+        for key in ('size', 'database', 'concurrency'):
+            if report['meta'].get(key) != baseline.get('meta', {}).get(key):
+                self.stdout.write(self.style.WARNING(
+                    f'Baseline {key} differs ({baseline.get("meta", {}).get(key)} vs {report["meta"].get(key)}); '
+                    'numbers may not be comparable.'
+                ))
+
+        regressions = []
+        for label, result in report['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(label)
+            if before is None:
+                self.stdout.write(f'{label:<22} new endpoint')
+                continue
+            p95_change = result['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0
+            rps_change = result['throughput_rps'] / before['throughput_rps'] - 1 if before['throughput_rps'] else 0
+            more_queries = result['max_queries'] > before['max_queries']
+            regressed = p95_change > threshold or rps_change < -threshold or more_queries
+
+            line = (
+                f'{label:<22} p95 {p95_change:+.1%}  throughput {rps_change:+.1%}  '
+                f'queries {before["max_queries"]} -> {result["max_queries"]}'
+            )
+            if regressed:
+                regressions.append(label)
+                self.stdout.write(self.style.ERROR(f'{line}  REGRESSION'))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+        return regressions
@@ -1,12 +1,13 @@
 from django.db import models
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
 
 class UserManager(BaseUserManager):
     """Custom user manager for User model."""
     
-    def create_user(self, email, name, password=None, **extra_fields):
-        """Create and save a regular user."""
+    def create_user(self, email, name, password=None, password_hash=None, **extra_fields):
+        """Create and save a regular user, optionally from an already hashed password."""
         if not email:
             raise ValueError('Users must have an email address')
         if not name:
@@ -14,7 +15,10 @@ class UserManager(BaseUserManager):
         
         email = self.normalize_email(email)
         user = self.model(email=email, name=name, **extra_fields)
-        user.set_password(password)
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
     
@@ -38,6 +42,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Bumped whenever the password changes; tokens carrying an older value are rejected.
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -49,7 +55,57 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
     
+    def set_password(self, raw_password):
+        """Set the password and revoke every token issued before the change."""
+        super().set_password(raw_password)
+        self.token_version += 1
+    
+    def check_password(self, raw_password):
+        """Check the password, upgrading its hash without revoking tokens."""
+        def setter(raw_password):
+            super(User, self).set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return check_password(raw_password, self.password, setter)
+    
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+
+
+class RevokedToken(models.Model):
+    """A refresh or access token that may no longer be used, kept until it expires."""
+    
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.jti
+    
+    class Meta:
+        db_table = 'revoked_tokens'
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+        indexes = [
+            models.Index(fields=['created_at'], name='revoked_tokens_created_idx'),
+            models.Index(fields=['expires_at'], name='revoked_tokens_expires_idx'),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """Input rows of a file that `import_records` has committed, saved with each chunk."""
+    
+    source = models.CharField(max_length=1024, unique=True)
+    model = models.CharField(max_length=20)
+    rows = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f'{self.source} ({self.model}, {self.rows} rows)'
+    
+    class Meta:
+        db_table = 'import_checkpoints'
+        verbose_name = 'Import Checkpoint'
+        verbose_name_plural = 'Import Checkpoints'
@@ -0,0 +1,107 @@
+"""
+In-memory check of revoked JWT ids.
+
+Every revoked token id is stored in the RevokedToken table. Each process keeps
+the unexpired ids in memory and pulls the rows written by other processes at
+most every REVOKED_TOKENS_SYNC_INTERVAL seconds, so checking a token normally
+runs no query. Rows are re-read with an overlap, so a revocation committed
+late is still picked up by the next sync.
+
+Refresh tokens are revoked by inserting their id, and the unique constraint
+makes that insert the authoritative check. A refresh token replayed on
+another process before it syncs is still rejected when rotation tries to
+revoke it a second time.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from .models import RevokedToken
+
+# How far back each sync re-reads, to catch revocations committed out of order.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+_revoked = {}
+_lock = threading.Lock()
+_last_sync = None
+_synced_at = None
+
+
+def _sync_due():
+    return _synced_at is None or time.monotonic() - _synced_at >= settings.REVOKED_TOKENS_SYNC_INTERVAL
+
+
+def _sync_query():
+    """Return the query for revocations written since the last sync, and the sync time."""
+    now = timezone.now()
+    queryset = RevokedToken.objects.filter(expires_at__gt=now)
+    if _last_sync is not None:
+        queryset = queryset.filter(created_at__gte=_last_sync - SYNC_OVERLAP)
+    return queryset.values_list('jti', 'expires_at'), now
+
+
+def _apply(rows, synced):
+    """Merge synced rows into the in-memory set and drop expired ids."""
+    global _last_sync, _synced_at
+    with _lock:
+        _revoked.update(rows)
+        for jti in [jti for jti, expires_at in _revoked.items() if expires_at <= synced]:
+            del _revoked[jti]
+        _last_sync = synced
+        _synced_at = time.monotonic()
+
+
+def sync():
+    """Load the revocations written since the last sync."""
+    queryset, synced = _sync_query()
+    _apply(list(queryset), synced)
+
+
+async def async_sync():
+    """Async version of `sync`."""
+    queryset, synced = _sync_query()
+    _apply([row async for row in queryset], synced)
+
+
+def is_revoked(token):
+    """Return True if `token` has been revoked, syncing first if due."""
+    if _sync_due():
+        sync()
+    return token[api_settings.JTI_CLAIM] in _revoked
+
+
+async def ais_revoked(token):
+    """Async version of `is_revoked`."""
+    if _sync_due():
+        await async_sync()
+    return token[api_settings.JTI_CLAIM] in _revoked
+
+
+def revoke(token):
+    """Revoke `token` until it expires. Return False if it was already revoked."""
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+    except IntegrityError:
+        revoked = False
+    else:
+        revoked = True
+    with _lock:
+        _revoked[jti] = expires_at
+    return revoked
+
+
+def clear():
+    """Forget the in-memory state, so the next check syncs from scratch."""
+    global _last_sync, _synced_at
+    with _lock:
+        _revoked.clear()
+        _last_sync = None
+        _synced_at = None
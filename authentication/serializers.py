@@ -36,12 +36,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        """Create and return a new user."""
+        """Create and return a new user, reusing `password_hash` if it was passed to save()."""
         validated_data.pop('password_confirm')
         user = User.objects.create_user(
             email=validated_data['email'],
             name=validated_data['name'],
-            password=validated_data['password']
+            password=validated_data['password'],
+            password_hash=validated_data.get('password_hash')
         )
         return user
 
@@ -57,6 +58,12 @@ class UserLoginSerializer(serializers.Serializer):
     )
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    """Serializer for the refresh token sent to refresh and logout."""
+    
+    refresh = serializers.CharField(required=True)
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user details."""
     
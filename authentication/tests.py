@@ -1,3 +1,294 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import NOT_PROVIDED
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from healthcare_backend.bulk_load import load_rows
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+from . import cache as user_cache
+from . import revocation
+from .management.commands import generate_data, import_records
+from .models import ImportCheckpoint, RevokedToken
+from .tokens import UserRefreshToken
+from .views import AsyncUserLoginView, AsyncUserRegistrationView
+
+User = get_user_model()
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    """Requests are authenticated from token claims, with cached revocation checks."""
+
+    def setUp(self):
+        user_cache.clear()
+        revocation.clear()
+        self.user = User.objects.create_user(
+            email='tester@example.com', name='Tester', password='Test@12345'
+        )
+        self.client = APIClient()
+        self.authorize(UserRefreshToken.for_user(self.user))
+
+    def authorize(self, refresh):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def get(self, url='/api/patients/'):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, len(context.captured_queries)
+
+    def test_user_is_not_loaded_once_its_state_is_cached(self):
+        # The patient list itself runs two queries. The first request also
+        # syncs the revoked token ids and loads the user state.
+        response, first = self.get()
+        self.assertEqual(response.status_code, 200)
+        response, second = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((first, second), (4, 2))
+
+    def test_password_change_revokes_tokens(self):
+        self.get()
+        self.user.set_password('Changed@12345')
+        self.user.save()
+
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 401)
+        self.authorize(UserRefreshToken.for_user(self.user))
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 401)
+
+    def test_staff_claim_is_honoured(self):
+        response, _ = self.get('/api/doctors/cache-stats/')
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.authorize(UserRefreshToken.for_user(self.user))
+        response, _ = self.get('/api/doctors/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_staff_demotion_applies_to_issued_tokens(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.authorize(UserRefreshToken.for_user(self.user))
+        response, _ = self.get('/api/doctors/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+
+        self.user.is_staff = False
+        self.user.save()
+        response, _ = self.get('/api/doctors/cache-stats/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_tokens_without_claims_fall_back_to_a_lookup(self):
+        self.get()
+        self.authorize(RefreshToken.for_user(self.user))
+        response, queries = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, 3)
+
+
+class TokenRefreshTests(TestCase):
+    """Refresh tokens rotate, and revoked ones are rejected from memory."""
+
+    def setUp(self):
+        revocation.clear()
+        self.user = User.objects.create_user(
+            email='tester@example.com', name='Tester', password='Test@12345'
+        )
+        self.refresh = str(UserRefreshToken.for_user(self.user))
+        self.client = APIClient()
+
+    def post_refresh(self, refresh):
+        return self.client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+
+    def test_refresh_rotates_and_rejects_reuse(self):
+        response = self.post_refresh(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['refresh']
+        self.assertNotEqual(rotated, self.refresh)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+        self.assertEqual(len(context.captured_queries), 0)
+
+        response = self.post_refresh(rotated)
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}')
+        self.assertEqual(self.client.get('/api/patients/').status_code, 200)
+
+    def test_revocations_from_other_processes_are_caught(self):
+        revocation.sync()
+        # Another process rotates the token before this one syncs again.
+        RevokedToken.objects.create(
+            jti=UserRefreshToken(self.refresh)['jti'], expires_at=timezone.now() + timedelta(days=1)
+        )
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+
+    def test_password_change_revokes_refresh_tokens(self):
+        self.user.set_password('Changed@12345')
+        self.user.save()
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+
+    def test_logout_revokes_refresh_and_access_tokens(self):
+        refresh = UserRefreshToken(self.refresh)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        response = self.client.post('/api/auth/logout/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/patients/').status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.post_refresh(self.refresh).status_code, 401)
+
+
+class PasswordHashingTests(TestCase):
+    """Logins upgrade old hashes, and the async views hash in the thread pool."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='tester@example.com', name='Tester', password='Test@12345'
+        )
+        # A hash from before the switch to scrypt.
+        self.user.password = make_password('Test@12345', hasher='pbkdf2_sha256')
+        self.user.save()
+        self.token_version = self.user.token_version
+
+    async def post(self, view_class, path, data):
+        request = AsyncRequestFactory().post(
+            path, json.dumps(data), content_type='application/json'
+        )
+        response = await view_class.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    def assertUpgraded(self):
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+        self.assertTrue(self.user.check_password('Test@12345'))
+        self.assertEqual(self.user.token_version, self.token_version)
+
+    def test_login_rehashes_without_revoking_tokens(self):
+        response = self.client.post(
+            '/api/auth/login/', {'email': 'tester@example.com', 'password': 'Test@12345'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertUpgraded()
+
+    async def test_async_login(self):
+        status_code, _ = await self.post(
+            AsyncUserLoginView, '/api/auth/login/',
+            {'email': 'tester@example.com', 'password': 'wrong-password'}
+        )
+        self.assertEqual(status_code, 401)
+
+        status_code, data = await self.post(
+            AsyncUserLoginView, '/api/auth/login/',
+            {'email': 'tester@example.com', 'password': 'Test@12345'}
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data['user']['email'], 'tester@example.com')
+        await sync_to_async(self.assertUpgraded)()
+
+    async def test_async_registration(self):
+        status_code, data = await self.post(
+            AsyncUserRegistrationView, '/api/auth/register/',
+            {'name': 'New', 'email': 'new@example.com',
+             'password': 'Sunrise@2024', 'password_confirm': 'Sunrise@2024'}
+        )
+        self.assertEqual(status_code, 201)
+        self.assertIn('access', data['tokens'])
+
+        status_code, data = await self.post(
+            AsyncUserRegistrationView, '/api/auth/register/',
+            {'name': 'New', 'email': 'new@example.com',
+             'password': 'Sunrise@2024', 'password_confirm': 'Sunrise@2024'}
+        )
+        self.assertEqual(status_code, 400)
+        self.assertIn('email', data)
+
+        user = await User.objects.aget(email='new@example.com')
+        self.assertTrue(user.check_password('Sunrise@2024'))
+
+
+class ImportRecordsTests(TestCase):
+    """An interrupted import resumes after the last chunk it committed."""
+
+    def setUp(self):
+        User.objects.create_user(email='owner@example.com', name='Owner', password='Test@12345')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'patients.ndjson')
+        with open(self.path, 'w', encoding='utf-8') as handle:
+            for i in range(5):
+                handle.write(json.dumps({
+                    'user_email': 'owner@example.com', 'name': f'Patient {i}', 'age': 30,
+                    'gender': 'F', 'phone': '9123456780', 'address': 'Green Park, New Delhi',
+                }) + '\n')
+
+    def import_records(self, *args):
+        call_command('import_records', 'patients', self.path, '--chunk-size', '2', *args, stdout=io.StringIO())
+
+    def test_resume_after_a_failed_chunk(self):
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('Connection lost')
+            return load_rows(*args, **kwargs)
+
+        with mock.patch.object(import_records, 'load_rows', fail_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.import_records()
+        self.assertEqual(Patient.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().rows, 2)
+
+        self.import_records('--resume')
+        self.assertEqual(
+            sorted(Patient.objects.values_list('name', flat=True)), [f'Patient {i}' for i in range(5)]
+        )
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+
+class BulkLoadColumnsTests(TestCase):
+    """COPY leaves out every column it is not given, so those need a database default."""
+
+    def assertCoversRequiredColumns(self, model, fields):
+        required = [
+            field.attname for field in model._meta.concrete_fields
+            if not field.null and not field.primary_key and field.db_default is NOT_PROVIDED
+        ]
+        self.assertEqual([name for name in required if name not in fields], [], model.__name__)
+
+    def test_generate_data(self):
+        command = generate_data.Command
+        self.assertCoversRequiredColumns(User, command.user_fields)
+        self.assertCoversRequiredColumns(Doctor, command.doctor_fields)
+        self.assertCoversRequiredColumns(Patient, command.patient_fields)
+        self.assertCoversRequiredColumns(PatientDoctorMapping, command.mapping_fields)
+
+    def test_import_records(self):
+        command = import_records.Command()
+        for loader in import_records.LOADERS.values():
+            stamps = command.timestamp_values(loader.model, timezone.now())
+            self.assertCoversRequiredColumns(loader.model, loader.fields + list(stamps))
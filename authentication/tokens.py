@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Claims carried by every token so requests can be authenticated without
+# loading the user; see authentication.authentication.StatelessJWTAuthentication.
+PRINCIPAL_CLAIMS = ('email', 'name', 'is_staff')
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose access tokens identify the user by their claims alone."""
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in PRINCIPAL_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
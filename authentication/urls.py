@@ -1,7 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from .views import UserRegistrationView, UserLoginView
+from .views import (
+    UserRegistrationView,
+    UserLoginView,
+    TokenRefreshView,
+    LogoutView,
+    AsyncUserRegistrationView,
+    AsyncUserLoginView
+)
+
+if settings.ASYNC_VIEWS:
+    register_view, login_view = AsyncUserRegistrationView, AsyncUserLoginView
+else:
+    register_view, login_view = UserRegistrationView, UserLoginView
 
 urlpatterns = [
-    path('register/', UserRegistrationView.as_view(), name='register'),
-    path('login/', UserLoginView.as_view(), name='login'),
+    path('register/', register_view.as_view(), name='register'),
+    path('login/', login_view.as_view(), name='login'),
+    path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('logout/', LogoutView.as_view(), name='logout'),
 ]
@@ -1,10 +1,42 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
+from healthcare_backend.async_views import AsyncAPIView
+from .authentication import StatelessJWTAuthentication
+from .tokens import UserRefreshToken
+from .serializers import (
+    UserRegistrationSerializer,
+    UserLoginSerializer,
+    UserSerializer,
+    RefreshTokenSerializer
+)
+from . import hashing, revocation
+
+
+def token_response(message, user, status_code):
+    """Return the user's details with a fresh pair of JWT tokens."""
+    refresh = UserRefreshToken.for_user(user)
+    return Response({
+        'message': message,
+        'user': UserSerializer(user).data,
+        'tokens': {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+        }
+    }, status=status_code)
+
+
+def invalid_credentials_response():
+    """Return the error sent for a wrong email or password."""
+    return Response(
+        {'error': 'Invalid email or password'},
+        status=status.HTTP_401_UNAUTHORIZED
+    )
 
 
 class UserRegistrationView(APIView):
@@ -18,18 +50,7 @@ class UserRegistrationView(APIView):
         
         if serializer.is_valid():
             user = serializer.save()
-            
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
-            return Response({
-                'message': 'User registered successfully',
-                'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            }, status=status.HTTP_201_CREATED)
+            return token_response('User registered successfully', user, status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -51,21 +72,133 @@ class UserLoginView(APIView):
             user = authenticate(request, username=email, password=password)
             
             if user is not None:
-                # Generate JWT tokens
-                refresh = RefreshToken.for_user(user)
-                
-                return Response({
-                    'message': 'Login successful',
-                    'user': UserSerializer(user).data,
-                    'tokens': {
-                        'refresh': str(refresh),
-                        'access': str(refresh.access_token),
-                    }
-                }, status=status.HTTP_200_OK)
+                return token_response('Login successful', user, status.HTTP_200_OK)
+            else:
+                return invalid_credentials_response()
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def parse_refresh_token(raw_token):
+    """Return the validated refresh token, or raise a 401 error."""
+    try:
+        return UserRefreshToken(raw_token)
+    except TokenError as e:
+        raise InvalidToken(e.args[0])
+
+
+class TokenRefreshView(APIView):
+    """API view exchanging a refresh token for a new access token."""
+    
+    permission_classes = [AllowAny]
+    # The refresh token in the body is the credential; an expired access
+    # token in the header must not get in the way.
+    authentication_classes = []
+    
+    def get_authenticate_header(self, request):
+        """Answer invalid tokens with 401, not 403."""
+        return StatelessJWTAuthentication().authenticate_header(request)
+    
+    def post(self, request):
+        """Issue a new access token, rotating the refresh token."""
+        serializer = RefreshTokenSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            refresh = parse_refresh_token(serializer.validated_data['refresh'])
+            # Same checks as an access token: revoked id, inactive user, changed password.
+            authenticator = StatelessJWTAuthentication()
+            user = authenticator.get_user(refresh)
+            
+            if not jwt_settings.ROTATE_REFRESH_TOKENS:
+                return Response({'access': str(refresh.access_token)}, status=status.HTTP_200_OK)
+            
+            # Revoking is the authoritative check: only one caller can rotate a token.
+            if jwt_settings.BLACKLIST_AFTER_ROTATION and not revocation.revoke(refresh):
+                raise authenticator.revoked()
+            
+            if authenticator.is_stateless(refresh):
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
             else:
+                # Tokens from before the user claims existed are reissued with them.
+                refresh = UserRefreshToken.for_user(user)
+            
+            return Response({
+                'access': str(refresh.access_token),
+                'refresh': str(refresh),
+            }, status=status.HTTP_200_OK)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LogoutView(APIView):
+    """API view revoking the caller's refresh and access tokens."""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        """Revoke the given refresh token and the access token used for this request."""
+        serializer = RefreshTokenSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            refresh = parse_refresh_token(serializer.validated_data['refresh'])
+            
+            if refresh.get(jwt_settings.USER_ID_CLAIM) != request.user.pk:
                 return Response(
-                    {'error': 'Invalid email or password'},
-                    status=status.HTTP_401_UNAUTHORIZED
+                    {'error': 'Refresh token belongs to another user'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
+            
+            revocation.revoke(refresh)
+            if request.auth is not None:
+                revocation.revoke(request.auth)
+            return Response({
+                'message': 'Logout successful'
+            }, status=status.HTTP_200_OK)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncUserRegistrationView(AsyncAPIView):
+    """Async API view for user registration, hashing the password in a thread pool."""
+    
+    sync_view_class = UserRegistrationView
+    async_methods = ('post',)
+    authentication_required = False
+    
+    async def post(self, request):
+        """Handle POST request for user registration."""
+        serializer = UserRegistrationSerializer(data=request.data)
+        
+        if await sync_to_async(serializer.is_valid)():
+            password_hash = await hashing.amake_password(serializer.validated_data['password'])
+            user = await sync_to_async(serializer.save)(password_hash=password_hash)
+            return token_response('User registered successfully', user, status.HTTP_201_CREATED)
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncUserLoginView(AsyncAPIView):
+    """Async API view for user login, checking the password in a thread pool."""
+    
+    sync_view_class = UserLoginView
+    async_methods = ('post',)
+    authentication_required = False
+    
+    async def post(self, request):
+        """Handle POST request for user login."""
+        serializer = UserLoginSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            user = await hashing.aauthenticate(
+                serializer.validated_data['email'],
+                serializer.validated_data['password']
+            )
+            
+            if user is not None:
+                return token_response('Login successful', user, status.HTTP_200_OK)
+            else:
+                return invalid_credentials_response()
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,121 @@
+"""
+Versioned read-through cache for the doctor directory.
+
+Payloads are stored under the current directory version. Writes bump the
+version, which invalidates every list page and detail payload at once.
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'doctors:version'
+
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the cache backend configured by DOCTOR_CACHE_ALIAS."""
+    return caches[settings.DOCTOR_CACHE_ALIAS]
+
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def get_version():
+    """Return the current directory version, initialising it if missing."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version never resurrects old entries.
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_version():
+    """Async version of `get_version`."""
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate every cached doctor payload."""
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+    _record('invalidations')
+
+
+def list_key(url):
+    """Return the cache key for a list page identified by its full URL."""
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return f'doctors:list:{digest}'
+
+
+def detail_key(pk):
+    """Return the cache key for a single doctor payload."""
+    return f'doctors:detail:{pk}'
+
+
+def state_key(key):
+    """Return the cache key for the conditional-request state of the payload under `key`."""
+    return f'{key}:state'
+
+
+def get_or_set(key, build):
+    """Return the cached payload for `key`, calling `build()` on a miss."""
+    cache = get_cache()
+    version = get_version()
+    data = cache.get(key, version=version)
+    if data is not None:
+        _record('hits')
+        return data
+
+    _record('misses')
+    data = build()
+    cache.set(key, data, timeout=settings.DOCTOR_CACHE_TIMEOUT, version=version)
+    return data
+
+
+async def aget_or_set(key, build):
+    """Async version of `get_or_set`; `build` is a coroutine function."""
+    cache = get_cache()
+    version = await aget_version()
+    data = await cache.aget(key, version=version)
+    if data is not None:
+        _record('hits')
+        return data
+
+    _record('misses')
+    data = await build()
+    await cache.aset(key, data, timeout=settings.DOCTOR_CACHE_TIMEOUT, version=version)
+    return data
+
+
+def get_stats():
+    """Return this process's hit, miss and invalidation counters."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_stats():
+    """Zero this process's counters."""
+    with _stats_lock:
+        for counter in _stats:
+            _stats[counter] = 0
@@ -0,0 +1,13 @@
+from django.db import migrations
+from healthcare_backend.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_doctor_indexes'),
+    ]
+
+    operations = [
+        CreateSearchIndex(model_name='doctor', fields=['name', 'specialization']),
+    ]
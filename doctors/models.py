@@ -26,6 +26,9 @@ class Doctor(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Columns searched by `?q=`; keep in step with the search index migration.
+    SEARCH_FIELDS = ['name', 'specialization']
+    
     def __str__(self):
         return f"Dr. {self.name} - {self.specialization}"
     
@@ -34,3 +37,10 @@ class Doctor(models.Model):
         verbose_name = 'Doctor'
         verbose_name_plural = 'Doctors'
         ordering = ['-created_at']
+        indexes = [
+            # Directory listing, newest first, optionally by specialization.
+            models.Index(fields=['-created_at', '-id'], name='doctors_created_idx'),
+            models.Index(fields=['specialization', '-created_at', '-id'], name='doctors_spec_created_idx'),
+            # Uniqueness check in DoctorSerializer.validate_email.
+            models.Index(fields=['email'], name='doctors_email_idx'),
+        ]
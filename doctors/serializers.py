@@ -1,8 +1,12 @@
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+from healthcare_backend.serializers import SparseFieldsetMixin
+from mappings.models import PatientDoctorMapping
 from .models import Doctor
 
 
-class DoctorSerializer(serializers.ModelSerializer):
+class DoctorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Doctor model."""
     
     class Meta:
@@ -14,6 +18,14 @@ class DoctorSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    # Columns read while serializing.
+    select_related_fields = []
+    only_fields = [
+        'id', 'name', 'specialization', 'phone', 'email',
+        'experience_years', 'qualification', 'address',
+        'created_at', 'updated_at',
+    ]
+    
     def validate_experience_years(self, value):
         """Validate experience years is positive."""
         if value < 0 or value > 70:
@@ -28,6 +40,9 @@ class DoctorSerializer(serializers.ModelSerializer):
     
     def validate_email(self, value):
         """Validate email uniqueness for create operation."""
+        if self.context.get('bulk'):
+            # Checked for the whole batch at once by DoctorBulkView.validate_batch.
+            return value
         if self.instance is None:  # Creating new doctor
             if Doctor.objects.filter(email=value).exists():
                 raise serializers.ValidationError("A doctor with this email already exists.")
@@ -35,3 +50,43 @@ class DoctorSerializer(serializers.ModelSerializer):
             if Doctor.objects.filter(email=value).exclude(id=self.instance.id).exists():
                 raise serializers.ValidationError("A doctor with this email already exists.")
         return value
+
+
+class DoctorWorkloadSerializer(DoctorSerializer):
+    """Serializer for a doctor with their patient count and latest assignment date."""
+    
+    patient_count = serializers.IntegerField(read_only=True)
+    last_assigned_date = serializers.DateField(read_only=True)
+    
+    class Meta(DoctorSerializer.Meta):
+        fields = DoctorSerializer.Meta.fields + ['patient_count', 'last_assigned_date']
+    
+    @classmethod
+    def annotate_workload(cls, queryset):
+        """
+        Add `patient_count` and `last_assigned_date` as correlated subqueries.
+        
+        They run only for the rows actually returned, each as an index-only
+        lookup on (doctor, assigned_date), instead of grouping every mapping.
+        """
+        mappings = PatientDoctorMapping.objects.filter(doctor=OuterRef('pk')).order_by().values('doctor')
+        return queryset.annotate(
+            patient_count=Coalesce(Subquery(mappings.annotate(count=Count('*')).values('count')), Value(0)),
+            last_assigned_date=Subquery(mappings.annotate(latest=Max('assigned_date')).values('latest')),
+        )
+
+
+class DoctorRosterSerializer(serializers.ModelSerializer):
+    """Serializer for one patient on a doctor's roster."""
+    
+    patient_name = serializers.CharField(source='patient.name', read_only=True)
+    patient_age = serializers.IntegerField(source='patient.age', read_only=True)
+    patient_gender = serializers.CharField(source='patient.gender', read_only=True)
+    patient_phone = serializers.CharField(source='patient.phone', read_only=True)
+    
+    class Meta:
+        model = PatientDoctorMapping
+        fields = [
+            'id', 'patient', 'patient_name', 'patient_age', 'patient_gender',
+            'patient_phone', 'assigned_date', 'notes'
+        ]
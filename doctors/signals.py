@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Doctor
+from . import cache
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_cache(sender, **kwargs):
+    """Bump the directory version once the write is committed."""
+    transaction.on_commit(cache.bump_version)
@@ -1,3 +1,306 @@
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.test import TestCase
+from healthcare_backend.testing import AsyncViewMixin, QueryCountMixin
+from mappings.models import PatientDoctorMapping
+from patients.models import Patient
+from .models import Doctor
+from .views import (
+    AsyncDoctorListCreateView,
+    AsyncDoctorDetailView,
+    AsyncDoctorWorkloadView,
+    AsyncDoctorPatientsView
+)
+from . import cache as doctor_cache
+
+
+def create_doctor(i=0, **fields):
+    return Doctor.objects.create(**{
+        'name': f'Dr. Doctor {i}',
+        'specialization': 'CARDIOLOGY',
+        'phone': '9876543210',
+        'email': f'doctor{i}@hospital.org',
+        'experience_years': 10,
+        'qualification': 'MBBS, MD',
+        'address': 'AIIMS, New Delhi',
+        **fields,
+    })
+
+
+class DoctorQueryCountTests(QueryCountMixin, TestCase):
+    """Doctor endpoints must not issue a query per row."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = self.create_authenticated_client()
+        self.doctor = self.create_doctors(1)[0]
+    
+    def create_doctors(self, count):
+        start = Doctor.objects.count()
+        # Run the cache invalidation hooks so the next read hits the database.
+        with self.captureOnCommitCallbacks(execute=True):
+            return [create_doctor(i) for i in range(start, start + count)]
+    
+    # A cache miss runs the conditional-request aggregate, then the page query.
+    def test_list_query_count(self):
+        self.assertConstantQueries(self.client, '/api/doctors/', 2, self.create_doctors)
+    
+    def test_detail_query_count(self):
+        self.assertConstantQueries(
+            self.client, f'/api/doctors/{self.doctor.pk}/', 2, self.create_doctors
+        )
+
+
+class DoctorCacheTests(QueryCountMixin, TestCase):
+    """The doctor directory is served from cache until a doctor changes."""
+    
+    def setUp(self):
+        cache.clear()
+        doctor_cache.reset_stats()
+        self.client, self.user = self.create_authenticated_client()
+        self.doctor = create_doctor()
+        self.url = f'/api/doctors/{self.doctor.pk}/'
+    
+    def test_repeated_reads_are_cached(self):
+        self.assertEqual(self.count_queries(self.client, '/api/doctors/'), 2)
+        self.assertEqual(self.count_queries(self.client, '/api/doctors/'), 0)
+        self.assertEqual(self.count_queries(self.client, self.url), 2)
+        self.assertEqual(self.count_queries(self.client, self.url), 0)
+        # Each read looks up the conditional-request state and the payload.
+        stats = doctor_cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (4, 4))
+    
+    def test_update_invalidates_cache(self):
+        self.client.get(self.url)
+        self.client.get('/api/doctors/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.url, {'experience_years': 16}, format='json')
+        
+        self.assertEqual(self.client.get(self.url).json()['experience_years'], 16)
+        self.assertEqual(
+            self.client.get('/api/doctors/').json()['results'][0]['experience_years'], 16
+        )
+    
+    def test_unchanged_doctors_are_not_modified_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.url, {'experience_years': 16}, format='json')
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_delete_invalidates_cache(self):
+        self.client.get('/api/doctors/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.url)
+        
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get('/api/doctors/').json()['results'], [])
+        response = self.client.get(self.url, headers={'If-None-Match': '*'})
+        self.assertEqual(response.status_code, 404)
+
+
+class DoctorBulkTests(QueryCountMixin, TestCase):
+    """Bulk doctor writes check email uniqueness once per batch."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = self.create_authenticated_client()
+        create_doctor(0)
+    
+    def payload(self, indexes):
+        return [
+            {
+                'name': f'Dr. Doctor {i}',
+                'specialization': 'NEUROLOGY',
+                'phone': '9876543210',
+                'email': f'doctor{i}@hospital.org',
+                'experience_years': 5,
+                'qualification': 'MBBS',
+                'address': 'Max Hospital, Saket',
+            }
+            for i in indexes
+        ]
+    
+    def test_create_query_count_is_independent_of_batch_size(self):
+        for start, count in ((1, 5), (6, 50)):
+            with self.assertNumQueries(5):
+                response = self.client.post(
+                    '/api/doctors/bulk/', self.payload(range(start, start + count)), format='json'
+                )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Doctor.objects.count(), 56)
+    
+    def test_duplicate_emails_are_reported_per_item(self):
+        response = self.client.post('/api/doctors/bulk/', self.payload([0, 1, 1]), format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [0, 2])
+        self.assertEqual(Doctor.objects.count(), 1)
+
+
+class DoctorSearchTests(QueryCountMixin, TestCase):
+    """`?q=` matches doctors by name or specialization, best match first."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = self.create_authenticated_client()
+        create_doctor(1, name='Dr. Anjali Mehta', specialization='NEUROLOGY')
+        create_doctor(2, name='Dr. Arjun Mehta Mehta', specialization='CARDIOLOGY')
+        create_doctor(3, name='Dr. Kavita Rao', specialization='PEDIATRICS')
+    
+    def search(self, query):
+        response = self.client.get('/api/doctors/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [doctor['name'] for doctor in response.json()['results']]
+    
+    def test_name_and_specialization_prefixes(self):
+        self.assertEqual(self.search('cardio'), ['Dr. Arjun Mehta Mehta'])
+        self.assertEqual(self.search('meh neuro'), ['Dr. Anjali Mehta'])
+        self.assertEqual(self.search('kav'), ['Dr. Kavita Rao'])
+    
+    def test_results_are_ranked(self):
+        self.assertEqual(self.search('mehta'), ['Dr. Arjun Mehta Mehta', 'Dr. Anjali Mehta'])
+    
+    def test_queries_without_words_match_nothing(self):
+        self.assertEqual(self.search('*"-'), [])
+
+
+class DoctorFilterTests(QueryCountMixin, TestCase):
+    """Doctor list filters and sparse fieldsets, including through the cache."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = self.create_authenticated_client()
+        create_doctor(1, specialization='NEUROLOGY', experience_years=5)
+        create_doctor(2, specialization='CARDIOLOGY', experience_years=20)
+        create_doctor(3, specialization='PEDIATRICS', experience_years=12)
+    
+    def get(self, params):
+        response = self.client.get('/api/doctors/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+    
+    def test_filters(self):
+        doctors = self.get({'specialization__in': 'NEUROLOGY,PEDIATRICS', 'experience_years__gte': 10})
+        self.assertEqual([doctor['email'] for doctor in doctors], ['doctor3@hospital.org'])
+        self.assertEqual(len(self.get({'specialization': 'CARDIOLOGY'})), 1)
+    
+    def test_invalid_choice_is_rejected(self):
+        response = self.client.get('/api/doctors/', {'specialization': 'ASTROLOGY'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('specialization', response.json())
+    
+    def test_sparse_fieldset(self):
+        doctors = self.get({'fields': 'name,specialization'})
+        self.assertEqual([set(doctor) for doctor in doctors], [{'name', 'specialization'}] * 3)
+        self.assertEqual(set(self.get({})[0]), {
+            'id', 'name', 'specialization', 'phone', 'email', 'experience_years',
+            'qualification', 'address', 'created_at', 'updated_at',
+        })
+
+
+class DoctorWorkloadTests(QueryCountMixin, TestCase):
+    """Rosters and patient counts are read in one query however many mappings exist."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        _, self.other_user = self.create_authenticated_client('other@example.com', 'Other')
+        self.doctor = create_doctor(0)
+        self.idle_doctor = create_doctor(1)
+        self.assign(3, self.user)
+        self.assign(2, self.other_user, assigned_date=datetime.date(2030, 1, 1))
+    
+    def assign(self, count, user, doctor=None, **fields):
+        for _ in range(count):
+            patient = Patient.objects.create(
+                user=user, name=f'Patient {Patient.objects.count()}', age=30, gender='F',
+                phone='9123456780', address='Delhi'
+            )
+            mapping = PatientDoctorMapping.objects.create(patient=patient, doctor=doctor or self.doctor)
+            if fields:
+                PatientDoctorMapping.objects.filter(pk=mapping.pk).update(**fields)
+    
+    def test_roster_lists_own_patients_newest_first(self):
+        response = self.client.get(f'/api/doctors/{self.doctor.pk}/patients/')
+        self.assertEqual(response.status_code, 200)
+        roster = response.json()['results']
+        self.assertEqual([entry['patient_name'] for entry in roster], ['Patient 2', 'Patient 1', 'Patient 0'])
+        self.assertEqual(set(roster[0]), {
+            'id', 'patient', 'patient_name', 'patient_age', 'patient_gender',
+            'patient_phone', 'assigned_date', 'notes',
+        })
+    
+    def test_roster_of_unknown_or_idle_doctor(self):
+        self.assertEqual(self.client.get('/api/doctors/999999/patients/').status_code, 404)
+        response = self.client.get(f'/api/doctors/{self.idle_doctor.pk}/patients/')
+        self.assertEqual(response.json()['results'], [])
+    
+    def test_roster_query_count(self):
+        self.assertConstantQueries(
+            self.client, f'/api/doctors/{self.doctor.pk}/patients/', 2,
+            lambda count: self.assign(count, self.user)
+        )
+    
+    def test_roster_revalidation(self):
+        url = f'/api/doctors/{self.doctor.pk}/patients/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assign(1, self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    def test_workload_counts_every_patient(self):
+        response = self.client.get('/api/doctors/workload/')
+        self.assertEqual(response.status_code, 200)
+        workload = {
+            doctor['id']: (doctor['patient_count'], doctor['last_assigned_date'])
+            for doctor in response.json()['results']
+        }
+        self.assertEqual(workload, {self.doctor.pk: (5, '2030-01-01'), self.idle_doctor.pk: (0, None)})
+    
+    def test_workload_filters_and_fields(self):
+        response = self.client.get('/api/doctors/workload/', {
+            'specialization': 'CARDIOLOGY', 'fields': 'name,patient_count',
+        })
+        self.assertEqual(response.json()['results'][-1], {'name': 'Dr. Doctor 0', 'patient_count': 5})
+    
+    def test_workload_query_count(self):
+        def grow(count):
+            for i in range(count):
+                self.assign(2, self.user, doctor=create_doctor(100 + Doctor.objects.count()))
+        self.assertConstantQueries(self.client, '/api/doctors/workload/', 1, grow)
+
 
-# Create your tests here.
+class DoctorAsyncViewTests(AsyncViewMixin, QueryCountMixin, TestCase):
+    """The async views return the same payloads as the synchronous ones."""
+    
+    def setUp(self):
+        cache.clear()
+        self.client, self.user = self.create_authenticated_client()
+        self.doctor = create_doctor()
+    
+    async def test_list_and_detail_match_sync_views(self):
+        await self.assertSameResponse(self.client, AsyncDoctorListCreateView, '/api/doctors/', self.user)
+        await self.assertSameResponse(
+            self.client, AsyncDoctorDetailView, f'/api/doctors/{self.doctor.pk}/',
+            self.user, pk=self.doctor.pk
+        )
+    
+    async def test_workload_and_roster_match_sync_views(self):
+        await self.assertSameResponse(
+            self.client, AsyncDoctorWorkloadView, '/api/doctors/workload/', self.user
+        )
+        await self.assertSameResponse(
+            self.client, AsyncDoctorPatientsView, f'/api/doctors/{self.doctor.pk}/patients/',
+            self.user, pk=self.doctor.pk
+        )
+    
+    async def test_async_views_fill_the_cache(self):
+        await self.call_async_view(AsyncDoctorListCreateView, '/api/doctors/', self.user)
+        self.assertEqual(await sync_to_async(self.count_queries)(self.client, '/api/doctors/'), 0)
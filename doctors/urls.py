@@ -1,7 +1,30 @@
+from django.conf import settings
 from django.urls import path
-from .views import DoctorListCreateView, DoctorDetailView
+from .views import (
+    DoctorListCreateView,
+    DoctorDetailView,
+    DoctorBulkView,
+    DoctorCacheStatsView,
+    DoctorWorkloadView,
+    DoctorPatientsView,
+    AsyncDoctorListCreateView,
+    AsyncDoctorDetailView,
+    AsyncDoctorWorkloadView,
+    AsyncDoctorPatientsView
+)
+
+if settings.ASYNC_VIEWS:
+    list_view, detail_view = AsyncDoctorListCreateView, AsyncDoctorDetailView
+    workload_view, patients_view = AsyncDoctorWorkloadView, AsyncDoctorPatientsView
+else:
+    list_view, detail_view = DoctorListCreateView, DoctorDetailView
+    workload_view, patients_view = DoctorWorkloadView, DoctorPatientsView
 
 urlpatterns = [
-    path('', DoctorListCreateView.as_view(), name='doctor-list-create'),
-    path('<int:pk>/', DoctorDetailView.as_view(), name='doctor-detail'),
+    path('', list_view.as_view(), name='doctor-list-create'),
+    path('<int:pk>/', detail_view.as_view(), name='doctor-detail'),
+    path('<int:pk>/patients/', patients_view.as_view(), name='doctor-patients'),
+    path('workload/', workload_view.as_view(), name='doctor-workload'),
+    path('bulk/', DoctorBulkView.as_view(), name='doctor-bulk'),
+    path('cache-stats/', DoctorCacheStatsView.as_view(), name='doctor-cache-stats'),
 ]
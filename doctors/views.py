@@ -1,22 +1,77 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.db import transaction
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from healthcare_backend.async_views import AsyncAPIView
+from healthcare_backend.bulk import BulkAPIView, delete_rows
+from healthcare_backend import conditional
+from healthcare_backend.filters import filter_queryset
+from healthcare_backend import search
+from healthcare_backend.pagination import (
+    KeysetPagination, SearchPagination, aget_page_response, get_page_response
+)
+from healthcare_backend.serializers import get_values_serializer
+from mappings.models import PatientDoctorMapping
 from .models import Doctor
-from .serializers import DoctorSerializer
+from .serializers import DoctorSerializer, DoctorWorkloadSerializer, DoctorRosterSerializer
+from . import cache as doctor_cache
 
 
-class DoctorListCreateView(APIView):
+class DoctorListMixin:
+    """Queryset and response building shared by the sync and async doctor list views."""
+    
+    pagination_class = KeysetPagination
+    search_pagination_class = SearchPagination
+    filterset_fields = {
+        'specialization': ['exact', 'in'],
+        'experience_years': ['exact', 'gte', 'lte'],
+    }
+    
+    def get_queryset(self, request):
+        """Return the doctors matching the request's filters."""
+        return filter_queryset(Doctor.objects.all(), request, self.filterset_fields)
+    
+    def get_listing(self, request):
+        """
+        Return the paginator, values() serializer and queryset serving one page
+        of doctors, or of `?q=` matches ranked by relevance.
+        """
+        serializer = get_values_serializer(
+            DoctorSerializer, DoctorSerializer.get_requested_fields(request)
+        )
+        doctors = self.get_queryset(request)
+        query = search.get_query(request)
+        if query:
+            doctors = search.search(doctors, query)
+            paginator = self.search_pagination_class()
+        else:
+            paginator = self.pagination_class()
+        return paginator, serializer, serializer.get_queryset(doctors)
+
+
+class DoctorListCreateView(DoctorListMixin, APIView):
     """API view for listing and creating doctors."""
     
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get all doctors."""
-        doctors = Doctor.objects.all()
-        serializer = DoctorSerializer(doctors, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Get all doctors, served from the directory cache when possible."""
+        key = doctor_cache.list_key(request.build_absolute_uri())
+        state = doctor_cache.get_or_set(
+            doctor_cache.state_key(key),
+            lambda: conditional.get_state(self.get_queryset(request))
+        )
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            data = doctor_cache.get_or_set(key, lambda: self.list_doctors(request))
+            response = Response(data, status=status.HTTP_200_OK)
+        return conditional.add_validators(response, request, state)
+    
+    def list_doctors(self, request):
+        """Serialize one page of doctors (or of `?q=` matches), or all of them if pagination is off."""
+        return get_page_response(*self.get_listing(request), request, view=self).data
     
     def post(self, request):
         """Create a new doctor."""
@@ -32,7 +87,19 @@ class DoctorListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DoctorDetailView(APIView):
+class DoctorDetailMixin:
+    """Queryset and response building shared by the sync and async doctor detail views."""
+    
+    def get_queryset(self, pk):
+        """Return a queryset holding doctor `pk`, if it exists."""
+        return Doctor.objects.filter(pk=pk)
+    
+    def get_detail_data(self, doctor):
+        """Serialize a single doctor."""
+        return DoctorSerializer(doctor).data
+
+
+class DoctorDetailView(DoctorDetailMixin, APIView):
     """API view for retrieving, updating, and deleting a doctor."""
     
     permission_classes = [IsAuthenticated]
@@ -42,10 +109,18 @@ class DoctorDetailView(APIView):
         return get_object_or_404(Doctor, pk=pk)
     
     def get(self, request, pk):
-        """Get details of a specific doctor."""
-        doctor = self.get_object(pk)
-        serializer = DoctorSerializer(doctor)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Get details of a specific doctor, served from the directory cache when possible."""
+        key = doctor_cache.detail_key(pk)
+        state = doctor_cache.get_or_set(
+            doctor_cache.state_key(key),
+            lambda: conditional.get_state(self.get_queryset(pk))
+        )
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            data = doctor_cache.get_or_set(key, lambda: self.get_detail_data(self.get_object(pk)))
+            response = Response(data, status=status.HTTP_200_OK)
+        return conditional.add_validators(response, request, state)
     
     def put(self, request, pk):
         """Update doctor details."""
@@ -63,8 +138,204 @@ class DoctorDetailView(APIView):
     
     def delete(self, request, pk):
         """Delete a doctor record."""
-        doctor = self.get_object(pk)
-        doctor.delete()
+        self.get_object(pk)
+        delete_rows(self.get_queryset(pk))
         return Response({
             'message': 'Doctor deleted successfully'
         }, status=status.HTTP_200_OK)
+
+
+class DoctorCacheStatsView(APIView):
+    """API view exposing the doctor directory cache counters."""
+    
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Get this worker's cache hit/miss counters and the current version."""
+        return Response({
+            'version': doctor_cache.get_version(),
+            **doctor_cache.get_stats(),
+        }, status=status.HTTP_200_OK)
+
+
+class DoctorWorkloadMixin:
+    """Queryset and response building shared by the sync and async doctor workload views."""
+    
+    replica_reads = True
+    pagination_class = KeysetPagination
+    filterset_fields = DoctorListMixin.filterset_fields
+    
+    def get_queryset(self, request):
+        """Return the doctors matching the request's filters, annotated with their workload."""
+        return DoctorWorkloadSerializer.annotate_workload(
+            filter_queryset(Doctor.objects.all(), request, self.filterset_fields)
+        )
+    
+    def get_listing(self, request):
+        """Return the paginator, values() serializer and queryset serving one page of doctors."""
+        serializer = get_values_serializer(
+            DoctorWorkloadSerializer, DoctorWorkloadSerializer.get_requested_fields(request)
+        )
+        return self.pagination_class(), serializer, serializer.get_queryset(self.get_queryset(request))
+
+
+class DoctorWorkloadView(DoctorWorkloadMixin, APIView):
+    """API view listing doctors with their patient counts and latest assignment date."""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        """Get one page of doctors with their workload, counted in the same query."""
+        return get_page_response(*self.get_listing(request), request, view=self)
+
+
+class DoctorPatientsMixin:
+    """Queryset and response building shared by the sync and async doctor roster views."""
+    
+    replica_reads = True
+    pagination_class = KeysetPagination
+    # Timestamps covering everything the roster renders, for the ETag.
+    modified_fields = ['updated_at', 'patient__updated_at']
+    
+    def get_queryset(self, request, pk):
+        """Return the doctor's mappings to the authenticated user's patients."""
+        return PatientDoctorMapping.objects.filter(doctor_id=pk, patient__user=request.user)
+    
+    def get_doctor_queryset(self, pk):
+        """Return a queryset holding doctor `pk`, to tell an empty roster from an unknown doctor."""
+        return Doctor.objects.only('pk').filter(pk=pk)
+    
+    def get_listing(self, mappings):
+        """Return the paginator, values() serializer and queryset serving one page of the roster."""
+        serializer = get_values_serializer(DoctorRosterSerializer)
+        return self.pagination_class(), serializer, serializer.get_queryset(mappings)
+
+
+class DoctorPatientsView(DoctorPatientsMixin, APIView):
+    """API view listing the authenticated user's patients assigned to a doctor."""
+    
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        """Get one page of the doctor's roster, most recently assigned first."""
+        mappings = self.get_queryset(request, pk)
+        state = conditional.get_state(mappings, self.modified_fields)
+        count, _ = state
+        if not count:
+            get_object_or_404(self.get_doctor_queryset(pk))
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = get_page_response(*self.get_listing(mappings), request, view=self)
+        return conditional.add_validators(response, request, state)
+
+
+class DoctorBulkView(BulkAPIView):
+    """API view for creating, updating, and deleting doctors in batches."""
+    
+    model = Doctor
+    serializer_class = DoctorSerializer
+    verbose_name_plural = 'doctors'
+    
+    def validate_batch(self, rows):
+        """Check email uniqueness for the whole batch with a single query."""
+        emails = [data['email'] for _, data, _ in rows if 'email' in data]
+        if not emails:
+            return {}
+        
+        taken = dict(Doctor.objects.filter(email__in=emails).values_list('email', 'id'))
+        # Doctors moving to a new email free up their old one within the batch.
+        released = {
+            instance.id for _, data, instance in rows
+            if instance is not None and data.get('email', instance.email) != instance.email
+        }
+        
+        errors, claimed = {}, set()
+        for index, data, instance in rows:
+            email = data.get('email')
+            if email is None:
+                continue
+            owner = taken.get(email)
+            own_id = instance.id if instance is not None else None
+            if email in claimed or (owner is not None and owner != own_id and owner not in released):
+                errors[index] = {'email': ['A doctor with this email already exists.']}
+            claimed.add(email)
+        return errors
+    
+    def after_write(self):
+        """bulk_create/bulk_update skip post_save, so invalidate the cache here."""
+        transaction.on_commit(doctor_cache.bump_version)
+
+
+class AsyncDoctorListCreateView(DoctorListMixin, AsyncAPIView):
+    """Async API view for listing doctors; creation is served by DoctorListCreateView."""
+    
+    sync_view_class = DoctorListCreateView
+    
+    async def get(self, request):
+        """Get all doctors, served from the directory cache when possible."""
+        key = doctor_cache.list_key(request.build_absolute_uri())
+        state = await doctor_cache.aget_or_set(
+            doctor_cache.state_key(key),
+            lambda: conditional.aget_state(self.get_queryset(request))
+        )
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            data = await doctor_cache.aget_or_set(key, lambda: self.list_doctors(request))
+            response = Response(data, status=status.HTTP_200_OK)
+        return conditional.add_validators(response, request, state)
+    
+    async def list_doctors(self, request):
+        """Serialize one page of doctors (or of `?q=` matches), or all of them if pagination is off."""
+        return (await aget_page_response(*self.get_listing(request), request, view=self)).data
+
+
+class AsyncDoctorDetailView(DoctorDetailMixin, AsyncAPIView):
+    """Async API view for retrieving a doctor; writes are served by DoctorDetailView."""
+    
+    sync_view_class = DoctorDetailView
+    
+    async def get(self, request, pk):
+        """Get details of a specific doctor, served from the directory cache when possible."""
+        key = doctor_cache.detail_key(pk)
+        state = await doctor_cache.aget_or_set(
+            doctor_cache.state_key(key),
+            lambda: conditional.aget_state(self.get_queryset(pk))
+        )
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            data = await doctor_cache.aget_or_set(key, lambda: self.retrieve_doctor(pk))
+            response = Response(data, status=status.HTTP_200_OK)
+        return conditional.add_validators(response, request, state)
+    
+    async def retrieve_doctor(self, pk):
+        """Serialize a single doctor."""
+        return self.get_detail_data(await aget_object_or_404(self.get_queryset(pk)))
+
+
+class AsyncDoctorWorkloadView(DoctorWorkloadMixin, AsyncAPIView):
+    """Async API view listing doctors with their patient counts and latest assignment date."""
+    
+    sync_view_class = DoctorWorkloadView
+    
+    async def get(self, request):
+        """Get one page of doctors with their workload, counted in the same query."""
+        return await aget_page_response(*self.get_listing(request), request, view=self)
+
+
+class AsyncDoctorPatientsView(DoctorPatientsMixin, AsyncAPIView):
+    """Async API view listing the authenticated user's patients assigned to a doctor."""
+    
+    sync_view_class = DoctorPatientsView
+    
+    async def get(self, request, pk):
+        """Get one page of the doctor's roster, most recently assigned first."""
+        mappings = self.get_queryset(request, pk)
+        state = await conditional.aget_state(mappings, self.modified_fields)
+        count, _ = state
+        if not count:
+            await aget_object_or_404(self.get_doctor_queryset(pk))
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = await aget_page_response(*self.get_listing(mappings), request, view=self)
+        return conditional.add_validators(response, request, state)
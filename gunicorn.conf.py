@@ -0,0 +1,11 @@
+"""
+Gunicorn settings, loaded from the working directory on startup.
+
+Worker and thread counts come from the environment so that Django's settings
+can size each worker's database pool from the same values.
+"""
+
+from decouple import config
+
+workers = config('WEB_CONCURRENCY', default=2, cast=int)
+threads = config('WEB_THREADS', default=4, cast=int)
@@ -0,0 +1,108 @@
+"""
+Async counterparts of the read-heavy API views.
+
+The views here answer GET requests on the event loop: the JWT is checked
+without blocking and the payload is loaded with the async ORM. Any other
+method is handed to the matching synchronous DRF view, so writes keep a
+single implementation. Serialization is shared too: the async
+views use the same list and detail mixins as the synchronous ones, so lists
+are read with the same `ValuesSerializer` and detail views with the same
+serializers and `setup_eager_loading` querysets.
+
+Enable them with the ASYNC_VIEWS setting and run the project under an ASGI
+server such as uvicorn.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from authentication.authentication import AsyncJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Base class for async API views.
+
+    Subclasses implement async handlers for the methods in `async_methods`
+    and return a DRF Response; `request` is a DRF Request whose user is
+    already authenticated, unless `authentication_required` is False. Errors
+    are raised as DRF exceptions and rendered with the same shape as DRF's
+    exception handler.
+    """
+
+    # Synchronous DRF view that serves every method not in `async_methods`.
+    sync_view_class = None
+    async_methods = ('get', 'head')
+    authentication_required = True
+    authentication_class = AsyncJWTAuthentication
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_class = api_settings.DEFAULT_RENDERER_CLASSES[0]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like DRF views, authentication is by token only, so CSRF does not apply.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        if method not in self.async_methods:
+            return await self.delegate(request, *args, **kwargs)
+
+        authenticator = self.authentication_class()
+        drf_request = Request(
+            request,
+            parsers=[parser() for parser in self.parser_classes],
+            authenticators=[]
+        )
+        try:
+            if self.authentication_required:
+                user_auth = await authenticator.aauthenticate(request)
+                if user_auth is None:
+                    raise exceptions.NotAuthenticated()
+                drf_request.user, drf_request.auth = user_auth
+            response = await getattr(self, method)(drf_request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return self.handle_exception(exc, authenticator, request)
+        return self.finalize_response(response)
+
+    async def delegate(self, request, *args, **kwargs):
+        """Serve the request with the synchronous view, in a worker thread."""
+        view = self.sync_view_class.as_view()
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    def handle_exception(self, exc, authenticator, request):
+        """Return the response DRF's exception handler would send for `exc`."""
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound()
+
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+
+        response = self.render(data, exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+        return response
+
+    def finalize_response(self, response):
+        """
+        Render a DRF Response into a plain HttpResponse here, on the event loop;
+        Django would otherwise render it in the sync thread.
+        """
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            if header.lower() != 'content-type':
+                rendered[header] = value
+        return rendered
+
+    def render(self, data, status_code):
+        renderer = self.renderer_class()
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        return HttpResponse(renderer.render(data), status=status_code, content_type=content_type)
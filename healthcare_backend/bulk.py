@@ -0,0 +1,224 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Sent inside the write transaction with the instances a batch created
+# (`created=True`) or updated, since bulk_create() and bulk_update() skip
+# post_save.
+bulk_saved = Signal()
+
+# Sent with the instances a batch is about to update, before their new
+# values are set, so receivers can note what the rows held.
+bulk_updating = Signal()
+
+# Sent by `delete_rows()` inside the delete's transaction, with the queryset
+# about to be deleted. Receivers can aggregate over its rows, and the rows
+# their deletion cascades to, in a few queries; a post_delete receiver would
+# run once per row and stop Django from fast-deleting cascaded rows.
+bulk_deleting = Signal()
+
+
+def delete_rows(queryset):
+    """Send `bulk_deleting`, then delete `queryset`, in one transaction."""
+    with transaction.atomic(using=queryset.db):
+        bulk_deleting.send(sender=queryset.model, queryset=queryset)
+        return queryset.delete()
+
+
+class BulkAPIView(APIView):
+    """
+    Base view for batch create (POST), update (PUT/PATCH) and delete (DELETE).
+
+    Every item is validated with `serializer_class` before anything is
+    written. Checks that would otherwise query the database once per row
+    (uniqueness, foreign keys) belong in `validate_batch`, which sees all the
+    valid rows at once. Writes are all-or-nothing: if any item fails, nothing
+    is saved and the response lists the errors by item index.
+    """
+
+    permission_classes = [IsAuthenticated]
+    model = None
+    serializer_class = None
+    output_serializer_class = None
+    verbose_name_plural = None
+    batch_size = 500
+
+    def get_queryset(self):
+        """Return the rows the requesting user may update or delete."""
+        return self.model.objects.all()
+
+    def get_serializer_context(self):
+        """Tell serializers to leave set-based checks to `validate_batch`."""
+        return {'request': self.request, 'bulk': True}
+
+    def get_output_serializer(self, instances):
+        serializer_class = self.output_serializer_class or self.serializer_class
+        return serializer_class(instances, many=True)
+
+    def validate_batch(self, rows):
+        """
+        Run set-based checks over `rows`, a list of (index, validated_data,
+        instance) tuples where instance is None for creates. Return a dict of
+        {index: errors} for the rows that fail.
+        """
+        return {}
+
+    def build_instance(self, validated_data):
+        """Return an unsaved model instance for a validated create item."""
+        return self.model(**validated_data)
+
+    def after_write(self):
+        """Hook for work bulk operations skip, such as model signals."""
+
+    def get_items(self, request):
+        """Return the request body as a list of items, enforcing the size limit."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({'non_field_errors': ['Expected a non-empty list of items.']})
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({
+                'non_field_errors': [f'At most {settings.BULK_MAX_ITEMS} items can be sent at once.']
+            })
+        return items
+
+    def get_ids(self, request):
+        """Return the `ids` list from the request body, enforcing the size limit."""
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError({'ids': ['Expected a non-empty list of ids.']})
+        if len(ids) > settings.BULK_MAX_ITEMS:
+            raise ValidationError({'ids': [f'At most {settings.BULK_MAX_ITEMS} ids can be sent at once.']})
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            raise ValidationError({'ids': ['Every id must be an integer.']})
+        return ids
+
+    def error_response(self, errors):
+        return Response({
+            'errors': [
+                {'index': index, 'errors': errors[index]} for index in sorted(errors)
+            ]
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    def conflict_response(self):
+        return Response(
+            {'error': 'A concurrent write conflicted with this batch. Please retry.'},
+            status=status.HTTP_409_CONFLICT
+        )
+
+    def post(self, request):
+        """Validate and create every item in one transaction."""
+        items = self.get_items(request)
+        context = self.get_serializer_context()
+        rows, errors = [], {}
+
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                rows.append((index, serializer.validated_data, None))
+            else:
+                errors[index] = serializer.errors
+
+        errors.update(self.validate_batch(rows))
+        if errors:
+            return self.error_response(errors)
+
+        instances = [self.build_instance(data) for _, data, _ in rows]
+        try:
+            with transaction.atomic():
+                created = self.model.objects.bulk_create(instances, batch_size=self.batch_size)
+                bulk_saved.send(sender=self.model, instances=created, created=True)
+                self.after_write()
+        except IntegrityError:
+            return self.conflict_response()
+
+        return Response({
+            'message': f'{len(created)} {self.verbose_name_plural} created successfully',
+            self.verbose_name_plural: self.get_output_serializer(created).data
+        }, status=status.HTTP_201_CREATED)
+
+    def put(self, request):
+        """Validate and apply a partial update to every item in one transaction."""
+        items = self.get_items(request)
+        context = self.get_serializer_context()
+        rows, errors, seen = [], {}, set()
+
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        instances = self.get_queryset().in_bulk(
+            [pk for pk in ids if isinstance(pk, int) and not isinstance(pk, bool)]
+        )
+
+        for index, (item, pk) in enumerate(zip(items, ids)):
+            instance = instances.get(pk) if isinstance(pk, int) else None
+            if instance is None:
+                errors[index] = {'id': ['Not found.']}
+                continue
+            if pk in seen:
+                errors[index] = {'id': ['Duplicate id in batch.']}
+                continue
+            seen.add(pk)
+
+            serializer = self.serializer_class(instance, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                rows.append((index, serializer.validated_data, instance))
+            else:
+                errors[index] = serializer.errors
+
+        errors.update(self.validate_batch(rows))
+        if errors:
+            return self.error_response(errors)
+
+        updated = [instance for _, _, instance in rows]
+        bulk_updating.send(sender=self.model, instances=updated)
+
+        # bulk_update() skips auto_now, so stamp updated_at explicitly.
+        now = timezone.now()
+        fields = {'updated_at'}
+        for _, data, instance in rows:
+            for field, value in data.items():
+                setattr(instance, field, value)
+            fields.update(data)
+            instance.updated_at = now
+
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_update(updated, sorted(fields), batch_size=self.batch_size)
+                bulk_saved.send(sender=self.model, instances=updated, created=False)
+                self.after_write()
+        except IntegrityError:
+            return self.conflict_response()
+
+        return Response({
+            'message': f'{len(updated)} {self.verbose_name_plural} updated successfully',
+            self.verbose_name_plural: self.get_output_serializer(updated).data
+        }, status=status.HTTP_200_OK)
+
+    def patch(self, request):
+        """Same as PUT; updates are always partial."""
+        return self.put(request)
+
+    def delete(self, request):
+        """Delete every listed id in one transaction."""
+        ids = self.get_ids(request)
+        queryset = self.get_queryset().filter(pk__in=ids)
+        found = set(queryset.values_list('pk', flat=True))
+
+        errors = {
+            index: {'id': ['Not found.']}
+            for index, pk in enumerate(ids) if pk not in found
+        }
+        if errors:
+            return self.error_response(errors)
+
+        with transaction.atomic():
+            delete_rows(queryset)
+            self.after_write()
+
+        return Response({
+            'message': f'{len(found)} {self.verbose_name_plural} deleted successfully'
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,51 @@
+from django.db import connection, transaction
+
+
+def copy_rows(model, fields, rows):
+    """Load rows (sequences in `fields` order) with PostgreSQL COPY FROM STDIN."""
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    )
+    with connection.cursor() as cursor:
+        with cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def bulk_create_rows(model, fields, rows, batch_size=1000):
+    """
+    Load rows (sequences in `fields` order) with batched INSERTs. Unlike
+    bulk_create, values given for auto_now and auto_now_add fields are kept;
+    the ones not given are set to the current time.
+    """
+    objs = [model(**dict(zip(fields, row))) for row in rows]
+    insert_fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    for field in insert_fields:
+        is_timestamp = getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        if is_timestamp and field.attname not in fields:
+            for obj in objs:
+                field.pre_save(obj, add=True)
+    batch_size = min(batch_size, connection.ops.bulk_batch_size(insert_fields, objs) or batch_size)
+    # A raw insert, as loaddata uses, writes the attribute values without calling pre_save().
+    with transaction.atomic(savepoint=False):
+        for start in range(0, len(objs), batch_size):
+            model._base_manager._insert(objs[start:start + batch_size], fields=insert_fields, raw=True)
+
+
+def load_rows(model, fields, rows, use_copy=None):
+    """
+    Insert rows as fast as the database allows: COPY on PostgreSQL, batched
+    INSERTs elsewhere. Model signals are not sent, and the given timestamps are
+    written as they are on every backend.
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    if use_copy is None:
+        use_copy = connection.vendor == 'postgresql'
+    if use_copy:
+        copy_rows(model, fields, rows)
+    else:
+        bulk_create_rows(model, fields, rows)
@@ -0,0 +1,98 @@
+"""
+Conditional GET support for list and detail views.
+
+A response's validators are derived from a single aggregate query over the
+rows it is built from: the row count and the newest `updated_at`, including
+those of related rows the serializer renders. That query touches no text
+columns and nothing is serialized, so a client revalidating with
+`If-None-Match` or `If-Modified-Since` gets a 304 without the listing query
+ever running.
+
+The ETag also covers the full request path (filters, fields, cursor) and the
+requesting user, so each representation has its own. Rows whose updated_at
+is written by hand (imports, bulk loads) must still stamp a newer time for
+the change to be seen.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+# Clients may keep a copy but must revalidate it; shared caches must not
+# store per-user responses.
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _aggregates(modified_fields):
+    return {
+        'count': Count('pk'),
+        **{f'modified_{index}': Max(field) for index, field in enumerate(modified_fields)},
+    }
+
+
+def _state(values):
+    modified = [value for key, value in values.items() if key != 'count' and value is not None]
+    return values['count'], max(modified, default=None)
+
+
+def get_state(queryset, modified_fields=('updated_at',)):
+    """Return (row count, newest of `modified_fields`) for `queryset` in one query."""
+    return _state(queryset.order_by().aggregate(**_aggregates(modified_fields)))
+
+
+async def aget_state(queryset, modified_fields=('updated_at',)):
+    """Async version of `get_state`."""
+    return _state(await queryset.order_by().aaggregate(**_aggregates(modified_fields)))
+
+
+def check_exists(state):
+    """
+    Raise Http404 if `state` covers no rows. Detail views call this before
+    `get_not_modified_response`, which would answer `If-None-Match: *` with a
+    304 for a row that does not exist.
+    """
+    count, _ = state
+    if not count:
+        raise Http404
+
+
+def get_etag(request, state):
+    """Return the strong ETag of the response to `request` for data in `state`."""
+    count, last_modified = state
+    key = '|'.join([
+        request.get_full_path(),
+        str(getattr(request.user, 'pk', '')),
+        str(count),
+        last_modified.isoformat() if last_modified else '',
+    ])
+    return quote_etag(hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+
+def get_not_modified_response(request, state):
+    """
+    Return a bodiless 304 (or 412) response if the client's copy is current,
+    else None. Either way the caller passes its response to `add_validators`.
+    """
+    _, last_modified = state
+    response = get_conditional_response(
+        request,
+        etag=get_etag(request, state),
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        return None
+    return Response(status=response.status_code)
+
+
+def add_validators(response, request, state):
+    """Set the ETag, Last-Modified and Cache-Control headers on `response`."""
+    _, last_modified = state
+    response['ETag'] = get_etag(request, state)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,168 @@
+"""
+PostgreSQL backend with connection metrics and an optional connection pool.
+
+Use "ENGINE": "healthcare_backend.db" in place of
+"django.db.backends.postgresql". Without a pool it behaves exactly like the
+stock backend (CONN_MAX_AGE and CONN_HEALTH_CHECKS apply as usual) and only
+counts the connections it opens and closes.
+
+Setting OPTIONS["pool"] to True, or to a dict of `psycopg_pool.
+ConnectionPool` arguments (min_size, max_size, timeout, ...), hands out
+connections from a per-process pool instead, as Django 5.1's backend does:
+closing a connection returns it to the pool, so CONN_MAX_AGE must be 0. The
+pool is opened on first use, after the server has forked its workers. With
+CONN_HEALTH_CHECKS the pool tests each connection before handing it out.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    ConnectionPool = None
+
+COUNTERS = [
+    'connections_opened',
+    'connections_closed',
+    'connections_unusable',
+    'connect_ms',
+    'checkouts',
+    'checkout_wait_ms',
+]
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+_stats = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+_stats_lock = threading.Lock()
+
+
+def _record(alias, counter, value=1):
+    with _stats_lock:
+        _stats[alias][counter] += value
+
+
+def get_stats():
+    """Return this process's connection counters, and pool statistics, per alias."""
+    with _stats_lock:
+        stats = {alias: dict(counters) for alias, counters in _stats.items()}
+    for alias, pool in list(_pools.items()):
+        stats.setdefault(alias, dict.fromkeys(COUNTERS, 0))['pool'] = {
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            **pool.get_stats(),
+        }
+    return stats
+
+
+def reset_stats():
+    """Zero this process's counters."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def close_pools():
+    """Close every pool of this process, closing their connections."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL database wrapper that records connection churn and can pool."""
+
+    @property
+    def pool(self):
+        """Return this alias's pool, or None when OPTIONS["pool"] is not set."""
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        pool = _pools.get(self.alias)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.alias)
+                if pool is None:
+                    pool = _pools[self.alias] = self.create_pool({} if options is True else options)
+        return pool
+
+    def create_pool(self, options):
+        """Return a closed pool of connections made from this alias's settings."""
+        if ConnectionPool is None:
+            raise ImproperlyConfigured(
+                'OPTIONS["pool"] requires psycopg_pool; run `pip install "psycopg[pool]"`.'
+            )
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured(
+                'Pooled connections are returned to the pool after every request; set CONN_MAX_AGE to 0.'
+            )
+        kwargs = self.get_connection_params()
+        # Django switches autocommit off itself when a transaction starts.
+        kwargs['autocommit'] = True
+        return ConnectionPool(
+            kwargs=kwargs,
+            open=False,
+            check=ConnectionPool.check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+            name=self.alias,
+            **options,
+        )
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            started = time.perf_counter()
+            connection = super().get_new_connection(conn_params)
+            _record(self.alias, 'connect_ms', (time.perf_counter() - started) * 1000)
+            _record(self.alias, 'connections_opened')
+            return connection
+
+        # Set the isolation level as the stock backend does for a new connection.
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        try:
+            self.isolation_level = base.IsolationLevel(
+                base.IsolationLevel.READ_COMMITTED if isolation_level is None else isolation_level
+            )
+        except ValueError:
+            raise ImproperlyConfigured(
+                f'Invalid transaction isolation level {isolation_level} specified. '
+                f'Use one of the psycopg.IsolationLevel values.'
+            )
+
+        started = time.perf_counter()
+        pool.open()
+        connection = pool.getconn()
+        _record(self.alias, 'checkout_wait_ms', (time.perf_counter() - started) * 1000)
+        _record(self.alias, 'checkouts')
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def is_usable(self):
+        usable = super().is_usable()
+        if not usable:
+            _record(self.alias, 'connections_unusable')
+        return usable
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.pool is None:
+            _record(self.alias, 'connections_closed')
+            return super()._close()
+        with self.wrap_database_errors:
+            # The pool rolls back an open transaction and discards broken connections.
+            self.connection._pool.putconn(self.connection)
+            self.connection = None
@@ -0,0 +1,57 @@
+"""
+Declarative query-parameter filters for list endpoints.
+
+A view lists the model fields it can be filtered on and the lookups each
+accepts:
+
+    filterset_fields = {
+        'gender': ['exact', 'in'],
+        'age': ['exact', 'gte', 'lte'],
+    }
+
+`?gender=F&age__gte=40` then becomes `.filter(gender='F', age__gte=40)`, so
+rows are filtered in SQL rather than by the client. `exact` is spelled
+without a suffix and `in` takes a comma-separated list. Values are converted
+and validated by the model field; invalid ones are rejected with a 400.
+"""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import ValidationError
+
+
+def get_param(field_name, lookup):
+    """Return the query parameter name for `lookup` on `field_name`."""
+    return field_name if lookup == 'exact' else f'{field_name}{LOOKUP_SEP}{lookup}'
+
+
+def clean_value(field, raw):
+    """Convert a query parameter value with the model field and validate it."""
+    value = field.to_python(raw.strip())
+    field.validate(value, None)
+    return value
+
+
+def filter_queryset(queryset, request, filterset_fields):
+    """Apply the `filterset_fields` filters present in the request to `queryset`."""
+    filters, errors = {}, {}
+    for field_name, lookups in filterset_fields.items():
+        field = queryset.model._meta.get_field(field_name)
+        for lookup in lookups:
+            param = get_param(field_name, lookup)
+            raw = request.query_params.get(param, '')
+            if not raw:
+                continue
+            try:
+                if lookup == 'in':
+                    value = [clean_value(field, item) for item in raw.split(',') if item.strip()]
+                else:
+                    value = clean_value(field, raw)
+            except DjangoValidationError as exc:
+                errors[param] = exc.messages
+            else:
+                filters[param] = value
+
+    if errors:
+        raise ValidationError(errors)
+    return queryset.filter(**filters)
@@ -0,0 +1,223 @@
+"""
+Per-request performance metrics.
+
+RequestMetricsMiddleware samples REQUEST_METRICS_SAMPLE_RATE of requests.
+For each sampled request it records the wall time, the number and total
+time of SQL queries on every database alias, the time spent serializing rows
+and rendering JSON, and the response size, labelled by URL name. The
+timings are sent back in a `Server-Timing` header and added to histograms
+served in the Prometheus text format by `metrics_view`.
+
+Requests that are not sampled cost one call to `random()`. Code that wants
+its time reported wraps itself in `timed(name)`, which costs a context
+variable lookup when the request is not sampled.
+
+Histograms are kept per process, like the other counters in this project,
+so each worker reports its own requests.
+"""
+
+import contextvars
+import functools
+import hmac
+import random
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+from .db import base as db
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Prometheus-style histogram with one series per label tuple."""
+
+    def __init__(self, name, help_text, labels, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def get_series(self):
+        """Return {label values: (cumulative bucket counts, sum, count)}."""
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in series.items():
+            for i in range(1, len(counts)):
+                counts[i] += counts[i - 1]
+        return series
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        """Return the histogram in the Prometheus text exposition format."""
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self.get_series().items()):
+            labels = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.labels, label_values))
+            for upper, cumulative in zip((*self.buckets, '+Inf'), counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{upper}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_LABELS = ('route', 'method', 'status')
+
+HISTOGRAMS = {
+    'duration': Histogram(
+        'http_request_duration_seconds', 'Wall time spent serving the request.', REQUEST_LABELS, DURATION_BUCKETS
+    ),
+    'db': Histogram(
+        'http_request_db_seconds', 'Time spent running SQL queries.', REQUEST_LABELS, DURATION_BUCKETS
+    ),
+    'queries': Histogram(
+        'http_request_db_queries', 'Number of SQL queries run.', REQUEST_LABELS, QUERY_BUCKETS
+    ),
+    'serialize': Histogram(
+        'http_request_serialize_seconds', 'Time spent serializing rows.', REQUEST_LABELS, DURATION_BUCKETS
+    ),
+    'render': Histogram(
+        'http_request_render_seconds', 'Time spent rendering the response body.', REQUEST_LABELS, DURATION_BUCKETS
+    ),
+    'size': Histogram(
+        'http_response_size_bytes', 'Size of the response body.', REQUEST_LABELS, SIZE_BUCKETS
+    ),
+}
+
+
+class RequestMetrics:
+    """Timings collected while serving one sampled request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.timings = {'db': 0.0, 'serialize': 0.0, 'render': 0.0}
+
+    def add(self, name, seconds):
+        self.timings[name] += seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper counting and timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.timings['db'] += time.perf_counter() - started
+            self.queries += 1
+
+
+def timed(name):
+    """Decorator adding the time spent in the function to the sampled request's `name` timing."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _current.get()
+            if metrics is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.add(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class RequestMetricsMiddleware(MiddlewareMixin):
+    """Record the timings of sampled requests and report them in a Server-Timing header."""
+
+    def process_request(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return
+        metrics = request._metrics = RequestMetrics()
+        _current.set(metrics)
+        for connection in connections.all():
+            connection.execute_wrappers.append(metrics)
+
+    def process_response(self, request, response):
+        metrics = getattr(request, '_metrics', None)
+        if metrics is None:
+            return response
+        _current.set(None)
+        for connection in connections.all():
+            if metrics in connection.execute_wrappers:
+                connection.execute_wrappers.remove(metrics)
+
+        duration = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        labels = (match.url_name if match and match.url_name else 'unmatched', request.method, str(response.status_code))
+        HISTOGRAMS['duration'].observe(labels, duration)
+        HISTOGRAMS['queries'].observe(labels, metrics.queries)
+        for name, seconds in metrics.timings.items():
+            HISTOGRAMS[name].observe(labels, seconds)
+        if not response.streaming:
+            HISTOGRAMS['size'].observe(labels, len(response.content))
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.timings["db"] * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.timings["serialize"] * 1000:.2f}',
+            f'render;dur={metrics.timings["render"] * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ])
+        return response
+
+
+def reset():
+    """Clear every histogram of this process."""
+    for histogram in HISTOGRAMS.values():
+        histogram.reset()
+
+
+def expose_database_stats():
+    """Return the connection counters of `healthcare_backend.db` in the Prometheus text format."""
+    stats = db.get_stats()
+    lines = []
+    for counter in db.COUNTERS:
+        # Millisecond totals are exported in seconds, as Prometheus expects.
+        name = f'db_{counter[:-3]}_seconds_total' if counter.endswith('_ms') else f'db_{counter}_total'
+        lines += [f'# TYPE {name} counter']
+        for alias in sorted(stats):
+            value = stats[alias][counter] / 1000 if counter.endswith('_ms') else stats[alias][counter]
+            lines.append(f'{name}{{alias="{escape(alias)}"}} {value}')
+    return '\n'.join(lines)
+
+
+def metrics_view(request):
+    """Serve this process's request histograms and connection counters in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Without a token the endpoint is only served in development.
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        raise Http404
+    sections = [histogram.expose() for histogram in HISTOGRAMS.values()]
+    sections.append(expose_database_stats())
+    body = '\n'.join(sections) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
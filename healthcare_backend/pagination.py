@@ -0,0 +1,212 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def get_page_response(paginator, serializer, queryset, request, view=None):
+    """Serialize one page of `queryset` with a values() serializer, or all of it if pagination is off."""
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    if page is None:
+        return Response(serializer.serialize(queryset))
+    return paginator.get_paginated_response(serializer.serialize(page))
+
+
+async def aget_page_response(paginator, serializer, queryset, request, view=None):
+    """Async version of `get_page_response`."""
+    page = await paginator.apaginate_queryset(queryset, request, view=view)
+    if page is None:
+        return Response(serializer.serialize([row async for row in queryset]))
+    return paginator.get_paginated_response(serializer.serialize(page))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (created_at, id).
+
+    Every page is fetched with a WHERE clause on the last row seen instead of
+    an OFFSET, so the cost of a page does not grow with its depth. Cursors are
+    opaque base64 tokens; clients should only follow the `next` and `previous`
+    links returned in the response.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Largest id a cursor may carry; anything wider overflows the database's bigint.
+    max_cursor_id = 2 ** 63 - 1
+
+    # Clients that still expect the full, unpaginated list can pass
+    # `?paginate=false` to get the legacy response shape.
+    paginate_query_param = 'paginate'
+
+    ordering_field = 'created_at'
+    tiebreak_field = 'id'
+
+    def is_enabled(self, request):
+        """Return False when the client opted into the unpaginated shape."""
+        value = request.query_params.get(self.paginate_query_param, '')
+        return value.lower() not in ('false', '0', 'no', 'off')
+
+    def get_page_size(self, request):
+        """Return the requested page size, clamped to `max_page_size`."""
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return one page of `queryset`, or None if pagination is disabled."""
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async version of `paginate_queryset`, for views using the async ORM."""
+        page_queryset = self.get_page_queryset(queryset, request)
+        if page_queryset is None:
+            return None
+        return self.set_page([instance async for instance in page_queryset])
+
+    def get_page_queryset(self, queryset, request):
+        """Return the unevaluated query for the requested page, or None if disabled."""
+        self.request = request
+        if not self.is_enabled(request):
+            return None
+
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        self.reverse = self.cursor is not None and self.cursor[0]
+
+        if self.reverse:
+            queryset = queryset.order_by(self.ordering_field, self.tiebreak_field)
+        else:
+            queryset = queryset.order_by(f'-{self.ordering_field}', f'-{self.tiebreak_field}')
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.position_filter(self.cursor))
+
+        # Fetch one extra row to find out whether another page follows.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Trim the fetched rows to a page and work out the navigation links."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def position_filter(self, cursor):
+        """Build the keyset WHERE clause for rows after (or before) `cursor`."""
+        reverse, created_at, pk = cursor
+        op = 'gt' if reverse else 'lt'
+        return (
+            Q(**{f'{self.ordering_field}__{op}': created_at})
+            | Q(**{self.ordering_field: created_at, f'{self.tiebreak_field}__{op}': pk})
+        )
+
+    def get_paginated_response(self, data):
+        """Wrap a page of serialized data with its navigation links."""
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        """Return the URL of the following page, if there is one."""
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        """Return the URL of the preceding page, if there is one."""
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Paged past the end; step back from the start of the listing.
+            return remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        """Return a page URL positioned just after (or before) `instance`."""
+        created_at = getattr(instance, self.ordering_field)
+        pk = getattr(instance, self.tiebreak_field)
+        raw = f"{'r' if reverse else 'f'}|{created_at.isoformat()}|{pk}"
+        token = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request):
+        """Return (reverse, created_at, id) from the request, or None."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+            direction, created_at, pk = raw.split('|')
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+        if (
+            direction not in ('f', 'r')
+            or created_at is None
+            or timezone.is_naive(created_at)
+            or not 0 < pk <= self.max_cursor_id
+        ):
+            raise ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+        return direction == 'r', created_at, pk
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Return the best `page_size` matches of a ranked search as a single page.
+
+    Ranked results have no stable key to resume from, and clients narrow a
+    search by refining the query rather than paging, so `next` and `previous`
+    are always null. `?paginate=false` returns every match.
+    """
+
+    def get_page_queryset(self, queryset, request):
+        """Return the query for the top matches, or None if disabled."""
+        self.request = request
+        if not self.is_enabled(request):
+            return None
+        self.page_size = self.get_page_size(request)
+        return queryset[:self.page_size]
+
+    def set_page(self, results):
+        """Use the fetched matches as the only page."""
+        self.has_next = self.has_previous = False
+        self.page = results
+        return results
@@ -0,0 +1,235 @@
+"""
+Sampling profiler for production requests.
+
+ProfilingMiddleware profiles PROFILING_SAMPLE_RATE of requests, and every
+request whose `X-Profile` header carries PROFILING_TOKEN. While a profiled
+request is served, a background thread records the stack of the code serving
+it every PROFILING_INTERVAL_MS. The sampled stacks are written to
+PROFILING_DIR in the folded format (`frame;frame;frame count` per line) read
+by flamegraph.pl, speedscope and inferno, next to a JSON file describing the
+request. Profiles get a fresh id, sent back in `X-Profile-Id`; the request's
+`X-Request-ID` header is only recorded in the description. Only the newest
+PROFILING_MAX_PROFILES are kept.
+
+Under WSGI the request's thread is sampled. Under ASGI the event loop thread
+is sampled while it runs the request's task, which is where async views run,
+and so is the worker thread running the request's synchronous code (sync
+views and middleware, ORM queries) while it is busy. Other requests sharing
+the loop are left out.
+
+A request that is not profiled costs a call to `random()` and a header
+lookup. Streaming responses are profiled up to the start of the stream.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+PROFILE_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# X-Request-ID values longer than this are truncated in profile descriptions.
+MAX_REQUEST_ID_LENGTH = 200
+
+
+def get_frame_name(frame):
+    """Return 'function (path:line)' for a frame, with paths relative to the project or site-packages."""
+    code = frame.f_code
+    filename = code.co_filename
+    base_dir = os.path.join(str(settings.BASE_DIR), '')
+    if 'site-packages' in filename:
+        filename = filename.rsplit('site-packages' + os.sep, 1)[-1]
+    elif filename.startswith(base_dir):
+        filename = filename[len(base_dir):]
+    return f'{code.co_qualname} ({filename}:{code.co_firstlineno})'
+
+
+def fold(frame):
+    """Return the stack ending at `frame` in the folded format, outermost frame first."""
+    names = []
+    while frame is not None:
+        names.append(get_frame_name(frame).replace(';', ':'))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def is_running_sync_to_async(frame):
+    """Return True if `frame`'s thread is running a function called through `sync_to_async`."""
+    while frame is not None:
+        if frame.f_code.co_name == 'thread_handler' and 'asgiref' in frame.f_code.co_filename:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class StackSampler(threading.Thread):
+    """Thread counting the stacks of another thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stopped = threading.Event()
+
+    def get_frames(self):
+        """Return the innermost frames to record in this sample."""
+        frame = sys._current_frames().get(self.thread_id)
+        return [] if frame is None else [frame]
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            for frame in self.get_frames():
+                self.samples[fold(frame)] += 1
+
+    def stop(self):
+        """Stop sampling and return {folded stack: samples}."""
+        self._stopped.set()
+        self.join()
+        return self.samples
+
+
+class AsyncStackSampler(StackSampler):
+    """
+    Sampler following a request served by an event loop: the loop's thread
+    while it runs the request's task, and the thread running the request's
+    synchronous code while that thread is busy.
+    """
+
+    def __init__(self, thread_id, task, sync_thread_id, interval):
+        super().__init__(thread_id, interval)
+        self.task = task
+        self.sync_thread_id = sync_thread_id
+
+    def get_frames(self):
+        frames = sys._current_frames()
+        sampled = []
+        if asyncio.current_task(self.task.get_loop()) is self.task:
+            sampled.append(frames.get(self.thread_id))
+        sync_frame = frames.get(self.sync_thread_id)
+        if sync_frame is not None and is_running_sync_to_async(sync_frame):
+            sampled.append(sync_frame)
+        return [frame for frame in sampled if frame is not None]
+
+
+def get_profile_path(profile_id, extension):
+    return os.path.join(settings.PROFILING_DIR, f'{profile_id}.{extension}')
+
+
+def save_profile(profile_id, info, samples):
+    """Write a profile's folded stacks and description, then drop the oldest profiles."""
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    with open(get_profile_path(profile_id, 'folded'), 'w') as stacks:
+        stacks.writelines(f'{stack} {count}\n' for stack, count in samples.most_common())
+    # The description is written last; list_profiles() ignores profiles without one.
+    with open(get_profile_path(profile_id, 'json'), 'w') as description:
+        json.dump(info, description)
+    for old in list_profiles()[settings.PROFILING_MAX_PROFILES:]:
+        delete_profile(old['id'])
+
+
+def list_profiles():
+    """Return the description of every stored profile, newest first."""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        profile_id, extension = os.path.splitext(name)
+        if extension != '.json':
+            continue
+        try:
+            with open(get_profile_path(profile_id, 'json')) as description:
+                profiles.append(json.load(description))
+        except (OSError, ValueError):
+            # Deleted or still being written by another worker.
+            continue
+    return sorted(profiles, key=lambda profile: profile['started_at'], reverse=True)
+
+
+def get_profile(profile_id):
+    """Return the folded stacks of a stored profile, or None."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(get_profile_path(profile_id, 'folded')) as stacks:
+            return stacks.read()
+    except FileNotFoundError:
+        return None
+
+
+def delete_profile(profile_id):
+    for extension in ('json', 'folded'):
+        try:
+            os.remove(get_profile_path(profile_id, extension))
+        except FileNotFoundError:
+            pass
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """Sample the stacks of a fraction of requests, or of requests sent with the profiling token."""
+
+    def should_profile(self, request):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and random.random() < rate:
+            return True
+        token = settings.PROFILING_TOKEN
+        return bool(token) and hmac.compare_digest(request.META.get('HTTP_X_PROFILE', ''), token)
+
+    def get_interval(self):
+        return settings.PROFILING_INTERVAL_MS / 1000
+
+    def start(self, request, sampler):
+        request._profile = (uuid.uuid4().hex, time.time(), time.perf_counter(), sampler)
+        sampler.start()
+
+    def process_request(self, request):
+        if self.should_profile(request):
+            self.start(request, StackSampler(threading.get_ident(), self.get_interval()))
+
+    def process_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is None:
+            return response
+        profile_id, started_at, started, sampler = profile
+        samples = sampler.stop()
+        match = request.resolver_match
+        save_profile(profile_id, {
+            'id': profile_id,
+            'request_id': request.META.get('HTTP_X_REQUEST_ID', '')[:MAX_REQUEST_ID_LENGTH] or None,
+            'method': request.method,
+            'path': request.path,
+            'route': match.url_name if match and match.url_name else None,
+            'status': response.status_code,
+            'started_at': started_at,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'samples': sum(samples.values()),
+        }, samples)
+        response['X-Profile-Id'] = profile_id
+        return response
+
+    async def __acall__(self, request):
+        # Unlike MiddlewareMixin, skip the hops to a worker thread for
+        # requests that are not profiled.
+        if not self.should_profile(request):
+            return await self.get_response(request)
+        # Synchronous code of one request runs in one worker thread under ASGI;
+        # find out which, so its busy periods are sampled too.
+        sync_thread_id = await sync_to_async(threading.get_ident)()
+        self.start(request, AsyncStackSampler(
+            threading.get_ident(), asyncio.current_task(), sync_thread_id, self.get_interval()
+        ))
+        response = await self.get_response(request)
+        return await sync_to_async(self.process_response, thread_sensitive=False)(request, response)
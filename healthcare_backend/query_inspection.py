@@ -0,0 +1,141 @@
+"""
+Slow-query and repeated-query detection.
+
+When QUERY_INSPECTION is on, QueryInspectionMiddleware wraps every database
+alias for the duration of a request and fingerprints each statement: literals
+and placeholder lists are collapsed, so the queries an N+1 loop issues for
+different rows share a fingerprint. After the response is built it logs every
+fingerprint run REPEATED_QUERY_THRESHOLD times or more, with the line of
+project code that first repeated it. Queries slower than SLOW_QUERY_MS are
+logged as they finish, with the project frames that issued them.
+
+Each report is sent with `request_inspected`, which `testing.query_budget`
+uses to fail tests. Queries run while a streaming response is read, after the
+middleware has returned, are not inspected.
+"""
+
+import functools
+import logging
+import os
+import re
+import sys
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+# Sent with `request` and `report` after an inspected request is served.
+request_inspected = Signal()
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_ROW_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_SPACES = re.compile(r'\s+')
+
+# Frames of the inspection machinery itself are never reported as an origin.
+_IGNORED_FILES = (
+    __file__,
+    os.path.join(os.path.dirname(__file__), 'instrumentation.py'),
+    os.path.join(os.path.dirname(__file__), 'db', ''),
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Return `sql` with literals, placeholder lists and whitespace normalized."""
+    sql = _STRINGS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    sql = _ROW_LISTS.sub('(...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def get_project_frames(limit=5):
+    """Return up to `limit` 'path:line in function' entries of project code on the stack, innermost first."""
+    base_dir = os.path.join(str(settings.BASE_DIR), '')
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < limit:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base_dir)
+            and 'site-packages' not in filename
+            and not filename.startswith(_IGNORED_FILES)
+        ):
+            frames.append(f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return frames
+
+
+class QueryReport:
+    """Fingerprints of the queries run while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        # fingerprint -> [times run, origin of the first repeat]
+        self.fingerprints = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper fingerprinting every query and logging slow ones."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started) * 1000
+            self.count += 1
+            key = fingerprint(sql)
+            entry = self.fingerprints.get(key)
+            if entry is None:
+                self.fingerprints[key] = [1, None]
+            else:
+                entry[0] += 1
+                # Walking the stack is only worth it once a query repeats.
+                if entry[1] is None:
+                    entry[1] = (get_project_frames(1) or ['unknown'])[0]
+            if duration >= settings.SLOW_QUERY_MS:
+                logger.warning(
+                    'Slow query (%.1f ms) from %s: %s',
+                    duration, ' <- '.join(get_project_frames()) or 'unknown', sql,
+                )
+
+    def get_repeated(self, threshold=None):
+        """Return (fingerprint, times run, origin) for queries run `threshold` times or more."""
+        if threshold is None:
+            threshold = settings.REPEATED_QUERY_THRESHOLD
+        return [
+            (key, count, origin)
+            for key, (count, origin) in self.fingerprints.items()
+            if count >= threshold
+        ]
+
+
+class QueryInspectionMiddleware(MiddlewareMixin):
+    """Log slow and repeated queries of every request while QUERY_INSPECTION is on."""
+
+    def process_request(self, request):
+        if not settings.QUERY_INSPECTION:
+            return
+        report = request._query_report = QueryReport()
+        for connection in connections.all():
+            connection.execute_wrappers.append(report)
+
+    def process_response(self, request, response):
+        report = getattr(request, '_query_report', None)
+        if report is None:
+            return response
+        for connection in connections.all():
+            if report in connection.execute_wrappers:
+                connection.execute_wrappers.remove(report)
+
+        for key, count, origin in report.get_repeated():
+            logger.warning(
+                '%s %s ran the same query %d times, first repeated at %s: %s',
+                request.method, request.path, count, origin, key,
+            )
+        request_inspected.send(sender=self.__class__, request=request, report=report)
+        return response
@@ -0,0 +1,77 @@
+"""
+JSON renderer and parser backed by orjson.
+
+orjson encodes and decodes in C, writing bytes directly instead of building a
+str and encoding it, which matters most for full list pages. Datetimes, dates,
+times and UUIDs are encoded natively; everything else the serializers can
+produce (Decimals, lazy translation strings, querysets) goes through DRF's own
+encoder. Output matches `rest_framework.renderers.JSONRenderer` byte for byte
+except for floats: orjson writes the shortest form without a '+' or padded
+exponent (`1e16` where DRF writes `1e+16`) and renders NaN and infinities as
+null instead of raising. The serializers here produce no floats.
+
+Without orjson installed, or for what it cannot express the same way
+(indented output, `UNICODE_JSON = False`, integers wider than 64 bits,
+non-UTF-8 request bodies), both classes fall back to DRF's stdlib `json`
+implementation.
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from .instrumentation import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF escapes these so the output is also valid JavaScript.
+LINE_SEPARATORS = [('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029')]
+
+UTF8_ENCODINGS = {'utf-8', 'utf8'}
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed."""
+
+    if orjson is not None:
+        # OPT_UTC_Z writes UTC offsets as 'Z', as DRF's encoder does.
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    @timed('render')
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            # Integers outside the 64-bit range, which the stdlib encoder handles.
+            return super().render(data, accepted_media_type, renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when it is installed."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming bytestream as JSON and return the resulting data."""
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if orjson is None or not self.strict or encoding.lower() not in UTF8_ENCODINGS:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,135 @@
+"""
+Read-replica routing.
+
+Reads made while serving a GET or HEAD request go to a randomly chosen alias
+of DATABASE_REPLICAS when the view sets `replica_reads = True`. Everything
+else (writes, other methods and views, management commands, tests without
+replicas) uses the primary, `default`. So do the authentication app's models
+in every request: token authentication runs before the user is known and
+checks the user's active flag, token version and revoked tokens, which a
+lagging replica would report stale.
+
+Replicas lag behind the primary, so a user who has just written reads from
+the primary for DB_REPLICA_PIN_SECONDS afterwards. The pin is kept in the
+default cache so that every worker sees it, which needs a shared cache
+backend in production. Reads after a write within the same request go to
+the primary too.
+"""
+
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import LazyObject
+
+PIN_KEY = 'db:pinned:{}'
+
+SAFE_METHODS = {'GET', 'HEAD'}
+
+# Apps whose models are always read from the primary.
+PRIMARY_APPS = {'authentication'}
+
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+def pin(user_pk):
+    """Send `user_pk`'s reads to the primary for DB_REPLICA_PIN_SECONDS."""
+    cache.set(PIN_KEY.format(user_pk), True, timeout=settings.DB_REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_pk):
+    return cache.get(PIN_KEY.format(user_pk), False)
+
+
+class RequestState:
+    """What the router needs to know about the request being served."""
+
+    def __init__(self, request):
+        self.request = request
+        self.replica_reads = False
+        self.wrote = False
+        self._pinned = {}
+
+    def get_user_pk(self):
+        """Return the authenticated user's pk, or None before authentication."""
+        # The session user is a lazy object until DRF replaces it with the token's
+        # user; resolving it here would query the database from inside the router.
+        user = self.request.__dict__.get('user')
+        if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def use_replica(self):
+        if not self.replica_reads or self.wrote:
+            return False
+        user_pk = self.get_user_pk()
+        if user_pk is None:
+            return True
+        if user_pk not in self._pinned:
+            self._pinned[user_pk] = is_pinned(user_pk)
+        return not self._pinned[user_pk]
+
+
+class ReplicaRouter:
+    """Database router sending the reads of replica-enabled GET requests to a replica."""
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or model._meta.app_label in PRIMARY_APPS:
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and state.use_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        # Objects read from a replica are saved to the primary too.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """Enable replica reads for safe requests to opted-in views and pin users who wrote to the primary."""
+
+    def process_request(self, request):
+        _request_state.set(RequestState(request))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _request_state.get()
+        if state is not None and request.method in SAFE_METHODS:
+            view_class = getattr(view_func, 'view_class', None)
+            state.replica_reads = getattr(view_class, 'replica_reads', False)
+
+    def process_response(self, request, response):
+        state = _request_state.get()
+        if settings.DATABASE_REPLICAS and state is not None and state.wrote and response.status_code < 400:
+            user_pk = state.get_user_pk()
+            if user_pk is not None:
+                pin(user_pk)
+        return response
+
+
+def clear_request_state(**kwargs):
+    # Streaming responses read after process_response, so keep the state until
+    # the response is closed.
+    _request_state.set(None)
+
+
+request_finished.connect(clear_request_state)
@@ -0,0 +1,228 @@
+"""
+Ranked prefix search for the `?q=` list parameter.
+
+A model opts in with `SEARCH_FIELDS`, the text columns searched word by
+word, and optionally `SEARCH_PREFIX_FIELD`, a column matched by prefix when
+the query looks like a phone number. Every word of the query must prefix-match
+a word of the searched columns.
+
+The index behind the search is created by the `CreateSearchIndex` migration
+operation and depends on the database:
+
+- PostgreSQL: a GIN index over `to_tsvector('simple', ...)` of the searched
+  columns, queried with a prefix `tsquery` and ranked with `ts_rank`, plus a
+  `varchar_pattern_ops` index for the prefix column.
+- SQLite: an FTS5 table kept in sync with the model's table by triggers,
+  ranked with bm25. Migrations that make Django rebuild the table on SQLite
+  drop those triggers, so such a migration must create the index again.
+- Anything else: unindexed `icontains` filters, unranked.
+"""
+
+import re
+
+from django.db import connections
+from django.db.migrations.operations.base import Operation
+from django.db.models import BooleanField, Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SEARCH_QUERY_PARAM = 'q'
+
+# Text search configuration: no stemming or stop words, so prefixes of names
+# match as typed.
+TEXT_SEARCH_CONFIG = 'simple'
+
+# Words beyond this many are ignored.
+MAX_TERMS = 8
+
+WORD = re.compile(r'\w+')
+PHONE_QUERY = re.compile(r'^\+?\d[\d\s()-]*$')
+PHONE_SEPARATORS = re.compile(r'[\s()-]')
+
+
+def get_query(request):
+    """Return the stripped `?q=` search query, or an empty string."""
+    return request.query_params.get(SEARCH_QUERY_PARAM, '').strip()
+
+
+def parse_query(query):
+    """Return (lower-cased words, phone prefix or None) for a search query."""
+    terms = WORD.findall(query.lower())[:MAX_TERMS]
+    prefix = PHONE_SEPARATORS.sub('', query) if PHONE_QUERY.match(query) else None
+    return terms, prefix
+
+
+def search(queryset, query):
+    """Filter `queryset` to rows matching `query`, best match first, annotated with `search_rank`."""
+    terms, prefix = parse_query(query)
+    if not terms:
+        return queryset.none()
+
+    model = queryset.model
+    prefix_field = getattr(model, 'SEARCH_PREFIX_FIELD', None)
+    if prefix_field is None:
+        prefix = None
+
+    connection = connections[queryset.db]
+    builders = {'postgresql': postgresql_search, 'sqlite': sqlite_search}
+    build = builders.get(connection.vendor, fallback_search)
+    condition, rank = build(connection, model, terms, prefix_field, prefix)
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-pk')
+
+
+def document_sql(columns):
+    """Return the tsvector expression the PostgreSQL index is built on."""
+    document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"to_tsvector('{TEXT_SEARCH_CONFIG}', {document})"
+
+
+def postgresql_search(connection, model, terms, prefix_field, prefix):
+    """Match against the GIN-indexed tsvector; phone prefixes rank first."""
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    columns = [
+        f'{quote(table)}.{quote(model._meta.get_field(name).column)}' for name in model.SEARCH_FIELDS
+    ]
+    vector = document_sql(columns)
+    tsquery = f"to_tsquery('{TEXT_SEARCH_CONFIG}', %s)"
+    words = ' & '.join(f'{term}:*' for term in terms)
+
+    condition = Q(RawSQL(f'{vector} @@ {tsquery}', [words], output_field=BooleanField()))
+    rank = RawSQL(f'ts_rank({vector}, {tsquery})', [words], output_field=FloatField())
+    if prefix:
+        prefix_match = Q(**{f'{prefix_field}__startswith': prefix})
+        condition |= prefix_match
+        rank = Case(When(prefix_match, then=Value(1.0)), default=rank, output_field=FloatField())
+    return condition, rank
+
+
+def sqlite_search(connection, model, terms, prefix_field, prefix):
+    """Match against the model's FTS5 table, ranked by bm25."""
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    fts_table = f'{table}_search'
+    columns = ' '.join(model._meta.get_field(name).column for name in model.SEARCH_FIELDS)
+
+    match = '{%s} : (%s)' % (columns, ' AND '.join(f'"{term}"*' for term in terms))
+    digits = prefix.lstrip('+') if prefix else ''
+    if digits:
+        match = f'{match} OR {model._meta.get_field(prefix_field).column} : "{digits}"*'
+
+    condition = Q(pk__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', [match]))
+    rank = RawSQL(
+        f'SELECT -rank FROM {fts_table} WHERE {fts_table} MATCH %s '
+        f'AND rowid = {quote(table)}.{quote(model._meta.pk.column)}',
+        [match], output_field=FloatField()
+    )
+    return condition, rank
+
+
+def fallback_search(connection, model, terms, prefix_field, prefix):
+    """Unindexed substring match for databases without a search index."""
+    condition = Q()
+    for term in terms:
+        matches = [Q(**{f'{name}__icontains': term}) for name in model.SEARCH_FIELDS]
+        condition &= Q(*matches, _connector=Q.OR)
+    if prefix:
+        condition |= Q(**{f'{prefix_field}__startswith': prefix})
+    return condition, Value(0.0, output_field=FloatField())
+
+
+class CreateSearchIndex(Operation):
+    """
+    Migration operation creating the index `search` queries: a GIN tsvector
+    index (and a prefix index) on PostgreSQL, an FTS5 table with sync
+    triggers on SQLite, and nothing elsewhere.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, fields, prefix_field=None):
+        self.model_name = model_name
+        self.fields = fields
+        self.prefix_field = prefix_field
+
+    def deconstruct(self):
+        kwargs = {'model_name': self.model_name, 'fields': self.fields}
+        if self.prefix_field is not None:
+            kwargs['prefix_field'] = self.prefix_field
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self.run(app_label, schema_editor, to_state, forwards=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self.run(app_label, schema_editor, from_state, forwards=False)
+
+    def describe(self):
+        return f'Create search index on {self.model_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return f'{self.model_name.lower()}_search_index'
+
+    def run(self, app_label, schema_editor, state, forwards):
+        model = state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        vendor = schema_editor.connection.vendor
+        table = model._meta.db_table
+        columns = [model._meta.get_field(name).column for name in self.fields]
+        prefix_column = model._meta.get_field(self.prefix_field).column if self.prefix_field else None
+
+        if vendor == 'postgresql':
+            statements = self.postgresql_sql(table, columns, prefix_column, forwards)
+        elif vendor == 'sqlite':
+            statements = self.sqlite_sql(table, model._meta.pk.column, columns, prefix_column, forwards)
+        else:
+            statements = []
+        for sql in statements:
+            schema_editor.execute(sql, params=None)
+
+    def postgresql_sql(self, table, columns, prefix_column, forwards):
+        statements = []
+        if forwards:
+            statements.append(
+                f'CREATE INDEX {table}_search_idx ON {table} USING gin ({document_sql(columns)})'
+            )
+            if prefix_column:
+                statements.append(
+                    f'CREATE INDEX {table}_{prefix_column}_prefix_idx '
+                    f'ON {table} ({prefix_column} varchar_pattern_ops)'
+                )
+        else:
+            statements.append(f'DROP INDEX IF EXISTS {table}_search_idx')
+            if prefix_column:
+                statements.append(f'DROP INDEX IF EXISTS {table}_{prefix_column}_prefix_idx')
+        return statements
+
+    def sqlite_sql(self, table, pk_column, columns, prefix_column, forwards):
+        fts_table = f'{table}_search'
+        if not forwards:
+            return [
+                f'DROP TRIGGER IF EXISTS {fts_table}_insert',
+                f'DROP TRIGGER IF EXISTS {fts_table}_delete',
+                f'DROP TRIGGER IF EXISTS {fts_table}_update',
+                f'DROP TABLE IF EXISTS {fts_table}',
+            ]
+
+        indexed = columns + ([prefix_column] if prefix_column else [])
+        names = ', '.join(indexed)
+        new = ', '.join(f'new.{column}' for column in indexed)
+        old = ', '.join(f'old.{column}' for column in indexed)
+        delete = (
+            f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) "
+            f"VALUES ('delete', old.{pk_column}, {old});"
+        )
+        insert = f'INSERT INTO {fts_table}(rowid, {names}) VALUES (new.{pk_column}, {new});'
+        return [
+            f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+            f"{names}, content='{table}', content_rowid='{pk_column}', prefix='2 3')",
+            f'CREATE TRIGGER {fts_table}_insert AFTER INSERT ON {table} BEGIN {insert} END',
+            f'CREATE TRIGGER {fts_table}_delete AFTER DELETE ON {table} BEGIN {delete} END',
+            f'CREATE TRIGGER {fts_table}_update AFTER UPDATE OF {names} ON {table} '
+            f'BEGIN {delete} {insert} END',
+            f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+        ]
@@ -0,0 +1,155 @@
+from functools import lru_cache
+from operator import itemgetter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import fields as serializer_fields, relations
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import BaseSerializer, ListSerializer
+from .instrumentation import timed
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin adding `?fields=` sparse fieldsets.
+
+    Passing `fields` to the constructor drops every other field from the
+    output; `get_values_serializer(serializer_class, fields)` then selects
+    only the columns those fields read. `setup_eager_loading` loads the
+    serializer's `select_related_fields` and `only_fields` for the views
+    that still serialize model instances.
+    """
+
+    fields_query_param = 'fields'
+
+    # Columns read while serializing every field.
+    select_related_fields = []
+    only_fields = []
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Return the field names listed in `?fields=`, or None for every field."""
+        raw = request.query_params.get(cls.fields_query_param, '')
+        requested = [name.strip() for name in raw.split(',') if name.strip()]
+        if not requested:
+            return None
+
+        available = list(cls().fields)
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise ValidationError({cls.fields_query_param: [
+                f'Unknown fields: {", ".join(unknown)}. Available fields: {", ".join(available)}.'
+            ]})
+        return requested
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Fetch everything the serializer reads in a single query."""
+        return queryset.select_related(*cls.select_related_fields).only(*cls.only_fields)
+
+
+class ValuesSerializer:
+    """
+    Read-only, compiled counterpart of a ModelSerializer for list endpoints.
+
+    Rows are fetched with `values_list()` and turned into dicts by accessors
+    worked out once from the serializer's fields, so no model instances are
+    built and DRF's per-field dispatch is skipped. Fields that render a
+    database value unchanged (text, choice, integer, boolean and primary key
+    fields) copy it as is; the others call the field's own
+    `to_representation`, so the output matches the serializer's. Nested
+    serializers are read through lookups across their relation.
+
+    The rows are named tuples that also carry `pagination_fields`, so
+    KeysetPagination can paginate the queryset and build cursors from them.
+    """
+
+    passthrough_field_classes = (
+        serializer_fields.CharField,
+        serializer_fields.ChoiceField,
+        serializer_fields.IntegerField,
+        serializer_fields.BooleanField,
+        serializer_fields.ReadOnlyField,
+        relations.PrimaryKeyRelatedField,
+    )
+
+    pagination_fields = ['id', 'created_at']
+
+    def __init__(self, serializer):
+        self.lookups = []
+        self.getters = self.compile(serializer, '')
+        for lookup in self.pagination_fields:
+            self.get_index(lookup)
+
+    def get_index(self, lookup):
+        """Return the position of `lookup` in each row, selecting it if needed."""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def compile(self, serializer, prefix):
+        """Return (name, getter) pairs building `serializer`'s output from a row."""
+        getters = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            unsupported = (ListSerializer, serializer_fields.SerializerMethodField)
+            if not field.source_attrs or isinstance(field, unsupported):
+                raise ImproperlyConfigured(
+                    f'{type(serializer).__name__}.{name} cannot be read with values().'
+                )
+            lookup = prefix + LOOKUP_SEP.join(field.source_attrs)
+            index = self.get_index(lookup)
+            if isinstance(field, BaseSerializer):
+                getters.append((name, self.nested_getter(index, self.compile(field, lookup + LOOKUP_SEP))))
+            elif isinstance(field, self.passthrough_field_classes):
+                getters.append((name, itemgetter(index)))
+            else:
+                getters.append((name, self.field_getter(index, field.to_representation)))
+        return getters
+
+    @staticmethod
+    def field_getter(index, to_representation):
+        def get(row):
+            value = row[index]
+            return None if value is None else to_representation(value)
+        return get
+
+    @staticmethod
+    def nested_getter(index, getters):
+        def get(row):
+            if row[index] is None:
+                return None
+            return {name: getter(row) for name, getter in getters}
+        return get
+
+    def get_queryset(self, queryset):
+        """Return `queryset` selecting exactly the columns the serializer reads."""
+        return queryset.values_list(*self.lookups, named=True)
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    @timed('serialize')
+    def serialize(self, rows):
+        """Return the serialized form of every row in `rows`."""
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+
+@lru_cache(maxsize=128)
+def _get_values_serializer(serializer_class, fields):
+    if fields is None:
+        return ValuesSerializer(serializer_class())
+    return ValuesSerializer(serializer_class(fields=fields))
+
+
+def get_values_serializer(serializer_class, fields=None):
+    """Return the ValuesSerializer for `serializer_class`, limited to `fields` if given."""
+    return _get_values_serializer(serializer_class, None if fields is None else frozenset(fields))
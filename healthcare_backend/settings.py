@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
@@ -48,16 +49,21 @@ INSTALLED_APPS = [
     "patients",
     "doctors",
     "mappings",
+    "stats",
 ]
 
 MIDDLEWARE = [
+    "healthcare_backend.profiling.ProfilingMiddleware",
+    "healthcare_backend.instrumentation.RequestMetricsMiddleware",
+    "healthcare_backend.query_inspection.QueryInspectionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # For static files in production
+    "healthcare_backend.static.StaticFilesMiddleware",  # WhiteNoise static files, WSGI or ASGI
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "healthcare_backend.replicas.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,21 +92,67 @@ WSGI_APPLICATION = "healthcare_backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Gunicorn worker processes and threads per worker. gunicorn.conf.py reads
+# the same variables, so the connection pool below follows them.
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=2, cast=int)
+WEB_THREADS = config('WEB_THREADS', default=4, cast=int)
+
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before
+# reuse. With DB_POOL each worker instead borrows connections from a
+# psycopg_pool pool of up to DB_POOL_MAX_SIZE (one per thread by default), so
+# the server sees at most WEB_CONCURRENCY * DB_POOL_MAX_SIZE connections.
+# Prefer the pool under ASGI, where every request runs in a new thread and
+# persistent connections are never reused.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_CONN_HEALTH_CHECKS = config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DB_POOL = config('DB_POOL', default=False, cast=bool)
+DB_POOL_OPTIONS = {
+    'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'max_size': config('DB_POOL_MAX_SIZE', default=WEB_THREADS, cast=int),
+    # Seconds a request waits for a free connection before failing
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    # Seconds an idle connection above min_size is kept open
+    'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    # Seconds after which a connection is replaced
+    'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+}
+
 # PostgreSQL Configuration (ACTIVE - Neon)
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "healthcare_backend.db",  # django.db.backends.postgresql with pooling and connection metrics
         "NAME": config('DB_NAME', default='healthcare_db'),
         "USER": config('DB_USER', default='postgres'),
         "PASSWORD": config('DB_PASSWORD', default='postgres'),
         "HOST": config('DB_HOST', default='localhost'),
         "PORT": config('DB_PORT', default='5432'),
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
         "OPTIONS": {
             "sslmode": "require",  # Required for Neon cloud database
+            **({"pool": DB_POOL_OPTIONS} if DB_POOL else {}),
         },
     }
 }
 
+# Read replicas: comma-separated hosts serving read-only copies of the
+# primary with the same credentials. GET requests to the patient, doctor and
+# mapping views read from them; see healthcare_backend/replicas.py.
+DB_REPLICA_HOSTS = [host for host in config('DB_REPLICA_HOSTS', default='').split(',') if host]
+for _index, _host in enumerate(DB_REPLICA_HOSTS, 1):
+    DATABASES[f"replica_{_index}"] = {
+        **DATABASES["default"],
+        "HOST": _host,
+        "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['healthcare_backend.replicas.ReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write, so they read
+# their own writes despite replication lag
+DB_REPLICA_PIN_SECONDS = config('DB_REPLICA_PIN_SECONDS', default=10, cast=int)
+
 # SQLite Configuration (backup - uncomment to use SQLite)
 # DATABASES = {
 #     "default": {
@@ -110,6 +162,23 @@ DATABASES = {
 # }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) in production
+# so every worker sees the same doctor directory version.
+
+CACHES = {
+    "default": {
+        "BACKEND": config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        "LOCATION": config('CACHE_LOCATION', default='healthcare-backend'),
+    }
+}
+
+DOCTOR_CACHE_ALIAS = config('DOCTOR_CACHE_ALIAS', default='default')
+DOCTOR_CACHE_TIMEOUT = config('DOCTOR_CACHE_TIMEOUT', default=3600, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -128,6 +197,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.0/topics/auth/passwords/
+# New passwords are hashed with PASSWORD_HASHER: 'scrypt', 'argon2' (needs
+# argon2-cffi) or 'pbkdf2'. The others still verify older hashes, which are
+# rehashed on the next successful login, as are hashes made with other costs.
+
+_PASSWORD_HASHERS = {
+    'scrypt': 'authentication.hashers.ScryptPasswordHasher',
+    'argon2': 'authentication.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS[PASSWORD_HASHER],
+    *(path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+SCRYPT_BLOCK_SIZE = config('SCRYPT_BLOCK_SIZE', default=8, cast=int)
+SCRYPT_PARALLELISM = config('SCRYPT_PARALLELISM', default=1, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=102400, cast=int)
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=8, cast=int)
+
+# Threads hashing passwords for the async login and registration views
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=os.cpu_count() or 1, cast=int)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -159,28 +256,68 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'healthcare_backend.renderers.ORJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'healthcare_backend.renderers.ORJSONParser',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'healthcare_backend.pagination.KeysetPagination',
+    'PAGE_SIZE': config('PAGE_SIZE', default=50, cast=int),
 }
 
+# Largest number of items accepted by the bulk endpoints in one request
+BULK_MAX_ITEMS = config('BULK_MAX_ITEMS', default=5000, cast=int)
+
+# Rows fetched per server-side cursor round trip by the export endpoints
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Serve login, registration and the list and detail GET endpoints with async views (needs an ASGI server)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Fraction of requests whose timings are recorded for /metrics and the
+# Server-Timing header (0 turns recording off)
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=1.0, cast=float)
+# Bearer token required by /metrics; leave empty to serve it to anyone
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Fingerprint every request's SQL, logging queries slower than SLOW_QUERY_MS and
+# queries repeated REPEATED_QUERY_THRESHOLD times or more in one request
+QUERY_INSPECTION = config('QUERY_INSPECTION', default=DEBUG, cast=bool)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=100, cast=float)
+REPEATED_QUERY_THRESHOLD = config('REPEATED_QUERY_THRESHOLD', default=5, cast=int)
+
+# Fraction of requests whose stacks are sampled every PROFILING_INTERVAL_MS (0 turns
+# sampling off), and a token that profiles any request sent with `X-Profile: <token>`
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_TOKEN = config('PROFILING_TOKEN', default='')
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=1.0, cast=float)
+# Where profiles are written, and how many of the newest are kept
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_PROFILES = config('PROFILING_MAX_PROFILES', default=200, cast=int)
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Seconds a user's active flag and token version are cached per process by
+# the stateless JWT authentication, and the most users kept in that cache
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+
+# Seconds between syncs of each process's in-memory set of revoked token ids
+REVOKED_TOKENS_SYNC_INTERVAL = config('REVOKED_TOKENS_SYNC_INTERVAL', default=30, cast=int)
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool)
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000,http://127.0.0.1:3000').split(',')
@@ -0,0 +1,41 @@
+"""
+Static file serving for both server interfaces.
+
+WhiteNoise's middleware is synchronous only. Under ASGI, a single sync-only
+middleware makes Django run the whole middleware chain and every view in one
+thread per worker, so the async views would gain nothing.
+StaticFilesMiddleware serves the same files and also works in an async
+chain. Other requests are passed straight on after an in-memory lookup.
+Opening a static file, and finding one when WHITENOISE_AUTOREFRESH is on,
+happen in a worker thread.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise middleware that can also run in an async middleware chain."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
@@ -0,0 +1,123 @@
+import contextlib
+import functools
+import inspect
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from authentication.tokens import UserRefreshToken
+from .query_inspection import request_inspected
+
+User = get_user_model()
+
+
+class QueryCountMixin:
+    """
+    Test helpers asserting that an endpoint runs a fixed number of queries.
+
+    `assertConstantQueries` requests the same URL twice, growing the data set
+    in between, and fails if the query count changes or differs from the
+    declared budget. A serializer that starts reading an unselected relation
+    shows up as an extra query per row.
+    """
+
+    def create_authenticated_client(self, email='tester@example.com', name='Tester'):
+        """Return an API client logged in as a fresh user, and that user."""
+        user = User.objects.create_user(email=email, name=name, password='Test@12345')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client, user
+
+    def count_queries(self, client, url):
+        """Request `url` and return the number of queries it executed."""
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, client, url, expected, grow, rows=10):
+        """Assert `url` runs `expected` queries before and after `grow(rows)`."""
+        before = self.count_queries(client, url)
+        grow(rows)
+        after = self.count_queries(client, url)
+        self.assertEqual(
+            (before, after), (expected, expected),
+            f'{url} ran {before} queries, then {after} after adding {rows} rows; '
+            f'expected {expected} both times.'
+        )
+
+
+@contextlib.contextmanager
+def capture_query_reports():
+    """Inspect the queries of every request served in the block, collecting (request, report) pairs."""
+    reports = []
+
+    def receiver(sender, request, report, **kwargs):
+        reports.append((request, report))
+
+    request_inspected.connect(receiver)
+    try:
+        with override_settings(QUERY_INSPECTION=True):
+            yield reports
+    finally:
+        request_inspected.disconnect(receiver)
+
+
+def query_budget(queries):
+    """
+    Decorator failing a test, or every test of a class, if any request it makes
+    runs more than `queries` queries or repeats one REPEATED_QUERY_THRESHOLD times.
+    """
+    def check(test_case, reports):
+        for request, report in reports:
+            url = f'{request.method} {request.get_full_path()}'
+            test_case.assertLessEqual(
+                report.count, queries, f'{url} ran {report.count} queries; the budget is {queries}.'
+            )
+            for key, count, origin in report.get_repeated():
+                test_case.fail(f'{url} ran the same query {count} times, first repeated at {origin}: {key}')
+
+    def decorator(target):
+        if isinstance(target, type):
+            for name, test in list(vars(target).items()):
+                if name.startswith('test') and callable(test):
+                    setattr(target, name, decorator(test))
+            return target
+
+        if inspect.iscoroutinefunction(target):
+            @functools.wraps(target)
+            async def wrapper(test_case, *args, **kwargs):
+                with capture_query_reports() as reports:
+                    await target(test_case, *args, **kwargs)
+                check(test_case, reports)
+        else:
+            @functools.wraps(target)
+            def wrapper(test_case, *args, **kwargs):
+                with capture_query_reports() as reports:
+                    target(test_case, *args, **kwargs)
+                check(test_case, reports)
+        return wrapper
+    return decorator
+
+
+class AsyncViewMixin:
+    """Test helpers comparing an async view with the synchronous view it mirrors."""
+
+    async def call_async_view(self, view_class, path, user=None, headers=None, **kwargs):
+        """GET `path` through `view_class`, with a bearer token for `user` if given."""
+        headers = dict(headers or {})
+        if user is not None:
+            headers['Authorization'] = f'Bearer {UserRefreshToken.for_user(user).access_token}'
+        request = AsyncRequestFactory().get(path, headers=headers)
+        return await view_class.as_view()(request, **kwargs)
+
+    async def assertSameResponse(self, client, view_class, path, user, **kwargs):
+        """Assert the async view answers `path` exactly like `client` does."""
+        expected = await sync_to_async(client.get)(path)
+        response = await self.call_async_view(view_class, path, user, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
@@ -0,0 +1,472 @@
+import asyncio
+import base64
+import inspect
+import datetime
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, router
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.test import (
+    AsyncClient, AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from authentication import cache as user_cache, revocation
+from authentication.tokens import UserRefreshToken
+from patients.models import Patient
+from patients.views import PatientListCreateView
+from doctors.views import DoctorListCreateView
+from . import bulk_load, instrumentation, profiling, query_inspection, replicas
+from .db import base as db
+from .pagination import KeysetPagination
+from .testing import QueryCountMixin, capture_query_reports, query_budget
+
+
+class KeysetPaginationTests(QueryCountMixin, TestCase):
+    """Cursors walk the listing both ways, break created_at ties by id and reject tampering."""
+
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        created_at = datetime.datetime(2026, 1, 6, 10, tzinfo=datetime.timezone.utc)
+        for i in range(5):
+            patient = Patient.objects.create(
+                user=self.user, name=f'Patient {i}', age=30, gender='F',
+                phone='9123456780', address='Green Park, New Delhi',
+            )
+            # Patients 1 to 3 share a timestamp, so only the id orders them.
+            Patient.objects.filter(pk=patient.pk).update(
+                created_at=created_at + datetime.timedelta(minutes=min(max(i, 1), 3))
+            )
+        self.expected = list(Patient.objects.order_by('-created_at', '-id').values_list('name', flat=True))
+
+    def get_page(self, url, status=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def names(self, page):
+        return [patient['name'] for patient in page['results']]
+
+    def test_forward_and_backward(self):
+        pages = [self.get_page('/api/patients/?page_size=2')]
+        while pages[-1]['next']:
+            pages.append(self.get_page(pages[-1]['next']))
+        chunks = [self.expected[0:2], self.expected[2:4], self.expected[4:]]
+        self.assertEqual([self.names(page) for page in pages], chunks)
+        self.assertEqual(self.expected[1:4], ['Patient 3', 'Patient 2', 'Patient 1'])
+        self.assertIsNone(pages[0]['previous'])
+
+        backward = [pages[-1]]
+        while backward[-1]['previous']:
+            backward.append(self.get_page(backward[-1]['previous']))
+        self.assertEqual([self.names(page) for page in reversed(backward)], chunks)
+        self.assertIsNotNone(backward[-1]['next'])
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.get_page('/api/patients/?page_size=1')['results']), 1)
+        for page_size in ('0', '-3', 'many'):
+            self.assertEqual(len(self.get_page(f'/api/patients/?page_size={page_size}')['results']), 5)
+        with mock.patch.object(KeysetPagination, 'max_page_size', 2):
+            self.assertEqual(len(self.get_page('/api/patients/?page_size=100000')['results']), 2)
+
+    def test_invalid_cursors_are_rejected(self):
+        def encode(raw):
+            return base64.urlsafe_b64encode(raw.encode()).decode()
+
+        for cursor in (
+            'not base64!', encode('garbage'), encode('x|2026-01-06T10:00:00+00:00|1'),
+            encode('f|yesterday|1'), encode('f|2026-13-40T10:00:00+00:00|1'), encode('f|2026-01-06T10:00:00|1'),
+            encode('f|2026-01-06T10:00:00+00:00|one'), encode('f|2026-01-06T10:00:00+00:00|' + '9' * 30),
+            encode('f|2026-01-06T10:00:00+00:00|-1'), '%ff%fe',
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    self.get_page(f'/api/patients/?cursor={cursor}', 400), {'cursor': ['Invalid cursor']}
+                )
+
+
+class BulkLoadTests(QueryCountMixin, TestCase):
+    """The batched INSERT loader keeps the timestamps it is given."""
+
+    def test_given_timestamps_are_kept(self):
+        user = self.create_authenticated_client()[1]
+        created_at = datetime.datetime(2025, 3, 1, 9, tzinfo=datetime.timezone.utc)
+        fields = ['user_id', 'name', 'age', 'gender', 'phone', 'address', 'created_at']
+        bulk_load.load_rows(Patient, fields, [
+            [user.pk, f'Patient {i}', 30, 'F', '9123456780', 'Delhi', created_at] for i in range(3)
+        ], use_copy=False)
+
+        patients = Patient.objects.all()
+        self.assertEqual({patient.created_at for patient in patients}, {created_at})
+        self.assertTrue(all(patient.updated_at > created_at for patient in patients))
+
+
+class AsgiMiddlewareTests(SimpleTestCase):
+    """Every middleware is async-capable, so ASGI requests are not funnelled through one thread."""
+
+    def test_middleware_chain_is_async(self):
+        self.assertTrue(inspect.iscoroutinefunction(ASGIHandler()._middleware_chain))
+
+    async def test_static_files_are_served(self):
+        with tempfile.TemporaryDirectory() as static_root:
+            with open(f'{static_root}/app.css', 'w') as handle:
+                handle.write('body { margin: 0; }')
+            with override_settings(STATIC_ROOT=static_root):
+                response = await AsyncClient().get('/static/app.css')
+                body = b''.join([chunk async for chunk in response])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, b'body { margin: 0; }')
+
+
+class PooledBackendTests(SimpleTestCase):
+    """The backend builds its pool from the database settings without connecting."""
+
+    def get_connection(self, **settings_dict):
+        handler = ConnectionHandler({
+            'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+            'pooled': {'ENGINE': 'healthcare_backend.db', 'NAME': 'healthcare_db', **settings_dict},
+        })
+        self.addCleanup(db.close_pools)
+        return handler['pooled']
+
+    def test_pool_is_built_from_options(self):
+        connection = self.get_connection(
+            CONN_HEALTH_CHECKS=True,
+            OPTIONS={'sslmode': 'require', 'pool': {'min_size': 2, 'max_size': 5, 'timeout': 3}},
+        )
+        pool = connection.pool
+
+        self.assertIs(connection.pool, pool)
+        self.assertTrue(pool.closed)
+        self.assertEqual((pool.min_size, pool.max_size, pool.timeout), (2, 5, 3))
+        self.assertIsNotNone(pool._check)
+        self.assertEqual(pool.kwargs['sslmode'], 'require')
+        self.assertNotIn('pool', pool.kwargs)
+        self.assertNotIn('pool', connection.get_connection_params())
+        self.assertEqual(db.get_stats()['pooled']['pool']['pool_max'], 5)
+
+    def test_pool_requires_conn_max_age_zero(self):
+        connection = self.get_connection(CONN_MAX_AGE=60, OPTIONS={'pool': True})
+        with self.assertRaises(ImproperlyConfigured):
+            connection.pool
+
+    def test_no_pool_without_option(self):
+        self.assertIsNone(self.get_connection(CONN_MAX_AGE=60).pool)
+
+
+class DatabaseStatsTests(QueryCountMixin, TestCase):
+    """The connection counters are visible to staff only."""
+
+    def test_staff_only(self):
+        client, user = self.create_authenticated_client()
+        self.assertEqual(client.get('/api/db-stats/').status_code, 403)
+
+        user.is_staff = True
+        user.save()
+        stats = client.get('/api/db-stats/').json()['default']
+        self.assertEqual(set(db.COUNTERS) - set(stats), set())
+        self.assertFalse(stats['pooled'])
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingTests(QueryCountMixin, TestCase):
+    """Safe requests to opted-in views read from a replica unless the user just wrote."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.create_authenticated_client()[1]
+
+    def route(self, method='GET', view_class=PatientListCreateView, write=False):
+        """Return the alias a read would use while the middleware serves a request."""
+        aliases = []
+
+        def get_response(request):
+            middleware.process_view(request, view_class.as_view(), (), {})
+            request.user = self.user
+            if write:
+                router.db_for_write(Patient)
+            aliases.append(router.db_for_read(Patient))
+            return HttpResponse()
+
+        middleware = replicas.ReplicaRoutingMiddleware(get_response)
+        middleware(RequestFactory().generic(method, '/api/patients/'))
+        replicas.clear_request_state()
+        return aliases[0]
+
+    def test_safe_requests_to_opted_in_views_read_from_replicas(self):
+        self.assertIn(self.route(), {'replica_1', 'replica_2'})
+        self.assertIn(self.route('HEAD'), {'replica_1', 'replica_2'})
+        self.assertEqual(self.route(view_class=DoctorListCreateView), 'default')
+        self.assertEqual(self.route('POST'), 'default')
+        self.assertEqual(router.db_for_read(Patient), 'default')
+
+    def test_writers_read_from_the_primary_until_the_pin_expires(self):
+        self.assertEqual(self.route('POST', write=True), 'default')
+        self.assertTrue(replicas.is_pinned(self.user.pk))
+        self.assertEqual(self.route(), 'default')
+
+        cache.delete(replicas.PIN_KEY.format(self.user.pk))
+        self.assertIn(self.route(), {'replica_1', 'replica_2'})
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self):
+        self.assertEqual(self.route(write=True), 'default')
+
+    def test_authentication_reads_use_the_primary(self):
+        # A lagging replica would not have the new user, a token version bump
+        # or a revocation yet, so token authentication must not read from it.
+        routes = []
+        db_for_read = replicas.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            routes.append((model, db_for_read(router, model, **hints)))
+            return 'default'
+
+        token = UserRefreshToken.for_user(self.user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        user_cache.clear()
+        revocation.clear()
+        with mock.patch.object(replicas.ReplicaRouter, 'db_for_read', autospec=True, side_effect=record):
+            self.assertEqual(client.get('/api/patients/').status_code, 200)
+        aliases = {}
+        for model, alias in routes:
+            aliases.setdefault(model._meta.label, set()).add(alias)
+        self.assertEqual(aliases['authentication.User'], {'default'})
+        self.assertEqual(aliases['authentication.RevokedToken'], {'default'})
+        self.assertLessEqual(aliases['patients.Patient'], {'replica_1', 'replica_2'})
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.route(), 'default')
+        self.assertEqual(self.route('POST', write=True), 'default')
+        self.assertFalse(replicas.is_pinned(self.user.pk))
+
+    @override_settings(DATABASE_REPLICAS=['default'])
+    def test_only_successful_writes_pin(self):
+        client, user = self.create_authenticated_client('writer@example.com')
+        client.get('/api/patients/')
+        client.post('/api/patients/', {'name': 'No age'}, format='json')
+        self.assertFalse(replicas.is_pinned(user.pk))
+
+        response = client.post('/api/patients/', {
+            'name': 'Suresh Sharma', 'age': 45, 'gender': 'M',
+            'phone': '9123456780', 'address': 'Green Park, New Delhi',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(replicas.is_pinned(user.pk))
+
+
+class RequestMetricsTests(QueryCountMixin, TestCase):
+    """Sampled requests report their timings in Server-Timing and /metrics."""
+
+    def setUp(self):
+        instrumentation.reset()
+        self.client, self.user = self.create_authenticated_client()
+
+    def get_series(self, name):
+        return instrumentation.HISTOGRAMS[name].get_series()
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_requests_are_timed(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/patients/')
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', response['Server-Timing'])
+        self.assertEqual(connection.execute_wrappers, [])
+        labels = ('patient-list-create', 'GET', '200')
+        _, queries, count = self.get_series('queries')[labels]
+        self.assertEqual((queries, count), (len(context.captured_queries), 1))
+        self.assertEqual(self.get_series('size')[labels][1], len(response.content))
+        self.assertGreater(self.get_series('serialize')[labels][1], 0)
+
+        with override_settings(DEBUG=True):
+            body = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{route="patient-list-create",method="GET",status="200"} 1', body
+        )
+        self.assertIn(
+            'http_request_db_queries_bucket{route="patient-list-create",method="GET",status="200",le="+Inf"} 1', body
+        )
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_not_timed(self):
+        response = self.client.get('/api/patients/')
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.get_series('duration'), {})
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    def test_metrics_without_token_are_only_served_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class QueryInspectionTests(QueryCountMixin, TestCase):
+    """Repeated and slow queries are logged with the code that ran them."""
+
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+
+    def serve(self, get_response):
+        middleware = query_inspection.QueryInspectionMiddleware(get_response)
+        with capture_query_reports() as reports:
+            middleware(RequestFactory().get('/api/patients/'))
+        self.assertEqual(connection.execute_wrappers, [])
+        return reports[0][1]
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            query_inspection.fingerprint(
+                "SELECT *  FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) AND t2.c > 10 LIMIT 21"
+            ),
+            'SELECT * FROM t WHERE a = ? AND b IN (...) AND t2.c > ? LIMIT ?',
+        )
+        self.assertEqual(
+            query_inspection.fingerprint('INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'),
+            'INSERT INTO t (a, b) VALUES (...)',
+        )
+
+    def test_repeated_queries_are_logged_with_their_origin(self):
+        def get_response(request):
+            for pk in range(5):
+                Patient.objects.filter(pk=pk).exists()
+            return HttpResponse()
+
+        with self.assertLogs('healthcare_backend.query_inspection', 'WARNING') as logs:
+            report = self.serve(get_response)
+
+        self.assertEqual(report.count, 5)
+        [(_, count, origin)] = report.get_repeated()
+        self.assertEqual(count, 5)
+        self.assertTrue(origin.startswith('healthcare_backend/tests.py:'), origin)
+        self.assertIn('ran the same query 5 times', logs.output[0])
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged(self):
+        def get_response(request):
+            Patient.objects.exists()
+            return HttpResponse()
+
+        with self.assertLogs('healthcare_backend.query_inspection', 'WARNING') as logs:
+            self.serve(get_response)
+        self.assertIn('Slow query', logs.output[0])
+        self.assertIn('in get_response', logs.output[0])
+
+    def test_query_budget(self):
+        query_budget(2)(lambda test_case: test_case.client.get('/api/patients/'))(self)
+        with self.assertRaisesMessage(AssertionError, 'GET /api/patients/ ran 2 queries; the budget is 1.'):
+            query_budget(1)(lambda test_case: test_case.client.get('/api/patients/'))(self)
+
+
+class ProfilingTests(QueryCountMixin, TestCase):
+    """Sampled requests are profiled and their stacks served to staff as folded text."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            PROFILING_DIR=directory.name, PROFILING_TOKEN='s3cret', PROFILING_SAMPLE_RATE=0.0
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client, self.user = self.create_authenticated_client()
+
+    def test_unsampled_requests_are_not_profiled(self):
+        response = self.client.get('/api/patients/', headers={'X-Profile': 'wrong'})
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(profiling.list_profiles(), [])
+
+    @override_settings(PROFILING_INTERVAL_MS=0.1)
+    def test_requests_with_the_token_are_profiled(self):
+        response = self.client.get(
+            '/api/patients/', headers={'X-Profile': 's3cret', 'X-Request-ID': 'req-1'}
+        )
+        profile_id = response['X-Profile-Id']
+        self.assertNotEqual(profile_id, 'req-1')
+        [profile] = profiling.list_profiles()
+        self.assertEqual(
+            (profile['id'], profile['request_id'], profile['route'], profile['status']),
+            (profile_id, 'req-1', 'patient-list-create', 200)
+        )
+        self.assertEqual(self.client.get('/api/profiles/').status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profiles/').json()[0]['id'], profile_id)
+        response = self.client.get(f'/api/profiles/{profile_id}/')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="{profile_id}.folded"')
+        total = 0
+        for line in response.content.decode().splitlines():
+            stack, count = line.rsplit(' ', 1)
+            self.assertNotIn('\n', stack)
+            total += int(count)
+        self.assertEqual(total, profile['samples'])
+        self.assertEqual(self.client.get('/api/profiles/missing/').status_code, 404)
+        self.assertEqual(self.client.get('/api/profiles/..%2Fsecret/').status_code, 404)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_PROFILES=2)
+    def test_only_the_newest_profiles_are_kept(self):
+        for request_id in ('a', 'b', 'c'):
+            self.client.get('/api/patients/', headers={'X-Request-ID': request_id})
+        self.assertEqual([profile['request_id'] for profile in profiling.list_profiles()], ['c', 'b'])
+        response = self.client.get('/api/patients/', headers={'X-Request-ID': '../../etc'})
+        self.assertTrue(profiling.PROFILE_ID.match(response['X-Profile-Id']))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_INTERVAL_MS=0.1)
+    async def test_asgi_requests_sample_the_view_and_its_sync_code(self):
+        def spin():
+            finish = time.perf_counter() + 0.05
+            while time.perf_counter() < finish:
+                pass
+
+        def query():
+            spin()
+
+        async def view(request):
+            spin()
+            await sync_to_async(query)()
+            # Waiting on I/O runs nothing of this request, so nothing is sampled.
+            await asyncio.sleep(0.05)
+            return HttpResponse()
+
+        response = await profiling.ProfilingMiddleware(view)(AsyncRequestFactory().get('/api/patients/'))
+        stacks = (await sync_to_async(profiling.get_profile)(response['X-Profile-Id'])).splitlines()
+        self.assertTrue(any('<locals>.view' in stack and '<locals>.spin' in stack for stack in stacks))
+        self.assertTrue(any('<locals>.query' in stack and '<locals>.spin' in stack for stack in stacks))
+        self.assertEqual([stack for stack in stacks if 'spin' not in stack and 'wait' in stack], [])
+
+    async def test_asgi_requests_are_profiled(self):
+        response = await AsyncClient().get('/', headers={'X-Profile': 's3cret'})
+        [profile] = await sync_to_async(profiling.list_profiles)()
+        self.assertEqual((profile['id'], profile['route']), (response['X-Profile-Id'], 'api-root'))
+
+    def test_fold(self):
+        def inner():
+            return profiling.fold(sys._getframe())
+
+        stack = inner()
+        self.assertTrue(
+            stack.endswith(
+                'ProfilingTests.test_fold (healthcare_backend/tests.py:'
+                f'{ProfilingTests.test_fold.__code__.co_firstlineno});'
+                'ProfilingTests.test_fold.<locals>.inner (healthcare_backend/tests.py:'
+                f'{ProfilingTests.test_fold.__code__.co_firstlineno + 1})'
+            ),
+            stack,
+        )
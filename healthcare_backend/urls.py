@@ -17,13 +17,19 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from .views import api_root
+from .instrumentation import metrics_view
+from .views import api_root, DatabaseStatsView, ProfileDetailView, ProfileListView
 
 urlpatterns = [
     path("", api_root, name='api-root'),
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name='metrics'),
     path("api/auth/", include('authentication.urls')),
     path("api/patients/", include('patients.urls')),
     path("api/doctors/", include('doctors.urls')),
     path("api/mappings/", include('mappings.urls')),
+    path("api/stats/", include('stats.urls')),
+    path("api/db-stats/", DatabaseStatsView.as_view(), name='db-stats'),
+    path("api/profiles/", ProfileListView.as_view(), name='profile-list'),
+    path("api/profiles/<str:profile_id>/", ProfileDetailView.as_view(), name='profile-detail'),
 ]
@@ -1,7 +1,12 @@
+from django.db import connections
+from django.http import Http404, HttpResponse
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.views import APIView
+from . import profiling
+from .db import base as db
 
 
 @api_view(['GET'])
@@ -18,20 +23,35 @@ def api_root(request):
             'authentication': {
                 'register': '/api/auth/register/ [POST]',
                 'login': '/api/auth/login/ [POST]',
+                'refresh': '/api/auth/refresh/ [POST]',
+                'logout': '/api/auth/logout/ [POST]',
             },
             'patients': {
                 'list_create': '/api/patients/ [GET, POST]',
                 'detail': '/api/patients/<id>/ [GET, PUT, DELETE]',
+                'bulk': '/api/patients/bulk/ [POST, PUT, PATCH, DELETE]',
+                'export': '/api/patients/export/?type=ndjson|csv [GET]',
             },
             'doctors': {
                 'list_create': '/api/doctors/ [GET, POST]',
                 'detail': '/api/doctors/<id>/ [GET, PUT, DELETE]',
+                'patients': '/api/doctors/<id>/patients/ [GET]',
+                'workload': '/api/doctors/workload/ [GET]',
+                'bulk': '/api/doctors/bulk/ [POST, PUT, PATCH, DELETE]',
+                'cache_stats': '/api/doctors/cache-stats/ [GET] (staff only)',
             },
             'mappings': {
                 'list_create': '/api/mappings/ [GET, POST]',
                 'by_patient': '/api/mappings/<patient_id>/ [GET]',
                 'detail': '/api/mappings/detail/<id>/ [GET, DELETE]',
+                'bulk': '/api/mappings/bulk/ [POST, DELETE]',
+                'export': '/api/mappings/export/?type=ndjson|csv [GET]',
             },
+            'stats': '/api/stats/ [GET] (staff only)',
+            'db_stats': '/api/db-stats/ [GET] (staff only)',
+            'metrics': '/metrics [GET] (Prometheus text format)',
+            'profiles': '/api/profiles/ [GET] (staff only)',
+            'profile': '/api/profiles/<id>/ [GET] (staff only, folded stacks)',
             'admin': '/admin/',
         },
         'documentation': 'See README.md and API_DOCUMENTATION.md for detailed API documentation',
@@ -41,5 +61,48 @@ def api_root(request):
             'user2': 'priya.sharma@email.com / Test@123',
             'user3': 'amit.patel@email.com / Test@123',
         },
-        'note': 'All endpoints except /api/auth/register/ and /api/auth/login/ require JWT authentication',
+        'note': 'All endpoints except /api/auth/register/, /api/auth/login/ and /api/auth/refresh/ require JWT authentication',
     }, status=status.HTTP_200_OK)
+
+
+class DatabaseStatsView(APIView):
+    """API view exposing the database connection counters."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Get this worker's connection churn and pool counters per database."""
+        stats = db.get_stats()
+        return Response({
+            connection.alias: {
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'pooled': bool(connection.settings_dict['OPTIONS'].get('pool')),
+                **stats.get(connection.alias, dict.fromkeys(db.COUNTERS, 0)),
+            }
+            for connection in connections.all()
+        }, status=status.HTTP_200_OK)
+
+
+class ProfileListView(APIView):
+    """API view listing the stored request profiles."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Get the description of every stored profile, newest first."""
+        return Response(profiling.list_profiles(), status=status.HTTP_200_OK)
+
+
+class ProfileDetailView(APIView):
+    """API view downloading one request profile as folded stacks."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        """Download a profile in the folded format read by flamegraph tools."""
+        stacks = profiling.get_profile(profile_id)
+        if stacks is None:
+            raise Http404
+        response = HttpResponse(stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{profile_id}.folded"'
+        return response
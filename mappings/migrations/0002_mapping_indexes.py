@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0002_doctor_indexes'),
+        ('mappings', '0001_initial'),
+        ('patients', '0002_patient_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='mappings_patient_created_idx'),
+        ),
+    ]
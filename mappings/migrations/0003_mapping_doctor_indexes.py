@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0003_doctor_search_index'),
+        ('mappings', '0002_mapping_indexes'),
+        ('patients', '0003_patient_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['doctor', '-created_at', '-id'], name='mappings_doctor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patientdoctormapping',
+            index=models.Index(fields=['doctor', 'assigned_date'], name='mappings_doctor_assigned_idx'),
+        ),
+    ]
@@ -30,3 +30,11 @@ class PatientDoctorMapping(models.Model):
         verbose_name_plural = 'Patient-Doctor Mappings'
         unique_together = ['patient', 'doctor']  # Prevent duplicate mappings
         ordering = ['-created_at']
+        indexes = [
+            # Per-patient listing, newest first.
+            models.Index(fields=['patient', '-created_at', '-id'], name='mappings_patient_created_idx'),
+            # Per-doctor roster, newest first.
+            models.Index(fields=['doctor', '-created_at', '-id'], name='mappings_doctor_created_idx'),
+            # Per-doctor patient counts and latest assignment date, read from the index alone.
+            models.Index(fields=['doctor', 'assigned_date'], name='mappings_doctor_assigned_idx'),
+        ]
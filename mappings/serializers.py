@@ -21,6 +21,24 @@ class PatientDoctorMappingSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'assigned_date', 'created_at', 'updated_at']
     
+    # Columns read while serializing, including the nested patient and doctor.
+    select_related_fields = [
+        'patient', 'doctor',
+        *(f'patient__{field}' for field in PatientSerializer.select_related_fields),
+        *(f'doctor__{field}' for field in DoctorSerializer.select_related_fields),
+    ]
+    only_fields = [
+        'id', 'patient', 'doctor', 'assigned_date', 'notes',
+        'created_at', 'updated_at',
+        *(f'patient__{field}' for field in PatientSerializer.only_fields),
+        *(f'doctor__{field}' for field in DoctorSerializer.only_fields),
+    ]
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Fetch the mapping, patient, user and doctor in a single query."""
+        return queryset.select_related(*cls.select_related_fields).only(*cls.only_fields)
+    
     def validate(self, attrs):
         """Validate that the patient belongs to the requesting user."""
         request = self.context.get('request')
@@ -48,3 +66,32 @@ class PatientDoctorMappingListSerializer(serializers.ModelSerializer):
             'id', 'patient', 'doctor', 'patient_name', 'doctor_name',
             'doctor_specialization', 'assigned_date', 'notes'
         ]
+    
+    # Columns read while serializing; `created_at` is kept for cursor pagination.
+    select_related_fields = ['patient', 'doctor']
+    only_fields = [
+        'id', 'patient', 'doctor', 'assigned_date', 'notes', 'created_at',
+        'patient__name', 'doctor__name', 'doctor__specialization',
+    ]
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Fetch the patient and doctor names in the same query as the mappings."""
+        return queryset.select_related(*cls.select_related_fields).only(*cls.only_fields)
+
+
+class PatientDoctorMappingBulkSerializer(serializers.ModelSerializer):
+    """Serializer for validating one item of a bulk mapping request.
+    
+    Patient and doctor are plain ids here; they are resolved for the whole
+    batch at once by PatientDoctorMappingBulkView.validate_batch.
+    """
+    
+    patient = serializers.IntegerField()
+    doctor = serializers.IntegerField()
+    
+    class Meta:
+        model = PatientDoctorMapping
+        fields = ['patient', 'doctor', 'notes']
+        # unique_together is checked set-based in the view, not per row.
+        validators = []
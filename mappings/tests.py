@@ -1,3 +1,208 @@
 from django.test import TestCase
+from healthcare_backend.serializers import get_values_serializer
+from healthcare_backend.testing import AsyncViewMixin, QueryCountMixin
+from doctors.models import Doctor
+from doctors.serializers import DoctorSerializer
+from patients.models import Patient
+from patients.serializers import PatientSerializer
+from .models import PatientDoctorMapping
+from .serializers import PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer
+from .views import (
+    AsyncPatientDoctorMappingListCreateView,
+    AsyncPatientDoctorsByPatientView,
+    AsyncPatientDoctorMappingDetailView
+)
 
-# Create your tests here.
+
+class MappingFixturesMixin(QueryCountMixin):
+    """Helpers creating patients, doctors and mappings for the test user."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        self.patient = self.create_patient()
+    
+    def create_patient(self, user=None):
+        return Patient.objects.create(
+            user=user or self.user,
+            name='Suresh Sharma',
+            age=45,
+            gender='M',
+            phone='9123456780',
+            address='Green Park, New Delhi',
+        )
+    
+    def create_doctor(self):
+        i = Doctor.objects.count()
+        return Doctor.objects.create(
+            name=f'Dr. Doctor {i}',
+            specialization='CARDIOLOGY',
+            phone='9876543210',
+            email=f'doctor{i}@hospital.org',
+            experience_years=10,
+            qualification='MBBS, MD',
+            address='AIIMS, New Delhi',
+        )
+    
+    def create_mappings(self, count, patient=None):
+        return [
+            PatientDoctorMapping.objects.create(
+                patient=patient or self.create_patient(),
+                doctor=self.create_doctor(),
+                notes='Regular checkup',
+            )
+            for _ in range(count)
+        ]
+
+
+class MappingQueryCountTests(MappingFixturesMixin, TestCase):
+    """Mapping endpoints must not issue a query per row."""
+    
+    def setUp(self):
+        super().setUp()
+        self.mapping = self.create_mappings(1)[0]
+    
+    # Each GET runs the conditional-request aggregate before its own queries.
+    def test_list_query_count(self):
+        self.assertConstantQueries(self.client, '/api/mappings/', 2, self.create_mappings)
+    
+    def test_by_patient_query_count(self):
+        self.assertConstantQueries(
+            self.client,
+            f'/api/mappings/{self.patient.pk}/',
+            3,
+            lambda count: self.create_mappings(count, patient=self.patient),
+        )
+    
+    def test_detail_query_count(self):
+        self.assertConstantQueries(
+            self.client, f'/api/mappings/detail/{self.mapping.pk}/', 2, self.create_mappings
+        )
+
+
+class ValuesSerializerParityTests(MappingFixturesMixin, TestCase):
+    """The values() read serializers render exactly what the model serializers do."""
+    
+    def setUp(self):
+        super().setUp()
+        self.create_mappings(3)
+        self.create_mappings(2, patient=self.patient)
+        Patient.objects.filter(pk=self.patient.pk).update(medical_history='Asthma')
+    
+    def assertParity(self, serializer_class, queryset, fields=None):
+        kwargs = {} if fields is None else {'fields': fields}
+        expected = serializer_class(queryset.order_by('pk'), many=True, **kwargs).data
+        serializer = get_values_serializer(serializer_class, fields)
+        with self.assertNumQueries(1):
+            actual = serializer.serialize(serializer.get_queryset(queryset.order_by('pk')))
+        self.assertEqual(actual, expected)
+        self.assertEqual([list(row) for row in actual], [list(row) for row in expected])
+    
+    def test_patients(self):
+        self.assertParity(PatientSerializer, Patient.objects.all())
+        self.assertParity(PatientSerializer, Patient.objects.all(), ['user_email', 'name', 'updated_at'])
+    
+    def test_doctors(self):
+        self.assertParity(DoctorSerializer, Doctor.objects.all())
+        self.assertParity(DoctorSerializer, Doctor.objects.all(), ['experience_years'])
+    
+    def test_mappings(self):
+        self.assertParity(PatientDoctorMappingListSerializer, PatientDoctorMapping.objects.all())
+        self.assertParity(PatientDoctorMappingSerializer, PatientDoctorMapping.objects.all())
+    
+    def test_list_endpoint_pages(self):
+        first = self.client.get('/api/mappings/', {'page_size': 3}).json()
+        second = self.client.get(first['next']).json()
+        expected = PatientDoctorMappingListSerializer(
+            PatientDoctorMapping.objects.order_by('-created_at', '-id'), many=True
+        ).data
+        self.assertEqual(first['results'] + second['results'], expected)
+
+
+class MappingConditionalGetTests(MappingFixturesMixin, TestCase):
+    """Mapping ETags change when the patients or doctors they render change."""
+    
+    def setUp(self):
+        super().setUp()
+        self.mapping = self.create_mappings(1, patient=self.patient)[0]
+    
+    def assertChangedBy(self, url, change):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        change()
+        self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 200)
+    
+    def rename_doctor(self):
+        self.mapping.doctor.name = 'Dr. Renamed'
+        self.mapping.doctor.save()
+    
+    def rename_patient(self):
+        self.patient.name = 'Renamed'
+        self.patient.save()
+    
+    def test_list(self):
+        self.assertChangedBy('/api/mappings/', self.rename_doctor)
+    
+    def test_detail(self):
+        self.assertChangedBy(f'/api/mappings/detail/{self.mapping.pk}/', self.rename_doctor)
+    
+    def test_by_patient(self):
+        url = f'/api/mappings/{self.patient.pk}/'
+        self.assertChangedBy(url, self.rename_doctor)
+        self.assertChangedBy(url, self.mapping.delete)
+        self.assertChangedBy(url, self.rename_patient)
+    
+    def test_missing_objects_are_not_found_for_any_etag(self):
+        for url in ('/api/mappings/detail/999999/', '/api/mappings/999999/'):
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': '*'}).status_code, 404)
+
+
+class MappingBulkTests(MappingFixturesMixin, TestCase):
+    """Bulk mapping writes resolve patients, doctors and duplicates per batch."""
+    
+    def test_create_query_count_is_independent_of_batch_size(self):
+        for count in (5, 50):
+            payload = [
+                {'patient': self.create_patient().pk, 'doctor': self.create_doctor().pk}
+                for _ in range(count)
+            ]
+            with self.assertNumQueries(7):
+                response = self.client.post('/api/mappings/bulk/', payload, format='json')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(PatientDoctorMapping.objects.count(), 55)
+    
+    def test_duplicates_and_foreign_patients_are_rejected(self):
+        existing = self.create_mappings(1, patient=self.patient)[0]
+        other_patient = self.create_patient(user=self.create_authenticated_client('other@example.com')[1])
+        
+        response = self.client.post('/api/mappings/bulk/', [
+            {'patient': self.patient.pk, 'doctor': existing.doctor_id},
+            {'patient': other_patient.pk, 'doctor': existing.doctor_id},
+        ], format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [
+            {'index': 0, 'errors': {'non_field_errors': ['This doctor is already assigned to this patient.']}},
+            {'index': 1, 'errors': {'patient': ['You can only assign doctors to your own patients.']}},
+        ])
+        self.assertEqual(PatientDoctorMapping.objects.count(), 1)
+
+
+class MappingAsyncViewTests(AsyncViewMixin, MappingFixturesMixin, TestCase):
+    """The async views return the same payloads as the synchronous ones."""
+    
+    def setUp(self):
+        super().setUp()
+        self.mapping = self.create_mappings(2, patient=self.patient)[0]
+    
+    async def test_views_match_sync_views(self):
+        await self.assertSameResponse(
+            self.client, AsyncPatientDoctorMappingListCreateView, '/api/mappings/', self.user
+        )
+        await self.assertSameResponse(
+            self.client, AsyncPatientDoctorsByPatientView, f'/api/mappings/{self.patient.pk}/',
+            self.user, patient_id=self.patient.pk
+        )
+        await self.assertSameResponse(
+            self.client, AsyncPatientDoctorMappingDetailView, f'/api/mappings/detail/{self.mapping.pk}/',
+            self.user, pk=self.mapping.pk
+        )
@@ -1,12 +1,29 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     PatientDoctorMappingListCreateView,
     PatientDoctorsByPatientView,
-    PatientDoctorMappingDetailView
+    PatientDoctorMappingDetailView,
+    PatientDoctorMappingBulkView,
+    PatientDoctorMappingExportView,
+    AsyncPatientDoctorMappingListCreateView,
+    AsyncPatientDoctorsByPatientView,
+    AsyncPatientDoctorMappingDetailView
 )
 
+if settings.ASYNC_VIEWS:
+    list_view = AsyncPatientDoctorMappingListCreateView
+    by_patient_view = AsyncPatientDoctorsByPatientView
+    detail_view = AsyncPatientDoctorMappingDetailView
+else:
+    list_view = PatientDoctorMappingListCreateView
+    by_patient_view = PatientDoctorsByPatientView
+    detail_view = PatientDoctorMappingDetailView
+
 urlpatterns = [
-    path('', PatientDoctorMappingListCreateView.as_view(), name='mapping-list-create'),
-    path('<int:patient_id>/', PatientDoctorsByPatientView.as_view(), name='mapping-by-patient'),
-    path('detail/<int:pk>/', PatientDoctorMappingDetailView.as_view(), name='mapping-detail'),
+    path('', list_view.as_view(), name='mapping-list-create'),
+    path('bulk/', PatientDoctorMappingBulkView.as_view(), name='mapping-bulk'),
+    path('export/', PatientDoctorMappingExportView.as_view(), name='mapping-export'),
+    path('<int:patient_id>/', by_patient_view.as_view(), name='mapping-by-patient'),
+    path('detail/<int:pk>/', detail_view.as_view(), name='mapping-detail'),
 ]
@@ -2,22 +2,54 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from healthcare_backend.async_views import AsyncAPIView
+from healthcare_backend.bulk import BulkAPIView, delete_rows
+from healthcare_backend import conditional
+from healthcare_backend.export import ExportAPIView
+from healthcare_backend.pagination import KeysetPagination, aget_page_response, get_page_response
+from healthcare_backend.serializers import get_values_serializer
 from .models import PatientDoctorMapping
-from .serializers import PatientDoctorMappingSerializer, PatientDoctorMappingListSerializer
+from .serializers import (
+    PatientDoctorMappingSerializer,
+    PatientDoctorMappingListSerializer,
+    PatientDoctorMappingBulkSerializer
+)
 from patients.models import Patient
+from doctors.models import Doctor
 
 
-class PatientDoctorMappingListCreateView(APIView):
+class MappingListMixin:
+    """Queryset and response building shared by the sync and async mapping list views."""
+    
+    replica_reads = True
+    pagination_class = KeysetPagination
+    # Timestamps covering everything the list serializer renders, for the ETag.
+    modified_fields = ['updated_at', 'patient__updated_at', 'doctor__updated_at']
+    
+    def get_queryset(self, request):
+        """Return the mappings of the authenticated user's patients."""
+        return PatientDoctorMapping.objects.filter(patient__user=request.user)
+    
+    def get_listing(self, mappings):
+        """Return the paginator, values() serializer and queryset serving one page of mappings."""
+        serializer = get_values_serializer(PatientDoctorMappingListSerializer)
+        return self.pagination_class(), serializer, serializer.get_queryset(mappings)
+
+
+class PatientDoctorMappingListCreateView(MappingListMixin, APIView):
     """API view for listing and creating patient-doctor mappings."""
     
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         """Get all patient-doctor mappings for authenticated user's patients."""
-        mappings = PatientDoctorMapping.objects.filter(patient__user=request.user)
-        serializer = PatientDoctorMappingListSerializer(mappings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        mappings = self.get_queryset(request)
+        state = conditional.get_state(mappings, self.modified_fields)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = get_page_response(*self.get_listing(mappings), request, view=self)
+        return conditional.add_validators(response, request, state)
     
     def post(self, request):
         """Create a new patient-doctor mapping."""
@@ -36,27 +68,78 @@ class PatientDoctorMappingListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PatientDoctorsByPatientView(APIView):
+class DoctorsByPatientMixin:
+    """Queryset and response building shared by the sync and async doctors-by-patient views."""
+    
+    replica_reads = True
+    # Aggregated over the patient row, so a patient without doctors still has
+    # a state and renaming the patient changes it.
+    modified_fields = ['updated_at', 'doctor_mappings__updated_at', 'doctor_mappings__doctor__updated_at']
+    
+    def get_queryset(self, request, patient_id):
+        """Return a queryset holding the patient, if it belongs to the authenticated user."""
+        return Patient.objects.filter(id=patient_id, user=request.user)
+    
+    def get_listing(self, patient):
+        """Return the values() serializer and queryset of the patient's mappings."""
+        serializer = get_values_serializer(PatientDoctorMappingListSerializer)
+        return serializer, serializer.get_queryset(PatientDoctorMapping.objects.filter(patient=patient))
+    
+    def get_listing_response(self, patient, doctors):
+        """Wrap the patient's serialized doctors in the response."""
+        return Response({
+            'patient_id': patient.pk,
+            'patient_name': patient.name,
+            'doctors': doctors
+        }, status=status.HTTP_200_OK)
+
+
+class PatientDoctorsByPatientView(DoctorsByPatientMixin, APIView):
     """API view for getting all doctors assigned to a specific patient."""
     
     permission_classes = [IsAuthenticated]
     
     def get(self, request, patient_id):
         """Get all doctors assigned to a specific patient."""
-        # Verify patient belongs to authenticated user
-        patient = get_object_or_404(Patient, id=patient_id, user=request.user)
-        
-        mappings = PatientDoctorMapping.objects.filter(patient=patient)
-        serializer = PatientDoctorMappingListSerializer(mappings, many=True)
-        
-        return Response({
-            'patient_id': patient_id,
-            'patient_name': patient.name,
-            'doctors': serializer.data
-        }, status=status.HTTP_200_OK)
+        patients = self.get_queryset(request, patient_id)
+        state = conditional.get_state(patients, self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = self.list_doctors(patients)
+        return conditional.add_validators(response, request, state)
+    
+    def list_doctors(self, patients):
+        """Serialize the patient's doctors."""
+        patient = get_object_or_404(patients)
+        serializer, mappings = self.get_listing(patient)
+        return self.get_listing_response(patient, serializer.serialize(mappings))
 
 
-class PatientDoctorMappingDetailView(APIView):
+class MappingDetailMixin:
+    """Queryset and response building shared by the sync and async mapping detail views."""
+    
+    replica_reads = True
+    # Timestamps covering the nested patient, user and doctor, for the ETag.
+    modified_fields = [
+        'updated_at', 'patient__updated_at', 'patient__user__updated_at', 'doctor__updated_at',
+    ]
+    
+    def get_queryset(self, request, pk):
+        """Return a queryset holding mapping `pk`, if it belongs to one of the user's patients."""
+        return PatientDoctorMapping.objects.filter(pk=pk, patient__user=request.user)
+    
+    def get_object_queryset(self, request, pk):
+        """Return `get_queryset()` with the nested patient, user and doctor loaded."""
+        return PatientDoctorMappingSerializer.setup_eager_loading(self.get_queryset(request, pk))
+    
+    def get_detail_response(self, mapping):
+        """Serialize a single mapping."""
+        serializer = PatientDoctorMappingSerializer(mapping)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class PatientDoctorMappingDetailView(MappingDetailMixin, APIView):
     """API view for retrieving and deleting a specific patient-doctor mapping."""
     
     permission_classes = [IsAuthenticated]
@@ -64,21 +147,150 @@ class PatientDoctorMappingDetailView(APIView):
     def get_object(self, pk, user):
         """Get mapping object by pk and verify it belongs to authenticated user."""
         return get_object_or_404(
-            PatientDoctorMapping,
+            PatientDoctorMappingSerializer.setup_eager_loading(PatientDoctorMapping.objects.all()),
             pk=pk,
             patient__user=user
         )
     
     def get(self, request, pk):
         """Get details of a specific mapping."""
-        mapping = self.get_object(pk, request.user)
-        serializer = PatientDoctorMappingSerializer(mapping)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        state = conditional.get_state(self.get_queryset(request, pk), self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = self.get_detail_response(get_object_or_404(self.get_object_queryset(request, pk)))
+        return conditional.add_validators(response, request, state)
     
     def delete(self, request, pk):
         """Remove a doctor from a patient."""
-        mapping = self.get_object(pk, request.user)
-        mapping.delete()
+        self.get_object(pk, request.user)
+        delete_rows(self.get_queryset(request, pk))
         return Response({
             'message': 'Doctor removed from patient successfully'
         }, status=status.HTTP_200_OK)
+
+
+class PatientDoctorMappingBulkView(BulkAPIView):
+    """API view for assigning and removing doctors in batches."""
+    
+    http_method_names = ['post', 'delete', 'options']
+    model = PatientDoctorMapping
+    serializer_class = PatientDoctorMappingBulkSerializer
+    output_serializer_class = PatientDoctorMappingListSerializer
+    verbose_name_plural = 'mappings'
+    
+    def get_queryset(self):
+        """Only mappings of the authenticated user's patients can be deleted."""
+        return PatientDoctorMapping.objects.filter(patient__user=self.request.user)
+    
+    def validate_batch(self, rows):
+        """Resolve patients and doctors and check for duplicates in three queries."""
+        patient_ids = {data['patient'] for _, data, _ in rows}
+        doctor_ids = {data['doctor'] for _, data, _ in rows}
+        
+        self.patients = Patient.objects.filter(
+            user=self.request.user, id__in=patient_ids
+        ).only('id', 'name', 'user').in_bulk()
+        self.doctors = Doctor.objects.filter(
+            id__in=doctor_ids
+        ).only('id', 'name', 'specialization').in_bulk()
+        existing = set(PatientDoctorMapping.objects.filter(
+            patient_id__in=patient_ids, doctor_id__in=doctor_ids
+        ).values_list('patient_id', 'doctor_id'))
+        
+        errors, seen = {}, set()
+        for index, data, _ in rows:
+            pair = (data['patient'], data['doctor'])
+            if data['patient'] not in self.patients:
+                errors[index] = {'patient': ['You can only assign doctors to your own patients.']}
+            elif data['doctor'] not in self.doctors:
+                errors[index] = {'doctor': [f'Invalid pk "{data["doctor"]}" - object does not exist.']}
+            elif pair in existing or pair in seen:
+                errors[index] = {'non_field_errors': ['This doctor is already assigned to this patient.']}
+            seen.add(pair)
+        return errors
+    
+    def build_instance(self, validated_data):
+        """Attach the resolved patient and doctor to the new mapping."""
+        return PatientDoctorMapping(
+            patient=self.patients[validated_data['patient']],
+            doctor=self.doctors[validated_data['doctor']],
+            notes=validated_data.get('notes'),
+        )
+
+
+class PatientDoctorMappingExportView(ExportAPIView):
+    """API view streaming all mappings of the authenticated user's patients."""
+    
+    filename = 'mappings'
+    replica_reads = True
+    columns = [
+        ('id', 'id'),
+        ('patient', 'patient_id'),
+        ('doctor', 'doctor_id'),
+        ('patient_name', 'patient__name'),
+        ('doctor_name', 'doctor__name'),
+        ('doctor_specialization', 'doctor__specialization'),
+        ('assigned_date', 'assigned_date'),
+        ('notes', 'notes'),
+    ]
+    
+    def get_queryset(self):
+        return PatientDoctorMapping.objects.filter(
+            patient__user=self.request.user
+        ).order_by('-created_at', '-id')
+
+
+class AsyncPatientDoctorMappingListCreateView(MappingListMixin, AsyncAPIView):
+    """Async API view for listing mappings; creation is served by PatientDoctorMappingListCreateView."""
+    
+    sync_view_class = PatientDoctorMappingListCreateView
+    
+    async def get(self, request):
+        """Get all patient-doctor mappings for authenticated user's patients."""
+        mappings = self.get_queryset(request)
+        state = await conditional.aget_state(mappings, self.modified_fields)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = await aget_page_response(*self.get_listing(mappings), request, view=self)
+        return conditional.add_validators(response, request, state)
+
+
+class AsyncPatientDoctorsByPatientView(DoctorsByPatientMixin, AsyncAPIView):
+    """Async API view for getting all doctors assigned to a specific patient."""
+    
+    sync_view_class = PatientDoctorsByPatientView
+    
+    async def get(self, request, patient_id):
+        """Get all doctors assigned to a specific patient."""
+        patients = self.get_queryset(request, patient_id)
+        state = await conditional.aget_state(patients, self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = await self.list_doctors(patients)
+        return conditional.add_validators(response, request, state)
+    
+    async def list_doctors(self, patients):
+        """Serialize the patient's doctors."""
+        patient = await aget_object_or_404(patients)
+        serializer, mappings = self.get_listing(patient)
+        return self.get_listing_response(
+            patient, serializer.serialize([mapping async for mapping in mappings])
+        )
+
+
+class AsyncPatientDoctorMappingDetailView(MappingDetailMixin, AsyncAPIView):
+    """Async API view for retrieving a mapping; deletion is served by PatientDoctorMappingDetailView."""
+    
+    sync_view_class = PatientDoctorMappingDetailView
+    
+    async def get(self, request, pk):
+        """Get details of a specific mapping."""
+        state = await conditional.aget_state(self.get_queryset(request, pk), self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            mapping = await aget_object_or_404(self.get_object_queryset(request, pk))
+            response = self.get_detail_response(mapping)
+        return conditional.add_validators(response, request, state)
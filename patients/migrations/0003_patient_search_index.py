@@ -0,0 +1,13 @@
+from django.db import migrations
+from healthcare_backend.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_patient_indexes'),
+    ]
+
+    operations = [
+        CreateSearchIndex(model_name='patient', fields=['name'], prefix_field='phone'),
+    ]
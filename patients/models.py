@@ -25,6 +25,10 @@ class Patient(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Columns searched by `?q=`; keep in step with the search index migration.
+    SEARCH_FIELDS = ['name']
+    SEARCH_PREFIX_FIELD = 'phone'
+    
     def __str__(self):
         return f"{self.name} - {self.phone}"
     
@@ -33,3 +37,7 @@ class Patient(models.Model):
         verbose_name = 'Patient'
         verbose_name_plural = 'Patients'
         ordering = ['-created_at']
+        indexes = [
+            # Per-user listing, newest first, matching the keyset pagination order.
+            models.Index(fields=['user', '-created_at', '-id'], name='patients_user_created_idx'),
+        ]
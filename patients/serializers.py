@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from healthcare_backend.serializers import SparseFieldsetMixin
 from .models import Patient
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class PatientSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Patient model."""
     
     user_name = serializers.CharField(source='user.name', read_only=True)
@@ -17,6 +18,14 @@ class PatientSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
     
+    # Columns read while serializing, including the related user's.
+    select_related_fields = ['user']
+    only_fields = [
+        'id', 'name', 'age', 'gender', 'phone', 'address',
+        'medical_history', 'user', 'created_at', 'updated_at',
+        'user__name', 'user__email',
+    ]
+    
     def validate_age(self, value):
         """Validate age is positive."""
         if value < 0 or value > 150:
@@ -1,3 +1,346 @@
-from django.test import TestCase
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from authentication.tokens import UserRefreshToken
+from healthcare_backend import renderers
+from healthcare_backend.testing import AsyncViewMixin, QueryCountMixin, query_budget
+from .models import Patient
+from .serializers import PatientSerializer
+from .views import AsyncPatientListCreateView, AsyncPatientDetailView
+
+
+def create_patients(user, count):
+    return [
+        Patient.objects.create(
+            user=user,
+            name=f'Patient {i}',
+            age=30,
+            gender='F',
+            phone='9123456780',
+            address='Green Park, New Delhi',
+        )
+        for i in range(count)
+    ]
+
+
+class PatientQueryCountTests(QueryCountMixin, TestCase):
+    """Patient endpoints must not issue a query per row."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        self.patient = self.create_patients(1)[0]
+    
+    def create_patients(self, count):
+        return create_patients(self.user, count)
+    
+    # Each GET runs the conditional-request aggregate, then the page query.
+    def test_list_query_count(self):
+        self.assertConstantQueries(self.client, '/api/patients/', 2, self.create_patients)
+    
+    def test_unpaginated_list_query_count(self):
+        self.assertConstantQueries(
+            self.client, '/api/patients/?paginate=false', 2, self.create_patients
+        )
+    
+    def test_detail_query_count(self):
+        self.assertConstantQueries(
+            self.client, f'/api/patients/{self.patient.pk}/', 2, self.create_patients
+        )
+
+
+class PatientExportTests(QueryCountMixin, TestCase):
+    """The streaming export matches the list serializer's output."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        create_patients(self.user, 3)
+    
+    def test_ndjson_rows_match_serializer(self):
+        response = self.client.get('/api/patients/export/')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        
+        expected = PatientSerializer(
+            Patient.objects.order_by('-created_at', '-id'), many=True
+        ).data
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(rows, json.loads(json.dumps(expected)))
+    
+    def test_csv_has_header_and_one_line_per_patient(self):
+        response = self.client.get('/api/patients/export/?type=csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'name', 'age'])
+        self.assertEqual(len(lines), 4)
+    
+    async def test_asgi_export_streams_asynchronously(self):
+        token = await sync_to_async(lambda: str(UserRefreshToken.for_user(self.user).access_token))()
+        response = await AsyncClient().get(
+            '/api/patients/export/?type=csv', headers={'Authorization': f'Bearer {token}'}
+        )
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        
+        expected = await sync_to_async(
+            lambda: b''.join(self.client.get('/api/patients/export/?type=csv').streaming_content)
+        )()
+        self.assertEqual(body, expected)
+
+
+class PatientJSONTests(QueryCountMixin, TestCase):
+    """The orjson renderer and parser are drop-in replacements for DRF's."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        create_patients(self.user, 3)
+        Patient.objects.create(
+            user=self.user, name='Zoë \u2028 Dsouza', age=41, gender='F',
+            phone='9123456780', address='Bandra, Mumbai'
+        )
+    
+    def payloads(self):
+        patients = PatientSerializer(Patient.objects.all(), many=True).data
+        extras = {
+            'created': datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+            'fee': Decimal('499.50'),
+            'label': gettext_lazy('Patient'),
+            1: None,
+        }
+        return [patients, {'results': patients, 'next': None}, extras]
+    
+    def test_renderer_output_matches_drf(self):
+        self.assertIsNotNone(renderers.orjson)
+        for data in self.payloads():
+            self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_renderer_falls_back_for_wide_integers(self):
+        data = {'id': 2 ** 64, 'ids': [-(2 ** 70)]}
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_renderer_falls_back_without_orjson(self):
+        data = self.payloads()[0]
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+    
+    def test_parser_matches_drf(self):
+        body = JSONRenderer().render(self.payloads()[0])
+        self.assertEqual(
+            renderers.ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            renderers.ORJSONParser().parse(io.BytesIO(b'{"name": NaN}'))
+    
+    def test_api_round_trip(self):
+        response = self.client.post('/api/patients/', {
+            'name': 'Ånand', 'age': 30, 'gender': 'M', 'phone': '9123456780', 'address': 'Pune',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertEqual(response.json()['patient']['name'], 'Ånand')
+
+
+@query_budget(2)
+class PatientSearchTests(QueryCountMixin, TestCase):
+    """`?q=` matches name prefixes and phone prefixes within the user's patients."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        for name, phone in (
+            ('Rajesh Kumar', '9876543210'),
+            ('Rajiv Menon', '9123456780'),
+            ('Priya Sharma', '9988776655'),
+        ):
+            Patient.objects.create(
+                user=self.user, name=name, age=40, gender='M', phone=phone, address='Delhi'
+            )
+    
+    def search(self, query):
+        response = self.client.get('/api/patients/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [patient['name'] for patient in response.json()['results']]
+    
+    def test_words_match_by_prefix(self):
+        self.assertEqual(sorted(self.search('raj')), ['Rajesh Kumar', 'Rajiv Menon'])
+        self.assertEqual(self.search('RAJ kum'), ['Rajesh Kumar'])
+        self.assertEqual(self.search('kumari'), [])
+    
+    def test_phone_prefix(self):
+        self.assertEqual(self.search('98765'), ['Rajesh Kumar'])
+        self.assertEqual(self.search('99 88'), ['Priya Sharma'])
+    
+    def test_only_own_patients_are_searched(self):
+        _, other_user = self.create_authenticated_client(email='other@example.com')
+        create_patients(other_user, 1)
+        self.assertEqual(self.search('patient'), [])
+    
+    def test_index_follows_updates_and_deletes(self):
+        patient = Patient.objects.get(name='Priya Sharma')
+        patient.name = 'Priya Verma'
+        patient.save()
+        self.assertEqual(self.search('sharma'), [])
+        self.assertEqual(self.search('verma'), ['Priya Verma'])
+        
+        patient.delete()
+        self.assertEqual(self.search('priya'), [])
+    
+    def test_search_is_a_single_page(self):
+        response = self.client.get('/api/patients/', {'q': 'raj', 'page_size': 1})
+        self.assertEqual(len(response.json()['results']), 1)
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(self.count_queries(self.client, '/api/patients/?q=raj'), 2)
+
+
+@query_budget(2)
+class PatientFilterTests(QueryCountMixin, TestCase):
+    """List filters run in SQL and `?fields=` trims both the query and the output."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        for name, age, gender in (('Asha', 25, 'F'), ('Bala', 40, 'M'), ('Chitra', 62, 'F')):
+            Patient.objects.create(
+                user=self.user, name=name, age=age, gender=gender,
+                phone='9123456780', address='Delhi', medical_history='Long history'
+            )
+    
+    def names(self, params):
+        response = self.client.get('/api/patients/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(patient['name'] for patient in response.json()['results'])
+    
+    def test_filters(self):
+        self.assertEqual(self.names({'gender': 'F'}), ['Asha', 'Chitra'])
+        self.assertEqual(self.names({'age__gte': 30, 'age__lte': 62}), ['Bala', 'Chitra'])
+        self.assertEqual(self.names({'gender__in': 'M,O'}), ['Bala'])
+        self.assertEqual(self.names({'gender': 'F', 'q': 'chi'}), ['Chitra'])
+    
+    def test_invalid_filter_values_are_rejected(self):
+        response = self.client.get('/api/patients/', {'age__gte': 'old', 'gender': 'X'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'age__gte', 'gender'})
+    
+    def test_sparse_fieldset(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/patients/', {'fields': 'name,user_name', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'name', 'user_name'})
+        self.assertIsNotNone(response.json()['next'])
+        
+        sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('medical_history', sql)
+        self.assertNotIn('address', sql)
+        self.assertEqual(len(context.captured_queries), 2)
+    
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/patients/', {'fields': 'name,ssn'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+
+class PatientConditionalGetTests(QueryCountMixin, TestCase):
+    """Unchanged lists and details are answered with 304 before they are fetched."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        self.patient = create_patients(self.user, 2)[0]
+        self.detail_url = f'/api/patients/{self.patient.pk}/'
+    
+    def revalidate(self, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, headers=headers)
+        return response, len(context.captured_queries)
+    
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/api/patients/')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Last-Modified', response)
+        
+        response, queries = self.revalidate('/api/patients/', if_none_match=response['ETag'])
+        self.assertEqual((response.status_code, queries), (304, 1))
+        self.assertEqual(response.content, b'')
+        
+        response, _ = self.revalidate(
+            '/api/patients/', if_modified_since=self.client.get('/api/patients/')['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+    
+    def test_changes_produce_a_new_etag(self):
+        etags = {self.client.get('/api/patients/')['ETag']}
+        
+        self.patient.name = 'Renamed'
+        self.patient.save()
+        etags.add(self.client.get('/api/patients/')['ETag'])
+        
+        self.patient.delete()
+        etags.add(self.client.get('/api/patients/')['ETag'])
+        
+        etags.add(self.client.get('/api/patients/?fields=name')['ETag'])
+        self.assertEqual(len(etags), 4)
+    
+    def test_detail(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        response, queries = self.revalidate(self.detail_url, if_none_match=etag)
+        self.assertEqual((response.status_code, queries), (304, 1))
+        
+        self.client.put(self.detail_url, {'age': 31}, format='json')
+        response, _ = self.revalidate(self.detail_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['age'], 31)
+    
+    def test_missing_detail_is_not_found_for_any_etag(self):
+        response, _ = self.revalidate(self.detail_url, if_none_match='*')
+        self.assertEqual(response.status_code, 304)
+        response, _ = self.revalidate('/api/patients/999999/', if_none_match='*')
+        self.assertEqual(response.status_code, 404)
+
+
+class PatientAsyncViewTests(AsyncViewMixin, QueryCountMixin, TestCase):
+    """The async views return the same payloads as the synchronous ones."""
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        self.patient = create_patients(self.user, 3)[0]
+    
+    async def test_list_matches_sync_view(self):
+        for path in (
+            '/api/patients/?page_size=2', '/api/patients/?paginate=false', '/api/patients/?q=patient',
+            '/api/patients/?fields=id,name&age__gte=18', '/api/patients/?age__gte=old',
+        ):
+            await self.assertSameResponse(self.client, AsyncPatientListCreateView, path, self.user)
+    
+    async def test_detail_matches_sync_view(self):
+        await self.assertSameResponse(
+            self.client, AsyncPatientDetailView, f'/api/patients/{self.patient.pk}/',
+            self.user, pk=self.patient.pk
+        )
+        await self.assertSameResponse(
+            self.client, AsyncPatientDetailView, '/api/patients/0/', self.user, pk=0
+        )
+    
+    async def test_conditional_get_matches_sync_view(self):
+        etag = (await sync_to_async(self.client.get)('/api/patients/'))['ETag']
+        response = await self.call_async_view(
+            AsyncPatientListCreateView, '/api/patients/', self.user, headers={'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        
+        response = await self.call_async_view(
+            AsyncPatientDetailView, '/api/patients/0/', self.user, headers={'If-None-Match': '*'}, pk=0
+        )
+        self.assertEqual(response.status_code, 404)
+    
+    async def test_token_is_required(self):
+        response = await self.call_async_view(AsyncPatientListCreateView, '/api/patients/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
@@ -1,7 +1,22 @@
+from django.conf import settings
 from django.urls import path
-from .views import PatientListCreateView, PatientDetailView
+from .views import (
+    PatientListCreateView,
+    PatientDetailView,
+    PatientBulkView,
+    PatientExportView,
+    AsyncPatientListCreateView,
+    AsyncPatientDetailView
+)
+
+if settings.ASYNC_VIEWS:
+    list_view, detail_view = AsyncPatientListCreateView, AsyncPatientDetailView
+else:
+    list_view, detail_view = PatientListCreateView, PatientDetailView
 
 urlpatterns = [
-    path('', PatientListCreateView.as_view(), name='patient-list-create'),
-    path('<int:pk>/', PatientDetailView.as_view(), name='patient-detail'),
+    path('', list_view.as_view(), name='patient-list-create'),
+    path('<int:pk>/', detail_view.as_view(), name='patient-detail'),
+    path('bulk/', PatientBulkView.as_view(), name='patient-bulk'),
+    path('export/', PatientExportView.as_view(), name='patient-export'),
 ]
@@ -2,21 +2,68 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from healthcare_backend.async_views import AsyncAPIView
+from healthcare_backend.bulk import BulkAPIView, delete_rows
+from healthcare_backend import conditional
+from healthcare_backend.export import ExportAPIView
+from healthcare_backend.filters import filter_queryset
+from healthcare_backend import search
+from healthcare_backend.pagination import (
+    KeysetPagination, SearchPagination, aget_page_response, get_page_response
+)
+from healthcare_backend.serializers import get_values_serializer
 from .models import Patient
 from .serializers import PatientSerializer
 
 
-class PatientListCreateView(APIView):
+class PatientListMixin:
+    """Queryset and response building shared by the sync and async patient list views."""
+    
+    replica_reads = True
+    pagination_class = KeysetPagination
+    search_pagination_class = SearchPagination
+    filterset_fields = {
+        'gender': ['exact', 'in'],
+        'age': ['exact', 'gte', 'lte'],
+    }
+    # Timestamps covering everything the serializer renders, for the ETag.
+    modified_fields = ['updated_at', 'user__updated_at']
+    
+    def get_queryset(self, request):
+        """Return the authenticated user's patients matching the request's filters."""
+        return filter_queryset(Patient.objects.filter(user=request.user), request, self.filterset_fields)
+    
+    def get_listing(self, request, patients):
+        """
+        Return the paginator, values() serializer and queryset serving one page
+        of patients, or of `?q=` matches ranked by relevance.
+        """
+        serializer = get_values_serializer(
+            PatientSerializer, PatientSerializer.get_requested_fields(request)
+        )
+        query = search.get_query(request)
+        if query:
+            patients = search.search(patients, query)
+            paginator = self.search_pagination_class()
+        else:
+            paginator = self.pagination_class()
+        return paginator, serializer, serializer.get_queryset(patients)
+
+
+class PatientListCreateView(PatientListMixin, APIView):
     """API view for listing and creating patients."""
     
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        """Get all patients created by the authenticated user."""
-        patients = Patient.objects.filter(user=request.user)
-        serializer = PatientSerializer(patients, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """Get the authenticated user's patients, or those matching `?q=` ranked by relevance."""
+        patients = self.get_queryset(request)
+        state = conditional.get_state(patients, self.modified_fields)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = get_page_response(*self.get_listing(request, patients), request, view=self)
+        return conditional.add_validators(response, request, state)
     
     def post(self, request):
         """Create a new patient."""
@@ -32,20 +79,47 @@ class PatientListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class PatientDetailView(APIView):
+class PatientDetailMixin:
+    """Queryset and response building shared by the sync and async patient detail views."""
+    
+    replica_reads = True
+    modified_fields = PatientListMixin.modified_fields
+    
+    def get_queryset(self, request, pk):
+        """Return a queryset holding the authenticated user's patient `pk`, if it exists."""
+        return Patient.objects.filter(pk=pk, user=request.user)
+    
+    def get_object_queryset(self, request, pk):
+        """Return `get_queryset` with everything the serializer reads loaded in the same query."""
+        return PatientSerializer.setup_eager_loading(self.get_queryset(request, pk))
+    
+    def get_detail_response(self, patient):
+        """Serialize a single patient."""
+        return Response(PatientSerializer(patient).data, status=status.HTTP_200_OK)
+
+
+class PatientDetailView(PatientDetailMixin, APIView):
     """API view for retrieving, updating, and deleting a patient."""
     
     permission_classes = [IsAuthenticated]
     
     def get_object(self, pk, user):
         """Get patient object by pk and user."""
-        return get_object_or_404(Patient, pk=pk, user=user)
+        return get_object_or_404(
+            PatientSerializer.setup_eager_loading(Patient.objects.all()),
+            pk=pk,
+            user=user
+        )
     
     def get(self, request, pk):
         """Get details of a specific patient."""
-        patient = self.get_object(pk, request.user)
-        serializer = PatientSerializer(patient)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        state = conditional.get_state(self.get_queryset(request, pk), self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            patient = get_object_or_404(self.get_object_queryset(request, pk))
+            response = self.get_detail_response(patient)
+        return conditional.add_validators(response, request, state)
     
     def put(self, request, pk):
         """Update patient details."""
@@ -63,8 +137,81 @@ class PatientDetailView(APIView):
     
     def delete(self, request, pk):
         """Delete a patient record."""
-        patient = self.get_object(pk, request.user)
-        patient.delete()
+        self.get_object(pk, request.user)
+        delete_rows(self.get_queryset(request, pk))
         return Response({
             'message': 'Patient deleted successfully'
         }, status=status.HTTP_200_OK)
+
+
+class PatientBulkView(BulkAPIView):
+    """API view for creating, updating, and deleting patients in batches."""
+    
+    model = Patient
+    serializer_class = PatientSerializer
+    verbose_name_plural = 'patients'
+    
+    def get_queryset(self):
+        """Only the authenticated user's patients can be updated or deleted."""
+        return PatientSerializer.setup_eager_loading(
+            Patient.objects.filter(user=self.request.user)
+        )
+    
+    def build_instance(self, validated_data):
+        """Create patients for the authenticated user."""
+        return Patient(user=self.request.user, **validated_data)
+
+
+class PatientExportView(ExportAPIView):
+    """API view streaming all of the authenticated user's patients."""
+    
+    filename = 'patients'
+    replica_reads = True
+    columns = [
+        ('id', 'id'),
+        ('name', 'name'),
+        ('age', 'age'),
+        ('gender', 'gender'),
+        ('phone', 'phone'),
+        ('address', 'address'),
+        ('medical_history', 'medical_history'),
+        ('user', 'user_id'),
+        ('user_name', 'user__name'),
+        ('user_email', 'user__email'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+    
+    def get_queryset(self):
+        return Patient.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+
+class AsyncPatientListCreateView(PatientListMixin, AsyncAPIView):
+    """Async API view for listing patients; creation is served by PatientListCreateView."""
+    
+    sync_view_class = PatientListCreateView
+    
+    async def get(self, request):
+        """Get the authenticated user's patients, or those matching `?q=` ranked by relevance."""
+        patients = self.get_queryset(request)
+        state = await conditional.aget_state(patients, self.modified_fields)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            response = await aget_page_response(*self.get_listing(request, patients), request, view=self)
+        return conditional.add_validators(response, request, state)
+
+
+class AsyncPatientDetailView(PatientDetailMixin, AsyncAPIView):
+    """Async API view for retrieving a patient; writes are served by PatientDetailView."""
+    
+    sync_view_class = PatientDetailView
+    
+    async def get(self, request, pk):
+        """Get details of a specific patient."""
+        state = await conditional.aget_state(self.get_queryset(request, pk), self.modified_fields)
+        conditional.check_exists(state)
+        response = conditional.get_not_modified_response(request, state)
+        if response is None:
+            patient = await aget_object_or_404(self.get_object_queryset(request, pk))
+            response = self.get_detail_response(patient)
+        return conditional.add_validators(response, request, state)
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from stats import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recount the stats rollups from the patient, doctor and mapping tables'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        buckets = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted {buckets} stats buckets in {time.monotonic() - started:.1f}s'
+        ))
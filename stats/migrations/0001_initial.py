@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50)),
+                ('bucket', models.CharField(max_length=50)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Stat Count',
+                'verbose_name_plural': 'Stat Counts',
+                'db_table': 'stat_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statcount',
+            constraint=models.UniqueConstraint(fields=('metric', 'bucket'), name='stat_counts_metric_bucket_uniq'),
+        ),
+    ]
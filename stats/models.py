@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class StatCount(models.Model):
+    """Model for one bucket of a rollup, e.g. the number of female patients."""
+    
+    metric = models.CharField(max_length=50)
+    bucket = models.CharField(max_length=50)
+    count = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.metric}[{self.bucket}] = {self.count}"
+    
+    class Meta:
+        db_table = 'stat_counts'
+        verbose_name = 'Stat Count'
+        verbose_name_plural = 'Stat Counts'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'bucket'], name='stat_counts_metric_bucket_uniq'),
+        ]
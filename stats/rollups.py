@@ -0,0 +1,202 @@
+"""
+Rollup counts behind the stats API.
+
+Each rollup counts the rows of one model per bucket of a column (patients by
+gender, doctors by specialization, ...). The counts live in `StatCount`, one
+row per bucket, so reading every rollup costs O(buckets) however many rows
+are counted.
+
+Writes keep the counts current: the signal handlers in `stats.signals` turn
+each save and bulk write into per-bucket deltas and apply them in one
+statement. Deletes are counted when they go through
+`healthcare_backend.bulk.delete_rows()`, as the API's deletes do: the rows
+removed, cascades included, are counted by bucket in one query per model.
+Writes that bypass these paths (COPY imports, `generate_data`, admin or shell
+deletes, raw SQL) are caught up by `rebuild()`, which the `refresh_stats`
+command runs on every deploy and hourly (see render.yaml).
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import CASCADE, Case, CharField, Count, F, Value, When
+from patients.models import Patient
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from .models import StatCount
+
+# Upper age (inclusive) and label of each patient age bucket.
+AGE_BUCKETS = [(17, '0-17'), (29, '18-29'), (44, '30-44'), (59, '45-59'), (74, '60-74'), (None, '75+')]
+
+
+def age_bucket(age):
+    """Return the label of the bucket `age` falls in."""
+    for upper, label in AGE_BUCKETS:
+        if upper is None or age <= upper:
+            return label
+
+
+def age_bucket_expression():
+    """Return the SQL expression computing `age_bucket(age)`."""
+    return Case(
+        *(When(age__lte=upper, then=Value(label)) for upper, label in AGE_BUCKETS if upper is not None),
+        default=Value(AGE_BUCKETS[-1][1]),
+        output_field=CharField(),
+    )
+
+
+# metric: (model, field, bucket of a field value, SQL expression of the bucket)
+ROLLUPS = {
+    'patients_by_gender': (Patient, 'gender', str, F('gender')),
+    'patients_by_age': (Patient, 'age', age_bucket, age_bucket_expression()),
+    'doctors_by_specialization': (Doctor, 'specialization', str, F('specialization')),
+    'mappings_by_day': (PatientDoctorMapping, 'assigned_date', str, F('assigned_date')),
+}
+
+MODELS = {model for model, _, _, _ in ROLLUPS.values()}
+
+# Backends that add a batch of deltas in one INSERT ... ON CONFLICT statement.
+UPSERT_VENDORS = {'postgresql', 'sqlite'}
+
+
+def get_rollups(model):
+    """Return the (metric, attname, to_bucket) of every rollup counting `model`."""
+    return [
+        (metric, model._meta.get_field(field).attname, to_bucket)
+        for metric, (rollup_model, field, to_bucket, _) in ROLLUPS.items()
+        if rollup_model is model
+    ]
+
+
+def get_fields(model):
+    """Return the names of the fields `model`'s rollups read."""
+    return [field for rollup_model, field, _, _ in ROLLUPS.values() if rollup_model is model]
+
+
+def get_buckets(instance, loaded_only=False):
+    """
+    Return {metric: bucket} for `instance`.
+
+    With `loaded_only`, return None instead of loading a deferred field.
+    """
+    buckets = {}
+    for metric, attname, to_bucket in get_rollups(type(instance)):
+        if loaded_only and attname not in instance.__dict__:
+            return None
+        value = getattr(instance, attname)
+        buckets[metric] = None if value is None else to_bucket(value)
+    return buckets
+
+
+def get_changes(old, new):
+    """Return the per-bucket deltas turning `old` buckets into `new` ones."""
+    changes = Counter()
+    for metric, bucket in old.items():
+        if bucket is not None:
+            changes[metric, bucket] -= 1
+    for metric, bucket in new.items():
+        if bucket is not None:
+            changes[metric, bucket] += 1
+    return changes
+
+
+def count_buckets(queryset):
+    """Return {(metric, bucket): rows} for the rows of `queryset`, counted in one query."""
+    expressions = {
+        metric: expression for metric, (model, _, _, expression) in ROLLUPS.items()
+        if model is queryset.model
+    }
+    rows = queryset.order_by().annotate(**expressions).values(*expressions).annotate(
+        stat_count=Count('*')
+    )
+    counts = Counter()
+    for row in rows:
+        for metric in expressions:
+            if row[metric] is not None:
+                counts[metric, str(row[metric])] += row['stat_count']
+    return counts
+
+
+def get_cascades(model, lookup='pk'):
+    """
+    Yield (model, lookup) for `model` and every model its deletion cascades
+    to that has rollups, with the lookup from that model's rows to `model`'s pk.
+    """
+    if model in MODELS:
+        yield model, lookup
+    for relation in model._meta.related_objects:
+        if relation.on_delete is CASCADE:
+            yield from get_cascades(relation.related_model, f'{relation.field.name}__{lookup}')
+
+
+def get_delete_changes(queryset):
+    """Return the deltas taking the rows of `queryset`, and the rows they cascade to, out of their buckets."""
+    changes = Counter()
+    pks = queryset.values('pk')
+    for model, lookup in get_cascades(queryset.model):
+        deleted = model._base_manager.using(queryset.db).filter(**{f'{lookup}__in': pks})
+        changes.subtract(count_buckets(deleted))
+    return changes
+
+
+def apply(changes, using='default'):
+    """Add each {(metric, bucket): delta} in `changes` to its count."""
+    # A fixed order keeps concurrent writers from locking buckets in
+    # opposite orders and deadlocking.
+    rows = [(metric, bucket, delta) for (metric, bucket), delta in sorted(changes.items()) if delta]
+    if not rows:
+        return
+
+    connection = connections[using]
+    if connection.vendor in UPSERT_VENDORS:
+        quote = connection.ops.quote_name
+        table, count = quote(StatCount._meta.db_table), quote('count')
+        values = ', '.join(['(%s, %s, %s)'] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("metric")}, {quote("bucket")}, {count}) VALUES {values} '
+                f'ON CONFLICT ({quote("metric")}, {quote("bucket")}) '
+                f'DO UPDATE SET {count} = {table}.{count} + excluded.{count}',
+                [value for row in rows for value in row],
+            )
+        return
+
+    counts = StatCount.objects.using(using)
+    for metric, bucket, delta in rows:
+        matching = counts.filter(metric=metric, bucket=bucket)
+        if matching.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                counts.create(metric=metric, bucket=bucket, count=delta)
+        except IntegrityError:
+            # Another writer created the bucket first.
+            matching.update(count=F('count') + delta)
+
+
+def compute(using='default'):
+    """Yield (metric, bucket, count) for every non-empty bucket, counted from the tables."""
+    for model in MODELS:
+        for (metric, bucket), count in count_buckets(model._base_manager.using(using)).items():
+            yield metric, bucket, count
+
+
+def rebuild(using='default'):
+    """Recount every rollup from the tables; return the number of buckets written."""
+    with transaction.atomic(using=using):
+        StatCount.objects.using(using).all().delete()
+        created = StatCount.objects.using(using).bulk_create(
+            StatCount(metric=metric, bucket=bucket, count=count)
+            for metric, bucket, count in compute(using)
+        )
+    return len(created)
+
+
+def get_counts(using='default'):
+    """Return {metric: {bucket: count}} read from the rollup table."""
+    counts = {metric: {} for metric in ROLLUPS}
+    rows = StatCount.objects.using(using).filter(count__gt=0).values_list('metric', 'bucket', 'count')
+    for metric, bucket, count in rows:
+        if metric in counts:
+            counts[metric][bucket] = count
+    return counts
@@ -0,0 +1,75 @@
+from collections import Counter
+
+from django.db.models.signals import post_save, pre_save
+from healthcare_backend.bulk import bulk_deleting, bulk_saved, bulk_updating
+from . import rollups
+
+
+def fetch_buckets(sender, instance, using):
+    """Return the buckets of `instance`'s row as currently stored, or {} if there is none."""
+    rows = sender._base_manager.using(using).only(*rollups.get_fields(sender))
+    stored = rows.filter(pk=instance.pk).first()
+    return {} if stored is None else rollups.get_buckets(stored)
+
+
+def changes_buckets(sender, update_fields):
+    """Return whether a save of `update_fields` can move a row between buckets."""
+    return update_fields is None or not update_fields.isdisjoint(rollups.get_fields(sender))
+
+
+def load_buckets_before_save(sender, instance, using, update_fields, **kwargs):
+    """Note the buckets the row is counted in, to take it out of them after the save."""
+    if not changes_buckets(sender, update_fields):
+        return
+    if instance._state.adding:
+        instance._stat_buckets = {}
+    else:
+        instance._stat_buckets = fetch_buckets(sender, instance, using)
+
+
+def count_save(sender, instance, created, using, update_fields, **kwargs):
+    """Move the saved row to its new buckets."""
+    if not changes_buckets(sender, update_fields):
+        return
+    old = {} if created else instance._stat_buckets
+    new = rollups.get_buckets(instance)
+    rollups.apply(rollups.get_changes(old, new), using)
+
+
+def count_delete(sender, queryset, **kwargs):
+    """Take the deleted rows, cascades included, out of their buckets in one statement."""
+    rollups.apply(rollups.get_delete_changes(queryset), queryset.db)
+
+
+def remember_bulk_buckets(sender, instances, **kwargs):
+    """Note the buckets of a batch's rows before their new values are set."""
+    if sender not in rollups.MODELS:
+        return
+    for instance in instances:
+        # Never load deferred fields here; count_bulk_save skips those rows.
+        instance._stat_buckets = rollups.get_buckets(instance, loaded_only=True)
+
+
+def count_bulk_save(sender, instances, created, **kwargs):
+    """Apply a whole batch as one set of deltas."""
+    if sender not in rollups.MODELS or not instances:
+        return
+    changes = Counter()
+    for instance in instances:
+        old = {} if created else getattr(instance, '_stat_buckets', None)
+        if old is None:
+            # Loaded with deferred fields, or updated without bulk_updating,
+            # so its old buckets are unknown; refresh_stats will count it.
+            continue
+        new = rollups.get_buckets(instance)
+        changes.update(rollups.get_changes(old, new))
+    rollups.apply(changes, instances[0]._state.db)
+
+
+for model in rollups.MODELS:
+    pre_save.connect(load_buckets_before_save, sender=model)
+    post_save.connect(count_save, sender=model)
+
+bulk_updating.connect(remember_bulk_buckets)
+bulk_saved.connect(count_bulk_save)
+bulk_deleting.connect(count_delete)
@@ -0,0 +1,192 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from healthcare_backend.testing import QueryCountMixin
+from patients.models import Patient
+from doctors.models import Doctor
+from mappings.models import PatientDoctorMapping
+from . import rollups
+from .models import StatCount
+
+
+class StatsTests(QueryCountMixin, TestCase):
+    """The rollups follow every write and agree with a full recount."""
+    
+    url = '/api/stats/'
+    
+    def setUp(self):
+        self.client, self.user = self.create_authenticated_client()
+        self.user.is_staff = True
+        self.user.save()
+    
+    def create_patient(self, age=45, gender='M'):
+        return Patient.objects.create(
+            user=self.user,
+            name='Suresh Sharma',
+            age=age,
+            gender=gender,
+            phone='9123456780',
+            address='Green Park, New Delhi',
+        )
+    
+    def create_doctor(self, specialization='CARDIOLOGY'):
+        return Doctor.objects.create(
+            name='Dr. Anil Kumar',
+            specialization=specialization,
+            phone='9876543210',
+            email='anil@hospital.org',
+            experience_years=10,
+            qualification='MBBS, MD',
+            address='AIIMS, New Delhi',
+        )
+    
+    def stats(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+    
+    def assertMatchesRecount(self):
+        incremental = rollups.get_counts()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollups.get_counts())
+    
+    def test_saves_and_deletes_move_rows_between_buckets(self):
+        patient = self.create_patient(age=45, gender='M')
+        self.create_patient(age=12, gender='F')
+    
+        patient.age, patient.gender = 80, 'O'
+        patient.save()
+        # A row loaded with its bucket fields deferred is recounted from the table.
+        deferred = Patient.objects.only('name').get(pk=patient.pk)
+        deferred.gender = 'F'
+        deferred.save()
+    
+        patients = self.stats()['patients']
+        self.assertEqual(patients['total'], 2)
+        self.assertEqual(patients['by_gender'], {'M': 0, 'F': 2, 'O': 0})
+        self.assertEqual(patients['by_age']['0-17'], 1)
+        self.assertEqual(patients['by_age']['75+'], 1)
+        self.assertEqual(patients['by_age']['45-59'], 0)
+    
+        self.client.delete(f'/api/patients/{patient.pk}/')
+        self.assertEqual(self.stats()['patients']['by_gender'], {'M': 0, 'F': 1, 'O': 0})
+        self.assertMatchesRecount()
+    
+    def test_cascaded_deletes_are_counted(self):
+        doctor = self.create_doctor()
+        for _ in range(3):
+            PatientDoctorMapping.objects.create(patient=self.create_patient(), doctor=doctor)
+        today = timezone.localdate().isoformat()
+        self.assertEqual(self.stats()['mappings']['by_day'], {today: 3})
+    
+        self.client.delete(f'/api/doctors/{doctor.pk}/')
+    
+        stats = self.stats()
+        self.assertEqual(stats['doctors']['total'], 0)
+        self.assertEqual((stats['mappings']['total'], stats['mappings']['by_day']), (0, {}))
+        self.assertMatchesRecount()
+    
+    def test_bulk_writes_are_counted(self):
+        payload = [
+            {
+                'name': f'Dr. Doctor {i}',
+                'specialization': specialization,
+                'phone': '9876543210',
+                'email': f'doctor{i}@hospital.org',
+                'experience_years': 5,
+                'qualification': 'MBBS',
+                'address': 'Max Hospital, Saket',
+            }
+            for i, specialization in enumerate(['NEUROLOGY', 'NEUROLOGY', 'GENERAL'])
+        ]
+        created = self.client.post('/api/doctors/bulk/', payload, format='json').json()['doctors']
+        self.client.patch('/api/doctors/bulk/', [
+            {'id': created[0]['id'], 'specialization': 'GENERAL'}
+        ], format='json')
+    
+        by_specialization = self.stats()['doctors']['by_specialization']
+        self.assertEqual((by_specialization['NEUROLOGY'], by_specialization['GENERAL']), (1, 2))
+    
+        self.client.delete('/api/doctors/bulk/', {'ids': [created[1]['id']]}, format='json')
+        self.assertEqual(self.stats()['doctors']['by_specialization']['NEUROLOGY'], 0)
+        self.assertMatchesRecount()
+    
+    def test_bulk_delete_query_count_is_independent_of_rows(self):
+        doctor = self.create_doctor()
+        
+        def delete(rows):
+            patients = [self.create_patient(age=age) for age in range(rows)]
+            for patient in patients:
+                PatientDoctorMapping.objects.create(patient=patient, doctor=doctor)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.delete(
+                    '/api/patients/bulk/', {'ids': [patient.pk for patient in patients]}, format='json'
+                )
+            self.assertEqual(response.status_code, 200, response.content)
+            return len(context.captured_queries)
+        
+        self.assertEqual(delete(2), delete(20))
+        stats = self.stats()
+        self.assertEqual((stats['patients']['total'], stats['mappings']['total']), (0, 0))
+        self.assertMatchesRecount()
+    
+    def test_saves_move_the_row_out_of_its_stored_buckets(self):
+        patient = self.create_patient(gender='M')
+        stale = Patient.objects.get(pk=patient.pk)
+        patient.gender = 'F'
+        patient.save()
+    
+        # `stale` was loaded as 'M', but the row is counted as 'F' by now.
+        stale.age = 80
+        stale.save()
+        self.assertEqual(self.stats()['patients']['by_gender'], {'M': 1, 'F': 0, 'O': 0})
+        self.assertMatchesRecount()
+    
+    def test_reads_and_unrelated_saves_skip_the_rollups(self):
+        self.assertFalse(post_init.has_listeners(Patient))
+        patient = self.create_patient()
+        with self.assertNumQueries(1):
+            patient.name = 'Ramesh Sharma'
+            patient.save(update_fields=['name'])
+    
+    def test_rebuild_catches_up_writes_that_bypass_signals(self):
+        self.create_patient(gender='M')
+        Patient.objects.update(gender='F')
+    
+        self.assertEqual(rollups.rebuild(), 2)
+        self.assertEqual(self.stats()['patients']['by_gender'], {'M': 0, 'F': 1, 'O': 0})
+    
+    def test_refresh_stats_backfills_the_rollups(self):
+        self.create_patient(gender='O')
+        StatCount.objects.all().delete()
+        
+        call_command('refresh_stats', stdout=io.StringIO())
+        self.assertEqual(self.stats()['patients']['by_gender'], {'M': 0, 'F': 0, 'O': 1})
+    
+    def test_read_query_count_is_independent_of_rows(self):
+        self.assertConstantQueries(
+            self.client, self.url, 1,
+            lambda rows: [self.create_patient(age=age) for age in range(0, 100, 100 // rows)],
+        )
+        self.assertEqual(StatCount.objects.filter(metric='patients_by_age').count(), len(rollups.AGE_BUCKETS))
+    
+    def test_days_are_limited_by_since_and_until(self):
+        StatCount.objects.bulk_create(
+            StatCount(metric='mappings_by_day', bucket=day, count=1)
+            for day in ('2026-01-01', '2026-01-02', '2026-01-03')
+        )
+    
+        mappings = self.stats('?since=2026-01-02&until=2026-01-02')['mappings']
+        self.assertEqual((mappings['total'], mappings['by_day']), (3, {'2026-01-02': 1}))
+        response = self.client.get(self.url + '?since=2026-02-30&until=soon')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'since', 'until'})
+    
+    def test_staff_only(self):
+        client, _ = self.create_authenticated_client('patient@example.com')
+        self.assertEqual(client.get(self.url).status_code, 403)
@@ -0,0 +1,60 @@
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from patients.models import Patient
+from doctors.models import Doctor
+from . import rollups
+
+
+class StatsView(APIView):
+    """API view exposing the patient, doctor and mapping rollups."""
+    
+    permission_classes = [IsAdminUser]
+    
+    def get_day_range(self, request):
+        """Return the `?since=`/`?until=` dates limiting `mappings.by_day`, as ISO strings."""
+        bounds, errors = [], {}
+        for param in ('since', 'until'):
+            raw = request.query_params.get(param)
+            try:
+                day = parse_date(raw) if raw else None
+            except ValueError:
+                day = None
+            if raw and day is None:
+                errors[param] = ['Enter a valid date in YYYY-MM-DD format.']
+            bounds.append(day.isoformat() if day else None)
+        if errors:
+            raise ValidationError(errors)
+        return bounds
+    
+    def get(self, request):
+        """Get every rollup, read from the rollup table in a single query."""
+        since, until = self.get_day_range(request)
+        counts = rollups.get_counts()
+        
+        by_gender = counts['patients_by_gender']
+        by_specialization = counts['doctors_by_specialization']
+        by_day = counts['mappings_by_day']
+        return Response({
+            'patients': {
+                'total': sum(by_gender.values()),
+                'by_gender': {code: by_gender.get(code, 0) for code, _ in Patient.GENDER_CHOICES},
+                'by_age': {label: counts['patients_by_age'].get(label, 0) for _, label in rollups.AGE_BUCKETS},
+            },
+            'doctors': {
+                'total': sum(by_specialization.values()),
+                'by_specialization': {
+                    code: by_specialization.get(code, 0) for code, _ in Doctor.SPECIALIZATION_CHOICES
+                },
+            },
+            'mappings': {
+                'total': sum(by_day.values()),
+                'by_day': {
+                    day: by_day[day] for day in sorted(by_day)
+                    if (since is None or day >= since) and (until is None or day <= until)
+                },
+            },
+        }, status=status.HTTP_200_OK)